@@ -0,0 +1,57 @@
+"""
+Benchmarks the sentence segmenters, and reports how well they agree with punkt.
+
+Run with `python -m benchmarks.segmenters`.
+"""
+import pathlib
+import time
+
+import click
+
+from sight_words import data_utils, segmenters
+
+BOXCAR_TEXT = pathlib.Path(data_utils.__file__).parent / "data" / "boxcar_children.txt"
+
+
+def time_segmenter(segmenter: segmenters.AbstractSegmenter, text: str, repeats: int):
+    """Returns the best wall-clock time (in seconds) and the segmentation"""
+    best = float("inf")
+    sentences = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        sentences = segmenter.segment(text)
+        best = min(best, time.perf_counter() - start)
+    return best, sentences
+
+
+@click.command()
+@click.argument("text_file", type=click.Path(exists=True), default=str(BOXCAR_TEXT))
+@click.option("--repeats", type=int, default=5)
+@click.option("--download/--no-download", default=False)
+def main(text_file, repeats, download):
+    """Times each segmenter on TEXT_FILE and compares it against punkt"""
+    with open(text_file) as f:
+        text = data_utils.normalize_text(f.read())
+    click.secho(f"Segmenting {text_file} ({len(text)} characters):")
+    results = {}
+    for name, segmenter in [
+        ("punkt", segmenters.PunktSegmenter(download=download)),
+        ("regex", segmenters.RegexSegmenter()),
+    ]:
+        seconds, sentences = time_segmenter(segmenter, text, repeats)
+        results[name] = sentences
+        click.secho(
+            f"\t{name}: {len(sentences)} sentences in {1000 * seconds:.1f}ms "
+            f"({len(text) / seconds / 1e6:.2f} MB/s)"
+        )
+
+    agreement = segmenters.compare_segmentations(results["punkt"], results["regex"])
+    click.secho("\nAgreement of regex with punkt:")
+    click.secho(f"\tshared boundaries: {agreement.shared_boundaries}")
+    click.secho(f"\tprecision: {agreement.precision:.3f}")
+    click.secho(f"\trecall: {agreement.recall:.3f}")
+    click.secho(f"\tf1: {agreement.f1:.3f}")
+
+
+if __name__ == "__main__":
+    main()
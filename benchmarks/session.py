@@ -0,0 +1,47 @@
+"""
+Measures the throughput of headless spelling sessions: choosing words, updating
+the dataset and saving it, end to end.
+
+Run with `python -m benchmarks.session`.
+"""
+import pathlib
+import tempfile
+import time
+
+import click
+import numpy as np
+
+from sight_words import data_rep, data_utils, headless, ml
+
+
+@click.command()
+@click.option("--n_answers", type=int, default=500)
+@click.option("--max_grade", type=int, default=3)
+@click.option("--save_every", type=int, multiple=True, default=(1, 10, 0))
+def main(n_answers, max_grade, save_every):
+    """Reports the answers per second of headless spelling sessions"""
+    words = data_utils.build_new_dataset(max_grade=max_grade)
+    dataset = data_rep.DataSet(spelling_words=words, reading_words=words, text=[])
+    # The words are chosen in the session, so the attempts are random words (which
+    # are sometimes right).
+    attempts = np.random.RandomState(0).choice(sorted(words), size=n_answers)
+    answers = [{"attempt": str(attempt)} for attempt in attempts]
+    click.secho(f"{n_answers} answers over {len(words)} words:")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = pathlib.Path(tmp_dir) / "student.yml"
+        for every in save_every:
+            ml.rng.seed(0)
+            start = time.perf_counter()
+            for _ in headless.spell(
+                dataset, answers, data_file=data_file, save_every=every
+            ):
+                pass
+            elapsed = time.perf_counter() - start
+            click.secho(
+                f"\tsave_every={every:<4} {n_answers / elapsed:9.1f} answers/s "
+                f"({1000 * elapsed / n_answers:6.2f}ms per answer)"
+            )
+
+
+if __name__ == "__main__":
+    main()
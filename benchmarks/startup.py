@@ -0,0 +1,80 @@
+"""
+Measures the start-up time of each subcommand: the time from launching
+`word_practice` until its first byte of output.
+
+Run with `python -m benchmarks.startup`.
+"""
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+from sight_words import data_rep, data_utils
+
+
+def time_to_first_output(args, env) -> float:
+    """Runs the cli with the args, and returns the seconds until it first prints"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "sight_words.cli", *args],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+    )
+    first_byte = process.stdout.read(1)
+    elapsed = time.perf_counter() - start
+    process.kill()
+    process.wait()
+    if not first_byte:
+        raise RuntimeError(f"`word_practice {' '.join(args)}` printed nothing.")
+    return elapsed
+
+
+@click.command()
+@click.option("--repeats", type=int, default=5)
+def main(repeats):
+    """Reports the time to first output of each subcommand"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = pathlib.Path(tmp_dir)
+        env = {**os.environ, "SIGHT_WORDS_CACHE_DIR": str(tmp_dir / "cache")}
+        data_file = tmp_dir / "student.yml"
+        words = data_utils.build_new_dataset(max_grade=3)
+        dataset = data_rep.DataSet(
+            spelling_words=words, reading_words=words, text=["boxcar"]
+        )
+        data_utils.save_dataset(data_file, dataset)
+        text_file = tmp_dir / "text.txt"
+        text_file.write_text("The cat sat on the mat. Then it ran off.")
+
+        subcommands = {
+            "--help": ["--help"],
+            "new_data_file": ["new_data_file", str(tmp_dir / "new.yml"), "2"],
+            "parse_new_text": [
+                "parse_new_text",
+                str(text_file),
+                "bench",
+                "--segmenter",
+                "regex",
+            ],
+            "cache": ["cache"],
+            "report": ["report", str(data_file)],
+            "read": ["read", str(data_file)],
+            "spell": ["spell", str(data_file), "--silent", "--no-game"],
+        }
+        click.secho(f"Time to first output (best / median of {repeats} runs):")
+        for name, args in subcommands.items():
+            times = [time_to_first_output(args, env) for _ in range(repeats)]
+            click.secho(
+                f"\t{name:16} {1000 * min(times):7.1f}ms "
+                f"{1000 * statistics.median(times):7.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
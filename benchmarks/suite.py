@@ -0,0 +1,273 @@
+"""
+Benchmarks the core data and selection paths on synthetic datasets, and compares
+the results of two runs.
+
+Run with `python -m benchmarks.suite run --output results.json`, and compare two
+runs (eg. before and after a change) with
+`python -m benchmarks.suite compare old.json new.json`.
+
+Each benchmark's time is the median (and best) of a few repeats; its memory is
+the peak traced allocation of a separate run under tracemalloc (which would
+otherwise skew the timings). The default `--preset quick` runs in a minute or so;
+`--preset full` covers 100, 10k and 1M words with short and very long logs, and
+needs a lot of memory and time.
+"""
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+import dataclasses
+import datetime
+import json
+import os
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import click
+
+from benchmarks import synthetic
+from sight_words import (
+    analytics,
+    cache,
+    data_utils,
+    ml,
+    reports,
+    scheduling,
+    summaries,
+)
+
+
+def measure(
+    func: Callable[[], Any], repeats: int, budget: float
+) -> Dict[str, Optional[float]]:
+    """
+    Times a function, and measures its peak memory. Once the runs take more than
+    `budget` seconds, the remaining repeats (and the memory run) are skipped.
+    """
+    times: List[float] = []
+    while len(times) < repeats and sum(times) <= budget:
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    peak_bytes = None
+    if sum(times) <= budget:
+        tracemalloc.start()
+        try:
+            func()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        "median": statistics.median(times),
+        "best": min(times),
+        "peak_bytes": peak_bytes,
+    }
+
+
+def benchmarks(n_words: int, log_length: int, tmp_dir: pathlib.Path):
+    """The (name, function) of each benchmark, for a size of dataset"""
+    dataset = synthetic.synthetic_dataset(n_words, log_length)
+    words = dataset.spelling_words
+    data_file = tmp_dir / f"{n_words}_{log_length}.yml"
+    data_utils.save_dataset(data_file, dataset)
+    artifact_cache = cache.ArtifactCache.default()
+    a_word = next(iter(words))
+
+    def load_cold():
+        artifact_cache.clear()
+        data_utils.load_dataset(data_file)
+
+    yield "save_dataset", lambda: data_utils.save_dataset(data_file, dataset)
+    yield "load_dataset_cold", load_cold
+    data_utils.load_dataset(data_file)
+    yield "load_dataset_warm", lambda: data_utils.load_dataset(data_file)
+    # Summarized up front, so only the incremental update of the summary is timed.
+    summarized = dataclasses.replace(
+        dataset, spelling_summary=summaries.summarize(words)
+    )
+    yield "update_dataset", lambda: data_utils.update_dataset(
+        summarized, spelling_word=a_word, successes=1
+    )
+    yield "choose_word", lambda: ml.choose_word(words)
+    yield "choose_word_for_target_accuracy", lambda: (
+        ml.choose_word_for_target_accuracy(words)
+    )
+    # The words are scheduled on the first choice; later choices take O(log n).
+    scheduler = scheduling.SpacedRepetitionScheduler()
+    yield "spaced_repetition_choose_word", lambda: scheduler.choose_word(words)
+    yield "marks_by_word", lambda: reports.marks_by_word(words)
+
+    # Events with times, sessions and response times are stored as columns.
+    timed_dataset = synthetic.synthetic_dataset(n_words, log_length, timed=True)
+    timed_file = tmp_dir / f"{n_words}_{log_length}_timed.yml"
+    data_utils.save_dataset(timed_file, timed_dataset)
+
+    def load_timed_cold():
+        artifact_cache.clear()
+        data_utils.load_dataset(timed_file)
+
+    yield "save_timed_dataset", lambda: data_utils.save_dataset(
+        timed_file, timed_dataset
+    )
+    yield "load_timed_dataset_cold", load_timed_cold
+    yield "analytics_report", lambda: analytics.report({"student": timed_dataset})
+
+
+def index_benchmarks(n_sentences: int):
+    """The (name, function) of each sentence index benchmark"""
+    vocabulary = synthetic.synthetic_words(max(100, n_sentences // 10))
+    index = synthetic.synthetic_sentence_index(n_sentences, vocabulary)
+    queries = vocabulary[:: max(1, len(vocabulary) // 100)]
+
+    def get_sentences():
+        for i, word in enumerate(queries):
+            index.get_sentence(word, grade=i % (synthetic.MAX_GRADE + 1))
+
+    yield f"get_sentence_x{len(queries)}", get_sentences
+
+
+def _git_commit() -> str:
+    """The current git commit, if any"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=pathlib.Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+@click.group()
+def main():
+    """A benchmark suite for the core data and selection paths"""
+
+
+PRESETS = {
+    "quick": {"n_words": (100, 1_000), "log_length": (1, 20), "n_sentences": (1_000,)},
+    "full": {
+        "n_words": (100, 10_000, 1_000_000),
+        "log_length": (1, 1_000),
+        "n_sentences": (1_000, 100_000, 1_000_000),
+    },
+}
+
+
+@main.command("run")
+@click.option("--preset", type=click.Choice(sorted(PRESETS)), default="quick")
+@click.option("--n_words", type=int, multiple=True, help="Overrides the preset.")
+@click.option(
+    "--log_length",
+    type=int,
+    multiple=True,
+    help="Events per word (overrides the preset).",
+)
+@click.option("--n_sentences", type=int, multiple=True, help="Overrides the preset.")
+@click.option("--repeats", type=int, default=3)
+@click.option(
+    "--budget",
+    type=float,
+    default=30,
+    help="Stop repeating a benchmark after this many seconds.",
+)
+@click.option("--output", type=click.Path(), default=None)
+def run(preset, n_words, log_length, n_sentences, repeats, budget, output):
+    """Runs the benchmarks, optionally storing the results as JSON"""
+    n_words = n_words or PRESETS[preset]["n_words"]
+    log_length = log_length or PRESETS[preset]["log_length"]
+    n_sentences = n_sentences or PRESETS[preset]["n_sentences"]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = pathlib.Path(tmp_dir)
+        # Keep the benchmarks out of (and independent of) the user's cache.
+        os.environ[cache.CACHE_DIR_ENV] = str(tmp_dir / "cache")
+        cases = []
+        for n in n_words:
+            for length in log_length:
+                cases.append(
+                    (
+                        f"n_words={n},log_length={length}",
+                        lambda n=n, length=length: benchmarks(n, length, tmp_dir),
+                    )
+                )
+        for n in n_sentences:
+            cases.append((f"n_sentences={n}", lambda n=n: index_benchmarks(n)))
+        for case, make_benchmarks in cases:
+            click.secho(f"{case}:")
+            for name, func in make_benchmarks():
+                key = f"{name}[{case}]"
+                results[key] = measure(func, repeats, budget)
+                peak_bytes = results[key]["peak_bytes"]
+                memory = (
+                    "" if peak_bytes is None else f"{peak_bytes / 1024 ** 2:9.2f}MB"
+                )
+                click.secho(
+                    f"\t{name:34} {1000 * results[key]['median']:10.3f}ms {memory}"
+                )
+    if output:
+        document = {
+            "meta": {
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "repeats": repeats,
+            },
+            "results": results,
+        }
+        with open(output, "w") as f:
+            json.dump(document, f, indent=2)
+        click.secho(f"Results written to {output}.")
+
+
+@main.command("compare")
+@click.argument("old", type=click.File("r"))
+@click.argument("new", type=click.File("r"))
+@click.option(
+    "--threshold",
+    type=float,
+    default=1.2,
+    help="Flag benchmarks which got this many times slower (or bigger).",
+)
+def compare(old, new, threshold):
+    """Compares two runs, exiting with an error if any benchmark regressed"""
+    old, new = json.load(old), json.load(new)
+    click.secho(
+        f"{old['meta'].get('commit') or 'old'} -> {new['meta'].get('commit') or 'new'}"
+    )
+    n_regressions = 0
+    for key in sorted(set(old["results"]) & set(new["results"])):
+        before, after = old["results"][key], new["results"][key]
+        time_ratio = after["median"] / max(before["median"], 1e-9)
+        memory = ""
+        regressed = time_ratio > threshold
+        if before["peak_bytes"] is not None and after["peak_bytes"] is not None:
+            memory_ratio = after["peak_bytes"] / max(before["peak_bytes"], 1)
+            memory = f"  memory x{memory_ratio:5.2f}"
+            regressed = regressed or memory_ratio > threshold
+        n_regressions += regressed
+        click.secho(
+            f"{key:70} time x{time_ratio:5.2f}{memory}",
+            fg=(
+                "red"
+                if regressed
+                else ("green" if time_ratio < 1 / threshold else None)
+            ),
+        )
+    for key in sorted(set(old["results"]) ^ set(new["results"])):
+        click.secho(f"{key:70} only in {'old' if key in old['results'] else 'new'}")
+    if n_regressions:
+        raise click.ClickException(f"{n_regressions} benchmark(s) regressed.")
+
+
+if __name__ == "__main__":
+    main()
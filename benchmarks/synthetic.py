@@ -0,0 +1,89 @@
+"""Synthetic datasets and sentence indices, for benchmarking at scale."""
+from typing import Dict
+from typing import List
+
+import numpy as np
+
+from sight_words import data_rep, data_utils
+
+MAX_GRADE = 12
+START_TIME = 1.7e9
+DAY = 24 * 60 * 60.0
+
+
+def synthetic_words(n_words: int) -> List[str]:
+    """Distinct, word-like strings"""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = []
+    for i in range(n_words):
+        word = ""
+        i += 1
+        while i:
+            i, letter = divmod(i - 1, len(letters))
+            word = letters[letter] + word
+        words.append(word)
+    return words
+
+
+def synthetic_words_data(
+    n_words: int, log_length: int, seed: int = 0, timed: bool = False
+) -> Dict[str, data_rep.SightWordDatum]:
+    """
+    Practice data for `n_words` words spread over the grades, with `log_length`
+    events per word (each word has its own success rate). Timed events are about a
+    day apart, with a session per day, and response times of a few seconds.
+    """
+    rng = np.random.RandomState(seed)
+    grades = rng.randint(0, MAX_GRADE + 1, size=n_words)
+    rates = rng.beta(2, 1, size=n_words)
+    successes = rng.rand(n_words, log_length) < rates[:, None]
+    columns = {
+        "success": successes.astype(np.float64),
+        "failure": (~successes).astype(np.float64),
+    }
+    if timed:
+        gaps = rng.exponential(DAY, size=(n_words, log_length))
+        columns["time"] = START_TIME + np.cumsum(gaps, axis=1)
+        columns["session"] = (columns["time"] // DAY).astype(np.int64)
+        columns["response_time"] = rng.lognormal(1, 0.5, size=(n_words, log_length))
+    words = {}
+    for i, (word, grade) in enumerate(zip(synthetic_words(n_words), grades)):
+        log = data_rep.EventLog(**{name: values[i] for name, values in columns.items()})
+        words[word] = data_rep.SightWordDatum(grade=int(grade), log=log)
+    return words
+
+
+def synthetic_dataset(
+    n_words: int, log_length: int, seed: int = 0, timed: bool = False
+) -> data_rep.DataSet:
+    """A student's dataset, with the same synthetic words to spell and read"""
+    words = synthetic_words_data(n_words, log_length, seed=seed, timed=timed)
+    return data_rep.DataSet(spelling_words=words, reading_words=words, text=[])
+
+
+def synthetic_sentence_index(
+    n_sentences: int, vocabulary: List[str], sentence_length: int = 10, seed: int = 0
+) -> data_utils.SentenceIndex:
+    """An index of random sentences over the vocabulary (with Zipf-ish frequencies)"""
+    rng = np.random.RandomState(seed)
+    ranks = np.arange(1, len(vocabulary) + 1)
+    probabilities = 1 / ranks
+    probabilities /= probabilities.sum()
+    choices = rng.choice(
+        len(vocabulary), size=(n_sentences, sentence_length), p=probabilities
+    )
+    sentences = [
+        " ".join(vocabulary[i] for i in sentence).capitalize() + "."
+        for sentence in choices
+    ]
+    word_grades = {word: i % (MAX_GRADE + 1) for i, word in enumerate(vocabulary)}
+    index = data_utils._get_lookup_dict(sentences)  # pylint: disable=protected-access
+    ranked_index, ranked_difficulty = data_utils.rank_sentences(
+        sentences, index, word_grades=word_grades
+    )
+    return data_utils.SentenceIndex(
+        sentences=sentences,
+        index=index,
+        ranked_index=ranked_index,
+        ranked_difficulty=ranked_difficulty,
+    ).precompute()
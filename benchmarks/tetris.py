@@ -0,0 +1,66 @@
+"""
+Measures the speed of the tetris simulation core: the steps per second of the
+game logic alone (with random moves), and the steps and games per second of the
+placement bot, in one process and across a process pool.
+
+Run with `python -m benchmarks.tetris`.
+"""
+from concurrent import futures
+import functools
+import os
+import random
+import time
+
+import click
+
+from sight_words.games import tetris_bot, tetris_core
+
+
+def random_steps(n_steps: int, width: int, height: int, seed: int) -> int:
+    """Steps games with random moves (restarting any which end), returning n_steps"""
+    rng = random.Random(seed)
+    moves = list(tetris_core.Move) + [None] * 3
+    game = tetris_core.TetrisCore.new(width=width, height=height, seed=seed)
+    for _ in range(n_steps):
+        if game.step(rng.choice(moves)).game_over:
+            game = tetris_core.TetrisCore.new(width=width, height=height, seed=seed)
+    return n_steps
+
+
+@click.command()
+@click.option("--n_games", type=int, default=64)
+@click.option("--n_steps", type=int, default=100_000, help="Random move steps.")
+@click.option("--max_steps", type=int, default=2_000, help="Steps per bot game.")
+@click.option("--width", type=int, default=10)
+@click.option("--height", type=int, default=20)
+@click.option("--workers", type=int, default=None, help="Default: the CPU count.")
+def main(n_games, n_steps, max_steps, width, height, workers):
+    """Reports the simulated steps per second, and games per second, of tetris"""
+    start = time.perf_counter()
+    random_steps(n_steps, width, height, seed=0)
+    elapsed = time.perf_counter() - start
+    click.secho(f"core, random moves:   {n_steps / elapsed:10.0f} steps/s")
+
+    play = functools.partial(
+        tetris_bot.play_game, width=width, height=height, max_steps=max_steps
+    )
+    n_workers = workers or os.cpu_count() or 1
+    for n_processes in sorted({1, n_workers}):
+        start = time.perf_counter()
+        if n_processes == 1:
+            results = list(map(play, range(n_games)))
+        else:
+            chunksize = max(1, n_games // (4 * n_processes))
+            with futures.ProcessPoolExecutor(max_workers=n_processes) as executor:
+                results = list(executor.map(play, range(n_games), chunksize=chunksize))
+        elapsed = time.perf_counter() - start
+        total_steps = sum(result.n_steps for result in results)
+        mean_lines = sum(result.n_lines for result in results) / len(results)
+        click.secho(
+            f"bot, {n_processes:2d} process(es): {total_steps / elapsed:10.0f} steps/s "
+            f"{n_games / elapsed:8.2f} games/s (mean {mean_lines:.1f} lines)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Learning curves, retention and session summaries, over the practice events of one
+or many students, vectorized with NumPy.
+
+The events are first flattened into an `EventTable`, with a column per field and a
+row per event (the first event of each word's log, its prior, is left out). Each
+analysis is then a handful of array operations over the whole table, however many
+students, words and events it holds:
+ - `learning_curves`: the accuracy at the n-th attempt at a word, by grade or word,
+ - `retention`: the accuracy by the time since the word was last practiced,
+ - `session_summaries`: the events, accuracy, duration and response times of each
+   session.
+Only events with times (or sessions) count towards the retention (or sessions).
+"""
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import Sequence
+import dataclasses
+
+import numpy as np
+
+import sight_words.data_rep as data_rep
+
+KINDS = ("spelling", "reading")
+
+MINUTE = 60.0
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+RETENTION_BINS = (MINUTE, 10 * MINUTE, HOUR, DAY, 7 * DAY, 30 * DAY)
+"""The edges (in seconds since the last practice) of the retention bins"""
+
+
+@dataclasses.dataclass
+class EventTable:
+    """The practice events of some students, with a row per event"""
+
+    students: List[str]
+    words: List[str]
+    # The index of each event's student and word (in `students` and `words`), the
+    # word's grade, and the attempt at the word it was (counting from 1).
+    student: np.ndarray
+    word: np.ndarray
+    grade: np.ndarray
+    attempt: np.ndarray
+    # The event's columns, as in `sight_words.data_rep.EventLog`.
+    success: np.ndarray
+    failure: np.ndarray
+    time: np.ndarray
+    session: np.ndarray
+    response_time: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.success)
+
+
+def _column(log: data_rep.EventLog, name: str) -> np.ndarray:
+    """A column of the log, without its prior event"""
+    values = log.column(name)
+    dtype = np.int64 if values.typecode == "q" else np.float64
+    return np.frombuffer(values, dtype=dtype)[1:]
+
+
+def event_table(
+    datasets: Mapping[str, data_rep.DataSet], kind: str = "spelling"
+) -> EventTable:
+    """The events of the students' (spelling or reading) words"""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind: {kind}.")
+    word_ids: Dict[str, int] = {}
+    logs = []
+    student_ids, words, grades, lengths = [], [], [], []
+    for student_id, dataset in enumerate(datasets.values()):
+        for word, datum in getattr(dataset, f"{kind}_words").items():
+            if len(datum.log) < 2:
+                continue
+            logs.append(datum.log)
+            student_ids.append(student_id)
+            words.append(word_ids.setdefault(word, len(word_ids)))
+            grades.append(datum.grade)
+            lengths.append(len(datum.log) - 1)
+    lengths = np.array(lengths, dtype=np.int64)
+    starts = np.cumsum(lengths) - lengths
+    n_events = int(lengths.sum())
+
+    def concatenate(name, dtype):
+        if not logs:
+            return np.zeros(0, dtype=dtype)
+        return np.concatenate([_column(log, name) for log in logs])
+
+    return EventTable(
+        students=list(datasets),
+        words=list(word_ids),
+        student=np.repeat(np.array(student_ids, dtype=np.int64), lengths),
+        word=np.repeat(np.array(words, dtype=np.int64), lengths),
+        grade=np.repeat(np.array(grades, dtype=np.int64), lengths),
+        attempt=np.arange(n_events) - np.repeat(starts, lengths) + 1,
+        success=concatenate("success", np.float64),
+        failure=concatenate("failure", np.float64),
+        time=concatenate("time", np.float64),
+        session=concatenate("session", np.int64),
+        response_time=concatenate("response_time", np.float64),
+    )
+
+
+def _accuracy(successes: np.ndarray, trials: np.ndarray) -> np.ndarray:
+    """The accuracy, NaN where there were no trials"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(trials > 0, successes / trials, np.nan)
+
+
+@dataclasses.dataclass
+class LearningCurves:
+    """The accuracy of each group (of words) at each attempt"""
+
+    by: str
+    groups: List[Any]
+    # The successes and trials of each group (a row) at each attempt (a column).
+    successes: np.ndarray
+    trials: np.ndarray
+
+    @property
+    def accuracy(self) -> np.ndarray:
+        return _accuracy(self.successes, self.trials)
+
+
+def learning_curves(
+    table: EventTable, by: str = "grade", max_attempts: int = 10
+) -> LearningCurves:
+    """The learning curves by grade or word, for the first `max_attempts` attempts"""
+    if by == "grade":
+        groups, group = np.unique(table.grade, return_inverse=True)
+        groups = groups.tolist()
+    elif by == "word":
+        groups, group = table.words, table.word
+    else:
+        raise ValueError(f"Unknown grouping: {by}.")
+    keep = table.attempt <= max_attempts
+    cells = group[keep] * max_attempts + table.attempt[keep] - 1
+    size = len(groups) * max_attempts
+
+    def total(weights):
+        counts = np.bincount(cells, weights=weights[keep], minlength=size)
+        return counts.reshape(len(groups), max_attempts)
+
+    return LearningCurves(
+        by=by,
+        groups=groups,
+        successes=total(table.success),
+        trials=total(table.success + table.failure),
+    )
+
+
+@dataclasses.dataclass
+class Retention:
+    """The accuracy by the time since the word was last practiced"""
+
+    bin_edges: Sequence[float]
+    # The successes and trials in each bin: before the first edge, between each
+    # pair of edges, and after the last edge.
+    successes: np.ndarray
+    trials: np.ndarray
+
+    @property
+    def accuracy(self) -> np.ndarray:
+        return _accuracy(self.successes, self.trials)
+
+
+def retention(
+    table: EventTable, bin_edges: Sequence[float] = RETENTION_BINS
+) -> Retention:
+    """
+    The retention of words: the accuracy of the attempts at them by the time since
+    the previous attempt
+    """
+    # A word's events are consecutive rows, in the order they happened.
+    gaps = table.time[1:] - table.time[:-1]
+    repeat = (table.attempt[1:] > 1) & np.isfinite(gaps)
+    bins = np.digitize(gaps[repeat], bin_edges)
+    size = len(bin_edges) + 1
+    success = table.success[1:][repeat]
+    trials = success + table.failure[1:][repeat]
+    return Retention(
+        bin_edges=tuple(bin_edges),
+        successes=np.bincount(bins, weights=success, minlength=size),
+        trials=np.bincount(bins, weights=trials, minlength=size),
+    )
+
+
+@dataclasses.dataclass
+class SessionSummaries:
+    """A summary of each session, with an entry per session in each array"""
+
+    student: List[str]
+    session: np.ndarray
+    n_events: np.ndarray
+    accuracy: np.ndarray
+    # The times of the first and last events, and the mean response time (NaN if
+    # there were none).
+    start: np.ndarray
+    end: np.ndarray
+    mean_response_time: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.session)
+
+
+def session_summaries(table: EventTable) -> SessionSummaries:
+    """Summarizes each session, in the order they started"""
+    in_session = table.session != 0
+    # Number the (student, session) pairs, through a key per pair (which is much
+    # faster than finding the unique rows of a 2d array).
+    session_ids, session_index = np.unique(
+        table.session[in_session], return_inverse=True
+    )
+    n_ids = max(len(session_ids), 1)
+    keys = table.student[in_session] * n_ids + session_index.reshape(-1)
+    keys, group = np.unique(keys, return_inverse=True)
+    group = group.reshape(-1)
+    n_sessions = len(keys)
+    sessions = np.stack([keys // n_ids, session_ids[keys % n_ids]], axis=1)
+
+    def total(weights):
+        return np.bincount(group, weights=weights, minlength=n_sessions)
+
+    success = table.success[in_session]
+    trials = success + table.failure[in_session]
+    response_time = table.response_time[in_session]
+    timed_response = np.isfinite(response_time)
+    n_responses = total(timed_response.astype(np.float64))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_response_time = (
+            total(np.where(timed_response, response_time, 0.0)) / n_responses
+        )
+
+    # The first and last (known) time of each session.
+    order = np.argsort(group, kind="stable")
+    times = table.time[in_session][order]
+    starts = np.searchsorted(group[order], np.arange(n_sessions))
+    if n_sessions:
+        start = np.fmin.reduceat(times, starts)
+        end = np.fmax.reduceat(times, starts)
+    else:
+        start = end = np.zeros(0)
+
+    by_start = np.lexsort((sessions[:, 1], start))
+    return SessionSummaries(
+        student=[table.students[i] for i in sessions[by_start, 0]],
+        session=sessions[by_start, 1],
+        n_events=total(np.ones(len(group)))[by_start].astype(np.int64),
+        accuracy=_accuracy(total(success), total(trials))[by_start],
+        start=start[by_start],
+        end=end[by_start],
+        mean_response_time=mean_response_time[by_start],
+    )
+
+
+def _json_float(value: float, digits: int = 3) -> Any:
+    """The value, rounded, or None for NaN"""
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def report(
+    datasets: Mapping[str, data_rep.DataSet],
+    kind: str = "spelling",
+    by: str = "grade",
+    max_attempts: int = 10,
+) -> Dict[str, Any]:
+    """
+    The learning curves, retention and sessions of the students.
+
+    Returns:
+        A (JSON-able) report.
+    """
+    table = event_table(datasets, kind=kind)
+    curves = learning_curves(table, by=by, max_attempts=max_attempts)
+    kept = retention(table)
+    sessions = session_summaries(table)
+    return {
+        "students": table.students,
+        "n_events": len(table),
+        "learning_curves": [
+            {
+                by: group,
+                "accuracy": [_json_float(value) for value in curves.accuracy[i]],
+                "trials": curves.trials[i].tolist(),
+            }
+            for i, group in enumerate(curves.groups)
+        ],
+        "retention": [
+            {
+                "min_seconds": edge,
+                "accuracy": _json_float(kept.accuracy[i]),
+                "trials": float(kept.trials[i]),
+            }
+            for i, edge in enumerate([0.0, *kept.bin_edges])
+        ],
+        "sessions": [
+            {
+                "student": student,
+                "session": int(sessions.session[i]),
+                "n_events": int(sessions.n_events[i]),
+                "accuracy": _json_float(sessions.accuracy[i]),
+                "start": _json_float(sessions.start[i]),
+                "seconds": _json_float(sessions.end[i] - sessions.start[i]),
+                "mean_response_time": _json_float(sessions.mean_response_time[i]),
+            }
+            for i, student in enumerate(sessions.student)
+        ],
+    }
@@ -0,0 +1,241 @@
+"""
+A user-level cache directory for texts and derived artifacts.
+
+The cache root (`SIGHT_WORDS_CACHE_DIR`, by default `~/.cache/sight_words`)
+holds:
+ - `texts/`: texts parsed by the user, and compiled indices. These are looked up
+   by name, before the texts bundled with the package, and are never evicted.
+ - `artifacts/`: derived artifacts (loaded sentence indices, student datasets,
+   segmented texts, synthesized speech), keyed by a content hash of their inputs.
+   Changing an input changes the key, so stale artifacts are never reused; they
+   are evicted, least recently used first, once the artifacts exceed
+   `SIGHT_WORDS_CACHE_MAX_BYTES`. A running total of their size is kept, so the
+   directory is only scanned when the total goes over (or for the first artifact
+   a process adds), and eviction then makes room for a run of further artifacts;
+   artifacts other processes add are counted by the next scan.
+"""
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import TypeVar
+from typing import Union
+import hashlib
+import os
+import pathlib
+import pickle
+import tempfile
+import threading
+
+CACHE_DIR_ENV = "SIGHT_WORDS_CACHE_DIR"
+CACHE_MAX_BYTES_ENV = "SIGHT_WORDS_CACHE_MAX_BYTES"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+EVICTION_TARGET = 0.8
+"""The fraction of the maximum size which eviction (once it's over) leaves"""
+CACHE_VERSION = "2"
+"""Part of every key; bump it when the format of cached artifacts changes"""
+
+T = TypeVar("T")
+
+_SIZES: Dict[pathlib.Path, int] = {}
+"""The running total of the size of each cache root's artifacts"""
+_SIZES_LOCK = threading.Lock()
+
+
+def _unlink(path: pathlib.Path):
+    """Removes a file, if it still exists"""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def cache_root() -> pathlib.Path:
+    """The root of the user-level cache directory"""
+    root = os.environ.get(CACHE_DIR_ENV)
+    if root:
+        return pathlib.Path(root).expanduser()
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache:
+        return pathlib.Path(xdg_cache) / "sight_words"
+    return pathlib.Path.home() / ".cache" / "sight_words"
+
+
+def texts_dir() -> pathlib.Path:
+    """The directory holding the user's parsed texts and compiled indices"""
+    return cache_root() / "texts"
+
+
+def package_data_dir() -> pathlib.Path:
+    """The (possibly read-only) directory of the data bundled with the package"""
+    return pathlib.Path(__file__).parent / "data"
+
+
+def text_path(file_name: str) -> pathlib.Path:
+    """
+    The path to a text's data file: the user's copy if there is one, otherwise
+    the bundled one.
+    """
+    user_path = texts_dir() / file_name
+    if user_path.exists():
+        return user_path
+    bundled_path = package_data_dir() / file_name
+    if bundled_path.exists():
+        return bundled_path
+    return user_path
+
+
+def content_key(*parts: Union[bytes, str]) -> str:
+    """A hash of the given parts, used as a cache key"""
+    digest = hashlib.sha256(CACHE_VERSION.encode())
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        # Prefix each part by its length, so that parts can't run together.
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def file_key(paths: Iterable[pathlib.Path], *parts: Union[bytes, str]) -> str:
+    """A hash of the contents of the files (and any extra parts)"""
+    contents = []
+    for path in paths:
+        contents.append(str(path.name))
+        contents.append(path.read_bytes() if path.exists() else b"")
+    return content_key(*contents, *parts)
+
+
+class ArtifactCache:
+    """
+    A content-addressed, size-bounded cache of artifacts. Artifacts are pickled
+    python objects, or files (such as audio) written to `path_for` directly.
+    """
+
+    def __init__(self, root: pathlib.Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Initializes the cache in the root directory."""
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def default() -> "ArtifactCache":
+        """The cache configured by the environment"""
+        max_bytes = int(os.environ.get(CACHE_MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+        return ArtifactCache(cache_root() / "artifacts", max_bytes=max_bytes)
+
+    def path_for(self, kind: str, key: str, suffix: str = ".pickle") -> pathlib.Path:
+        """The path to an artifact"""
+        return self.root / kind / f"{key}{suffix}"
+
+    @staticmethod
+    def touch(path: pathlib.Path):
+        """Marks an artifact as recently used"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def get(self, kind: str, key: str, default: Any = None) -> Any:
+        """Returns a cached artifact, marking it as recently used"""
+        path = self.path_for(kind, key)
+        try:
+            with path.open("rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception:  # pylint: disable=broad-except
+            # A corrupt (eg. truncated) or incompatible artifact; drop it.
+            _unlink(path)
+            return default
+        self.touch(path)
+        return value
+
+    def put(self, kind: str, key: str, value: Any):
+        """Stores an artifact, evicting old artifacts if the cache is too big"""
+        path = self.path_for(kind, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The cache is an optimization; a read-only home shouldn't break us.
+            return
+        self.added(path)
+
+    def added(self, path: pathlib.Path):
+        """
+        Counts an artifact written to the cache (by `put`, or to `path_for`),
+        evicting old artifacts if the cache is now too big.
+        """
+        try:
+            n_bytes = path.stat().st_size
+        except FileNotFoundError:
+            return
+        with _SIZES_LOCK:
+            total = _SIZES.get(self.root)
+            if total is not None:
+                total += n_bytes
+                _SIZES[self.root] = total
+        if total is None:
+            # Scans the artifacts, and starts the total.
+            self.evict()
+        elif total > self.max_bytes:
+            self.evict(int(self.max_bytes * EVICTION_TARGET))
+
+    def get_or_build(self, kind: str, key: str, build: Callable[[], T]) -> T:
+        """Returns the cached artifact, building and caching it if it is missing"""
+        missing = object()
+        value = self.get(kind, key, default=missing)
+        if value is missing:
+            value = build()
+            self.put(kind, key, value)
+        return value
+
+    def _artifacts(self):
+        """The (mtime, size, path) of every artifact"""
+        if not self.root.exists():
+            return []
+        artifacts = []
+        for path in self.root.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            artifacts.append((stat.st_mtime, stat.st_size, path))
+        return artifacts
+
+    def size(self) -> int:
+        """The total size of the artifacts, in bytes"""
+        return sum(size for _, size, _ in self._artifacts())
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Evicts the least recently used artifacts until the cache fits in
+        max_bytes.
+
+        Returns:
+            The number of evicted artifacts.
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        artifacts = sorted(self._artifacts())
+        total = sum(size for _, size, _ in artifacts)
+        n_evicted = 0
+        for _, size, path in artifacts:
+            if total <= max_bytes:
+                break
+            _unlink(path)
+            total -= size
+            n_evicted += 1
+        with _SIZES_LOCK:
+            _SIZES[self.root] = total
+        return n_evicted
+
+    def clear(self) -> int:
+        """Removes every artifact"""
+        return self.evict(max_bytes=0)
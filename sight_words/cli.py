@@ -1,21 +1,38 @@
-"""The main sight-words entry-point."""
-import dataclasses
-import itertools
+"""
+The main sight-words entry-point.
+
+Each subcommand imports only the modules it needs, so that (for instance)
+`report` doesn't pay for loading the speech engine, nltk or the games.
+"""
+
+# pylint: disable=import-outside-toplevel
 import pathlib
 
-import blessed
 import click
 
-from sight_words.games import stacking, tetris
-from sight_words import data_utils, ml, reports, data_rep, io
-from sight_words import game as game_module
+from sight_words import segmenters
 
 
 @click.group()
-def main():
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Time each phase of the session, and print a summary at exit.",
+)
+@click.option(
+    "--profile_dump",
+    type=click.Path(),
+    default=None,
+    help="Also run cProfile, dumping its stats to this file at exit.",
+)
+def main(profile, profile_dump):
     """The Word Practice program. Please choose spell, read, or
     add a new student, parse a new text, or generate a report"""
-    pass
+    from sight_words import profiling
+
+    profiling.enable_from_env()
+    if profile or profile_dump:
+        profiling.profiler.enable(dump_path=profile_dump)
 
 
 DEFAULT_TEXTS = (
@@ -35,6 +52,8 @@ DEFAULT_TEXTS = (
 @click.option("--text_name", type=str, multiple=True, default=DEFAULT_TEXTS)
 def new_raw_data_file(file_path, words, grade, past_grade_success_incr, text_name):
     """Initializes a datafile for a new student"""
+    from sight_words import data_rep, data_utils
+
     click.secho(f"Creating new data file from {words} for grade {grade}.")
     raw_words = data_utils.load_word_file(words)
     words = data_utils.build_new_raw_dataset(
@@ -44,7 +63,7 @@ def new_raw_data_file(file_path, words, grade, past_grade_success_incr, text_nam
         spelling_words=words, reading_words=words, text=list(text_name)
     )
     click.secho(f"Saving data file at {file_path}.")
-    data_utils.save_dataset(pathlib.Path(file_path), dataset)
+    data_utils.DatasetFile(pathlib.Path(file_path)).save(dataset)
     click.secho("Done.")
 
 
@@ -55,6 +74,10 @@ def new_raw_data_file(file_path, words, grade, past_grade_success_incr, text_nam
 @click.option("--past_grade_success_incr", type=int, default=1)
 def add_grade_to_data_file(file_path, words, grade, past_grade_success_incr):
     """Adds a grade to a datafile for a new student"""
+    import dataclasses
+
+    from sight_words import data_utils
+
     click.secho(f"Creating new data file from {words} for grade {grade}.")
     raw_words = data_utils.load_word_file(words)
     words = data_utils.build_new_raw_dataset(
@@ -63,15 +86,19 @@ def add_grade_to_data_file(file_path, words, grade, past_grade_success_incr):
         past_grade_success_incr=past_grade_success_incr,
         min_grade=grade,
     )
-    data_file = pathlib.Path(file_path)
-    dataset = data_utils.load_dataset(data_file)
-    new_spelling_words = {**words, **dataset.spelling_words}
-    new_reading_words = {**words, **dataset.reading_words}
-    dataset = dataclasses.replace(
-        dataset, spelling_words=new_spelling_words, reading_words=new_reading_words
-    )
+
+    def add_grade(dataset):
+        return dataclasses.replace(
+            dataset,
+            spelling_words={**words, **dataset.spelling_words},
+            reading_words={**words, **dataset.reading_words},
+            # The summaries are recomputed once the student next practices.
+            spelling_summary=None,
+            reading_summary=None,
+        )
+
     click.secho(f"Saving data file at {file_path}.")
-    data_utils.save_dataset(pathlib.Path(file_path), dataset)
+    data_utils.DatasetFile(pathlib.Path(file_path)).update(add_grade)
     click.secho("Done.")
 
 
@@ -82,6 +109,8 @@ def add_grade_to_data_file(file_path, words, grade, past_grade_success_incr):
 @click.option("--text_name", type=str, multiple=True, default=("p_and_p",))
 def new_data_file(file_path, grade, past_grade_success_incr, text_name):
     """Initializes a datafile for a new student"""
+    from sight_words import data_rep, data_utils
+
     click.secho(f"Creating new data file for grade {grade}.")
     words = data_utils.build_new_dataset(
         max_grade=grade, past_grade_success_incr=past_grade_success_incr
@@ -90,54 +119,250 @@ def new_data_file(file_path, grade, past_grade_success_incr, text_name):
         spelling_words=words, reading_words=words, text=list(text_name)
     )
     click.secho(f"Saving data file at {file_path}.")
-    data_utils.save_dataset(pathlib.Path(file_path), dataset)
+    data_utils.DatasetFile(pathlib.Path(file_path)).save(dataset)
     click.secho("Done.")
 
 
+@main.command("roster")
+@click.argument("roster_file", type=click.File("r"))
+@click.argument("data_dir", type=click.Path(file_okay=False))
+@click.option("--past_grade_success_incr", type=int, default=1)
+@click.option("--text_name", type=str, multiple=True, default=DEFAULT_TEXTS)
+@click.option("--workers", type=int, default=None, help="Defaults to the CPU count.")
+@click.option("--dry_run", is_flag=True, help="Report the changes without making them.")
+def roster(roster_file, data_dir, past_grade_success_incr, text_name, workers, dry_run):
+    """
+    Creates (or adds missing grades to) the data files in DATA_DIR of every student
+    in ROSTER_FILE, a CSV file with student, grade, and optionally words (a word
+    list file) and texts columns
+    """
+    import collections
+
+    from sight_words import roster as roster_module
+
+    try:
+        entries = roster_module.read_roster(roster_file)
+        results = roster_module.provision_roster(
+            entries,
+            pathlib.Path(data_dir),
+            default_texts=text_name,
+            past_grade_success_incr=past_grade_success_incr,
+            max_workers=workers,
+            dry_run=dry_run,
+        )
+    except (OSError, ValueError) as e:
+        raise click.ClickException(str(e)) from e
+
+    colors = {
+        roster_module.Action.CREATED: "green",
+        roster_module.Action.UPDATED: "yellow",
+        roster_module.Action.FAILED: "red",
+    }
+    for result in results:
+        detail = result.error or (
+            f"+{result.n_words_added} words" if result.n_words_added else ""
+        )
+        click.secho(
+            f"{result.action.value:9} {result.path} {detail}".rstrip(),
+            fg=colors.get(result.action),
+        )
+    counts = collections.Counter(result.action.value for result in results)
+    summary = ", ".join(f"{n} {action}" for action, n in sorted(counts.items()))
+    click.secho(f"{'Would have: ' if dry_run else ''}{summary}.")
+    if counts[roster_module.Action.FAILED.value]:
+        raise click.ClickException("Some students could not be provisioned.")
+
+
 @main.command("parse_new_text")
 @click.argument("text", type=click.Path())
 @click.argument("name", type=str)
 @click.option("--max_length", type=int, default=100)
-def parse_new_text(text, name, max_length):
+@click.option(
+    "--segmenter",
+    type=click.Choice(sorted(segmenters.SEGMENTERS)),
+    default="punkt",
+    help="The sentence segmenter; regex needs no downloads.",
+)
+def parse_new_text(text, name, max_length, segmenter):
     """Parses a new text file for sentences"""
+    from sight_words import data_utils
+
     click.secho(f"Parsing the text {text}.")
-    data_utils.build_new_sentence_file(text, name, max_length=max_length)
+    data_utils.build_new_sentence_file(
+        text,
+        name,
+        max_length=max_length,
+        segmenter=segmenters.get_segmenter(segmenter),
+    )
     click.secho(f"Saved under {name}.")
 
 
+@main.command("add_text_to_index")
+@click.argument("index_name", type=str)
+@click.argument("text", type=str)
+@click.option("--parsed", is_flag=True, help="TEXT names an already parsed text.")
+@click.option("--max_length", type=int, default=100)
+@click.option(
+    "--segmenter", type=click.Choice(sorted(segmenters.SEGMENTERS)), default="punkt"
+)
+@click.option(
+    "--compact/--no-compact",
+    default=None,
+    help="Compact in the background (by default once many segments accumulate).",
+)
+def add_text_to_index(index_name, text, parsed, max_length, segmenter, compact):
+    """Appends a text to a compiled index, without rebuilding it"""
+    from sight_words import compiled_index, data_utils
+
+    if parsed:
+        sentences = data_utils.load_sentences(text)
+    else:
+        click.secho(f"Parsing the text {text}.")
+        sentences = data_utils.parse_sentences(
+            text, max_length=max_length, segmenter=segmenters.get_segmenter(segmenter)
+        )
+    compiled_index.add_text(index_name, sentences, source=text, compact=compact)
+    click.secho(f"Appended {len(sentences)} sentences to {index_name}.")
+
+
+@main.command("compact_index")
+@click.argument("index_name", type=str)
+@click.option("--background/--foreground", default=True)
+def compact_index(index_name, background):
+    """Merges the accumulated segments of a compiled index"""
+    from sight_words import compiled_index
+
+    index = compiled_index.CompiledIndex.named(index_name)
+    if not index.exists():
+        raise click.ClickException(f"There is no compiled index named {index_name}.")
+    if background:
+        index.compact_in_subprocess()
+        click.secho(f"Compacting {index_name} in the background.")
+    else:
+        n_merged = index.compact()
+        click.secho(f"Merged {n_merged} segments of {index_name}.")
+
+
+@main.command("cache")
+@click.option("--clear", is_flag=True, help="Remove every cached artifact.")
+def cache_info(clear):
+    """Shows (or clears) the cache of texts and derived artifacts"""
+    from sight_words import cache
+
+    artifact_cache = cache.ArtifactCache.default()
+    click.secho(f"Texts: {cache.texts_dir()}")
+    click.secho(f"Artifacts: {artifact_cache.root}")
+    if clear:
+        n_cleared = artifact_cache.clear()
+        click.secho(f"Cleared {n_cleared} artifacts.")
+    size_mb = artifact_cache.size() / 1024 ** 2
+    max_mb = artifact_cache.max_bytes / 1024 ** 2
+    click.secho(f"Artifacts use {size_mb:.1f}MB of {max_mb:.0f}MB.")
+
+
+def _run_headless(session):
+    """Prints the outcomes of a headless session as JSON lines"""
+    import json
+
+    try:
+        for outcome in session:
+            click.echo(json.dumps(outcome))
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+
+
+def _script_options(command):
+    """Options for running a command headless, from a script of answers"""
+    command = click.option(
+        "--save_every",
+        type=int,
+        default=1,
+        help="With --script: save after this many answers (0: only at the end).",
+    )(command)
+    command = click.option(
+        "--seed", type=int, default=None, help="Seed the choice of words."
+    )(command)
+    return click.option(
+        "--script",
+        type=click.File("r"),
+        default=None,
+        help="Run headless, reading JSON lines of answers from the file (or -).",
+    )(command)
+
+
+def _strategy_option(command):
+    """The option choosing how words are chosen"""
+    return click.option(
+        "--strategy",
+        type=click.Choice(["sampling", "spaced"]),
+        default="sampling",
+        help="Sample the words to practice, or review them as they come due "
+        "(spaced repetition, which scales to very large word lists).",
+    )(command)
+
+
 @main.command("read")
 @click.argument("data_file", type=click.Path())
 @click.option("--inv_temp", type=float, default=1)
 @click.option("--inv_grade_temp", type=float, default=1)
-def read(data_file, inv_temp, inv_grade_temp):
+@_strategy_option
+@_script_options
+def read(data_file, inv_temp, inv_grade_temp, strategy, script, seed, save_every):
     """Tests reading"""
-    data_file = pathlib.Path(data_file)
-    dataset = data_utils.load_dataset(data_file)
+    import time
+
+    from sight_words import data_utils, io, ml, scheduling, session
+
+    if seed is not None:
+        ml.rng.seed(seed)
+    data_file = data_utils.DatasetFile(pathlib.Path(data_file))
+    dataset = data_file.load()
+    if script:
+        from sight_words import headless
+
+        _run_headless(
+            headless.read(
+                dataset,
+                headless.parse_answers(script),
+                data_file=data_file,
+                inv_temp=inv_temp,
+                inv_grade_temp=inv_grade_temp,
+                save_every=save_every,
+                strategy=strategy,
+            )
+        )
+        return
+    state = session.SessionState(dataset)
+    scheduler = scheduling.scheduler_for(strategy)
     success_str = None
     while success_str != "\quit":
-        word = ml.choose_word(
-            dataset.reading_words, inv_temp=inv_temp, inv_grade_temp=inv_grade_temp
-        )
+        if scheduler:
+            word = scheduler.choose_word(state.dataset.reading_words)
+        else:
+            word = ml.choose_word(
+                state.dataset.reading_words,
+                inv_temp=inv_temp,
+                inv_grade_temp=inv_grade_temp,
+            )
         click.secho("Please read:\n\n")
         click.secho(word)
         click.secho("\n")
+        asked = time.monotonic()
         capture = False
         while not capture:
             io.flush_input()
             success_str = input("Successful (y/n/\quit)? ")
-            if success_str.lower()[0] == "y":
-                dataset = data_utils.update_dataset(
-                    dataset, reading_word=word, successes=1, failures=0
-                )
-                capture = True
-            elif success_str.lower()[0] == "n":
-                dataset = data_utils.update_dataset(
-                    dataset, reading_word=word, successes=0, failures=1
+            if success_str.lower()[0] in "yn":
+                state.record_answer(
+                    word,
+                    success_str.lower()[0] == "y",
+                    spelling=False,
+                    response_time=time.monotonic() - asked,
                 )
                 capture = True
             elif success_str == "\quit":
                 capture = True
-        data_utils.save_dataset(data_file, dataset)
+        data_file.save(state.dataset)
 
 
 @main.command("spell")
@@ -147,112 +372,353 @@ def read(data_file, inv_temp, inv_grade_temp):
 @click.option("--spoken/--silent", type=bool, default=True)
 @click.option("--target_accuracy", type=float, default=0.75)
 @click.option("--game/--no-game", default=True)
-def spell(data_file, inv_temp, inv_grade_temp, spoken, target_accuracy, game):
+@click.option(
+    "--audio-cache/--no-audio-cache",
+    default=True,
+    help="Synthesize speech ahead of time, and cache it.",
+)
+@click.option(
+    "--queued-speech/--blocking-speech",
+    default=True,
+    help="Accept answers while the prompt is still being read aloud.",
+)
+@click.option(
+    "--runtime",
+    type=click.Choice(["blocking", "asyncio"]),
+    default="blocking",
+    help="Run the session as blocking steps, or as asyncio tasks.",
+)
+@click.option(
+    "--record",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Record the game, to replay with `word_practice replay`.",
+)
+@_strategy_option
+@_script_options
+def spell(
+    data_file,
+    inv_temp,
+    inv_grade_temp,
+    spoken,
+    target_accuracy,
+    game,
+    audio_cache,
+    queued_speech,
+    runtime,
+    record,
+    strategy,
+    script,
+    seed,
+    save_every,
+):
     """Tests spelling"""
+    if seed is not None:
+        from sight_words import ml
+
+        ml.rng.seed(seed)
+    if script:
+        from sight_words import data_utils, headless
+
+        data_file = data_utils.DatasetFile(pathlib.Path(data_file))
+        _run_headless(
+            headless.spell(
+                data_file.load(),
+                headless.parse_answers(script),
+                data_file=data_file,
+                inv_temp=inv_temp,
+                inv_grade_temp=inv_grade_temp,
+                target_accuracy=target_accuracy,
+                save_every=save_every,
+                strategy=strategy,
+            )
+        )
+        return
+    if runtime == "asyncio":
+        import asyncio
+
+        from sight_words import runtime as runtime_module
+
+        asyncio.run(
+            runtime_module.spell(
+                pathlib.Path(data_file),
+                inv_temp=inv_temp,
+                inv_grade_temp=inv_grade_temp,
+                spoken=spoken,
+                target_accuracy=target_accuracy,
+                game=game,
+                audio_cache=audio_cache,
+                record=pathlib.Path(record) if record and game else None,
+                strategy=strategy,
+            )
+        )
+        return
+
+    import time
+
+    import blessed
+
+    from sight_words import data_utils, io, ml, profiling, scheduling, session
+    from sight_words import game as game_module
+    from sight_words.games import tetris
+
     if spoken:
-        engine = io.OutputEngine(output_type=io.OutputType.SPOKEN)
+        engine = io.OutputEngine(
+            output_type=io.OutputType.SPOKEN,
+            audio_cache=audio_cache,
+            blocking=not queued_speech,
+        )
     else:
         engine = io.OutputEngine(output_type=io.OutputType.SILENT)
-    data_file = pathlib.Path(data_file)
-    dataset = data_utils.load_dataset(data_file)
+    data_file = data_utils.DatasetFile(pathlib.Path(data_file))
+    dataset = data_file.load()
     text = data_utils.get_indexed_sentences(*dataset.text)
+    # Choose context sentences no harder than the student's grade.
+    student_grade = max(datum.grade for datum in dataset.spelling_words.values())
 
     game_state = None
-    hook = None
-    if game:
+    recorder = None
+    if game and record:
+        from sight_words import recording
+
+        recorder = recording.Recorder.open(pathlib.Path(record), "tetris")
+        game_state = recorder.new_game()
+    elif game:
         game_state = tetris.Tetris()
+    state = session.SessionState(dataset, game=game_state)
+    scheduler = scheduling.scheduler_for(strategy)
     ui = blessed.Terminal()
 
-    # Use a jeffrey's prior:
-    session_successes = 0.5
-    session_failures = 0.5
-
     quit_ = False
-    event = None
     while not quit_:
-        if game_state:
-            hook = game_state.play(ui)
-        if not isinstance(hook, game_module.GameOver):
+        if scheduler:
+            word = scheduler.choose_word(state.dataset.spelling_words)
+        else:
             word = ml.choose_word_for_target_accuracy(
-                dataset.spelling_words,
+                state.dataset.spelling_words,
                 inv_grade_temp=inv_grade_temp,
                 inv_temp=inv_temp,
                 target_accuracy=target_accuracy,
-                session_successes=session_successes,
-                session_failures=session_failures,
+                session_successes=state.session_successes,
+                session_failures=state.session_failures,
             )
-            sentence = text.get_sentence(word)
+        with profiling.phase("get_sentence"):
+            sentence = text.get_sentence(word, grade=student_grade)
 
-            phrase = f"Please spell {word}"
-            if sentence:
-                phrase += f", as in: {sentence}. {word}."
+        phrase = f"Please spell {word}"
+        if sentence:
+            phrase += f", as in: {sentence}. {word}."
+        correction = f"Sorry! The correct spelling is: {', '.join(word)}."
+        # Synthesize the phrases while the game is played.
+        engine.presynthesize(phrase, "Correct!", correction)
 
+        if recorder:
+            state.game_played(
+                game_module.run_blocking(
+                    recorder.record_loop(state.game.game_loop(ui), ui), ui
+                )
+            )
+        elif state.game:
+            state.game_played(state.game.play(ui))
+        if not state.game_over:
+            asked = time.monotonic()
             attempt = r"\repeat"
+            prompt = None
             while attempt == r"\repeat":
-                engine.output(phrase)
+                if prompt:
+                    engine.cancel(prompt)
+                prompt = engine.output(phrase)
                 io.flush_input()
                 attempt = input(r"spelling (or \quit or \repeat): ")
+            response_time = time.monotonic() - asked
+            # Stop reading the prompt once the child has answered (but not the
+            # feedback on the last answer).
+            engine.cancel(prompt)
             if attempt == r"\quit":
                 click.secho("Quitting...")
                 quit_ = True
             else:
-                if attempt.lower().strip() == word.lower().strip():
-                    success = 1
-                    failure = 0
+                success = attempt.lower().strip() == word.lower().strip()
+                if success:
                     engine.output("Correct!")
-                    if game:
-                        event = game_module.SightWordTestEvent(
-                            word, 1, game_module.TestQuestionResult.PASS
-                        )
+                    result = game_module.TestQuestionResult.PASS
                 else:
-                    success = 0
-                    failure = 1
                     click.secho(f"{word} is the correct spelling.")
                     if spoken:
-                        engine.output(
-                            f"Sorry! The correct spelling is: {', '.join(word)}."
-                        )
-                    if game:
-                        event = game_module.SightWordTestEvent(
-                            word, 1, game_module.TestQuestionResult.FAIL
-                        )
-                session_successes += success
-                session_failures += failure
-                dataset = data_utils.update_dataset(
-                    dataset, spelling_word=word, successes=success, failures=failure
-                )
-                if hook and event:
-                    game_state = hook(event)
+                        engine.output(correction)
+                    result = game_module.TestQuestionResult.FAIL
+                state.record_answer(word, success, response_time=response_time)
+                event = game_module.SightWordTestEvent(word, 1, result)
+                if state.resume_game(event) and recorder:
+                    recorder.record_event(event)
         else:
             quit_ = True
-        data_utils.save_dataset(data_file, dataset)
+        data_file.save(state.dataset)
+    engine.close()
+    if recorder:
+        recorder.close()
+
+
+@main.command("replay")
+@click.argument("recording_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--realtime", is_flag=True, help="Replay at the recorded pace (by default, ASAP)."
+)
+@click.option("--speed", type=float, default=1.0, help="With --realtime: speed it up.")
+@click.option("--show", is_flag=True, help="Draw the game on the terminal.")
+def replay(recording_file, realtime, speed, show):
+    """Replays a game recorded by `spell --record`, reporting its throughput"""
+    import sys
+
+    from sight_words import recording
+
+    with open(recording_file, "rb") as f:
+        data = f.read()
+    try:
+        result = recording.replay(
+            data, speed=speed if realtime else None, stream=sys.stdout if show else None
+        )
+    except recording.ReplayError as e:
+        raise click.ClickException(str(e)) from e
+    ending = f", game over (score {result.game_over.score})" if result.game_over else ""
+    click.secho(
+        f"Replayed {result.game_name} (seed {result.seed}): {result.n_games} games, "
+        f"{result.n_events} words, {result.n_inputs} inputs{ending}."
+    )
+    if not show:
+        click.secho(f"Drew {result.n_chars_written} characters.")
+    click.secho(
+        f"{result.seconds:.3f}s: {result.n_inputs / max(result.seconds, 1e-9):.0f} "
+        f"inputs/s."
+    )
 
 
 @main.command("report")
 @click.argument("data_file", type=click.Path())
 @click.option("--n_worst", type=int, default=10)
-def report(data_file, n_worst):
+@click.option(
+    "--recompute",
+    is_flag=True,
+    help="Recompute the stored summaries from the event logs (and store them).",
+)
+def report(data_file, n_worst, recompute):
     """Get a performance report"""
+    import dataclasses
+
+    from sight_words import data_utils, reports, summaries
+
     data_file = pathlib.Path(data_file)
-    dataset = data_utils.load_dataset(data_file)
+    if recompute:
+
+        def recompute_summaries(dataset):
+            return dataclasses.replace(
+                dataset,
+                spelling_summary=summaries.summarize(dataset.spelling_words),
+                reading_summary=summaries.summarize(dataset.reading_words),
+            )
+
+        dataset = data_utils.DatasetFile(data_file).update(recompute_summaries)
+    else:
+        dataset = data_utils.load_dataset(data_file)
 
     click.secho("Spelling Grades:")
-    for grade, mark in reports.marks_by_grade(dataset.spelling_words).items():
+    marks = reports.summary_marks_by_grade(
+        dataset.spelling_words, dataset.spelling_summary
+    )
+    for grade, mark in marks.items():
         click.secho(f"\t{mark}% in Grade {grade}")
     click.secho("Reading Grades:")
-    for grade, mark in reports.marks_by_grade(dataset.reading_words).items():
+    marks = reports.summary_marks_by_grade(
+        dataset.reading_words, dataset.reading_summary
+    )
+    for grade, mark in marks.items():
         click.secho(f"\t{mark}% in Grade {grade}")
 
     click.secho("\n\nSpelling challenge words:")
-    sorted_marks = reports.marks_by_word(dataset.spelling_words).items()
-    for word, score in itertools.islice(sorted_marks, n_worst):
+    marks = reports.summary_worst_words(
+        dataset.spelling_words, dataset.spelling_summary, n_worst
+    )
+    for word, score in marks.items():
         click.secho(f"\t{word} (misspelt {100-score}%)")
 
     click.secho("\n\nReading challenge words:")
-    sorted_marks = reports.marks_by_word(dataset.reading_words).items()
-    for word, score in itertools.islice(sorted_marks, n_worst):
+    marks = reports.summary_worst_words(
+        dataset.reading_words, dataset.reading_summary, n_worst
+    )
+    for word, score in marks.items():
         click.secho(f"\t{word} (misspelt {100-score}%)")
 
 
+@main.command("class_report")
+@click.argument("data_files", nargs=-1, required=True)
+@click.option("--n_worst", type=int, default=10)
+@click.option("--n_hardest", type=int, default=10)
+@click.option(
+    "--format",
+    "format_",
+    type=click.Choice(["json", "csv"]),
+    default="json",
+    help="CSV has a row per student; JSON also has the class-wide hardest words.",
+)
+@click.option("--output", type=click.File("w"), default="-")
+@click.option("--workers", type=int, default=None, help="Defaults to the CPU count.")
+def class_report(data_files, n_worst, n_hardest, format_, output, workers):
+    """
+    Get a report on a class, from DATA_FILES (data files, directories of them,
+    or glob patterns)
+    """
+    import json
+
+    from sight_words import reports
+
+    try:
+        data_files = reports.find_data_files(data_files)
+    except FileNotFoundError as e:
+        raise click.ClickException(str(e)) from e
+    report = reports.class_report(
+        data_files, n_worst=n_worst, n_hardest=n_hardest, max_workers=workers
+    )
+    if format_ == "json":
+        json.dump(report, output, indent=2)
+        output.write("\n")
+    else:
+        reports.write_class_report_csv(report, output)
+    for error in report["errors"]:
+        click.secho(f"Skipped {error['file']}: {error['error']}", fg="red", err=True)
+
+
+@main.command("analytics")
+@click.argument("data_files", nargs=-1, required=True)
+@click.option("--kind", type=click.Choice(["spelling", "reading"]), default="spelling")
+@click.option(
+    "--by",
+    type=click.Choice(["grade", "word"]),
+    default="grade",
+    help="Group the learning curves by grade, or by word.",
+)
+@click.option("--max_attempts", type=int, default=10)
+@click.option("--output", type=click.File("w"), default="-")
+def analytics(data_files, kind, by, max_attempts, output):
+    """
+    Get the learning curves, retention and sessions (as JSON) of the students in
+    DATA_FILES (data files, directories of them, or glob patterns)
+    """
+    import json
+
+    from sight_words import analytics as analytics_module
+    from sight_words import data_utils, reports
+
+    try:
+        data_files = reports.find_data_files(data_files)
+    except FileNotFoundError as e:
+        raise click.ClickException(str(e)) from e
+    datasets = {str(path): data_utils.load_dataset(path) for path in data_files}
+    report = analytics_module.report(
+        datasets, kind=kind, by=by, max_attempts=max_attempts
+    )
+    json.dump(report, output, indent=2)
+    output.write("\n")
+
+
 if __name__ == "__main__":
     main()
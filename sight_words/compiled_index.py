@@ -0,0 +1,259 @@
+"""
+A compiled sentence index which can grow incrementally.
+
+A compiled index is a directory holding a manifest and a list of segments. Each
+segment holds the sentences of the texts appended to it, along with the
+postings, stem postings and difficulty rankings for those sentences. Appending
+a text writes a single new segment, and compaction merges the accumulated
+segments into one.
+"""
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+import contextlib
+import dataclasses
+import os
+import pathlib
+import subprocess
+import sys
+import threading
+
+import yaml
+
+from sight_words import cache
+from sight_words import data_utils
+from sight_words import stemming
+
+MANIFEST_FILE = "manifest.yml"
+INDEX_SUFFIX = ".index"
+MAX_SEGMENTS = 8
+"""The number of segments after which a compaction is worthwhile"""
+
+# Serializes the manifest updates of appends and compactions in this process (the
+# manifest's file lock serializes them across processes, where it's supported).
+_MANIFEST_LOCK = threading.Lock()
+
+
+def merge_segments(
+    segments: List[data_utils.SentenceIndex],
+) -> data_utils.SentenceIndex:
+    """
+    Merges segments into one, appending sentences, extending the (stem)
+    postings and merging the difficulty rankings
+    """
+    sentences = []
+    index: Dict[str, List[int]] = {}
+    stem_index: Dict[str, List[int]] = {}
+    rankings: Dict[str, List[Tuple[List[float], List[int]]]] = {}
+    for segment in segments:
+        offset = len(sentences)
+        sentences.extend(segment.sentences)
+        for word, ixs in segment.index.items():
+            index.setdefault(word, []).extend(ix + offset for ix in ixs)
+        for stem, ixs in segment.stem_index.items():
+            stem_index.setdefault(stem, []).extend(ix + offset for ix in ixs)
+        for word, ixs in segment.ranked_index.items():
+            rankings.setdefault(word, []).append(
+                (segment.ranked_difficulty[word], [ix + offset for ix in ixs])
+            )
+    ranked_index = {}
+    ranked_difficulty = {}
+    for word, word_rankings in rankings.items():
+        difficulties, ixs = data_utils.merge_rankings(word_rankings)
+        ranked_index[word] = ixs
+        ranked_difficulty[word] = difficulties
+    return data_utils.SentenceIndex(
+        sentences=sentences,
+        index=index,
+        ranked_index=ranked_index,
+        ranked_difficulty=ranked_difficulty,
+        stem_index=stem_index,
+    )
+
+
+def _write_yaml(path: pathlib.Path, data):
+    """Atomically writes the data as yaml"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w") as f:
+        yaml.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_yaml(path: pathlib.Path):
+    """Reads yaml data"""
+    with path.open("r") as f:
+        return yaml.load(f, Loader=yaml.SafeLoader)
+
+
+@dataclasses.dataclass()
+class CompiledIndex:
+    """A sentence index stored as a directory of segments"""
+
+    path: pathlib.Path
+
+    @staticmethod
+    def named(name: str) -> "CompiledIndex":
+        """The compiled index with the given name"""
+        return CompiledIndex(cache.text_path(f"{name}{INDEX_SUFFIX}"))
+
+    @property
+    def manifest_path(self) -> pathlib.Path:
+        """The path to the manifest"""
+        return self.path / MANIFEST_FILE
+
+    def exists(self) -> bool:
+        """Checks whether the compiled index has been created"""
+        return self.manifest_path.exists()
+
+    def read_manifest(self) -> Dict:
+        """Reads the manifest, listing the segments"""
+        if not self.exists():
+            return {"segments": [], "next_segment": 0}
+        return _read_yaml(self.manifest_path)
+
+    def files(self) -> List[pathlib.Path]:
+        """The manifest and segment files"""
+        manifest = self.read_manifest()
+        return [self.manifest_path] + [
+            self.path / segment["file"] for segment in manifest["segments"]
+        ]
+
+    def read_segment(self, segment: Dict) -> data_utils.SentenceIndex:
+        """Reads a segment listed in the manifest"""
+        data = _read_yaml(self.path / segment["file"])
+        return data_utils.SentenceIndex(
+            sentences=data["sentences"],
+            index=data["index"],
+            ranked_index=data.get("ranked_index", {}),
+            ranked_difficulty=data.get("ranked_difficulty", {}),
+            stem_index=data_utils.stored_stems(
+                data.get("stemmer"), data.get("stem_index")
+            ),
+        ).precompute()
+
+    def _write_segment(
+        self, manifest: Dict, segment: data_utils.SentenceIndex, sources: List[str]
+    ) -> Dict:
+        """Writes a new segment file, and returns its manifest entry"""
+        file_name = f"segment-{manifest['next_segment']:06d}.yml"
+        manifest["next_segment"] += 1
+        _write_yaml(
+            self.path / file_name,
+            {
+                "sentences": segment.sentences,
+                "index": segment.index,
+                "ranked_index": segment.ranked_index,
+                "ranked_difficulty": segment.ranked_difficulty,
+                "stem_index": segment.stem_index,
+                "stemmer": stemming.VERSION,
+            },
+        )
+        return {
+            "file": file_name,
+            "sentences": len(segment.sentences),
+            "sources": sources,
+        }
+
+    @contextlib.contextmanager
+    def _lock_manifest(self):
+        """
+        Holds the lock on the manifest, so that appends and compactions (eg. in a
+        `word_practice compact` subprocess) don't lose each other's segments
+        """
+        with _MANIFEST_LOCK, data_utils.lock_data_file(self.manifest_path):
+            yield
+
+    def append(self, sentences: List[str], source: str = "") -> int:
+        """
+        Appends sentences to the index as a new segment, without touching the
+        existing segments.
+
+        Returns:
+            The number of segments in the index.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        segment = data_utils.SentenceIndex(
+            sentences=sentences, index=data_utils._get_lookup_dict(sentences)
+        ).precompute()
+        with self._lock_manifest():
+            manifest = self.read_manifest()
+            entry = self._write_segment(manifest, segment, [source])
+            manifest["segments"].append(entry)
+            _write_yaml(self.manifest_path, manifest)
+        return len(manifest["segments"])
+
+    def load(self) -> data_utils.SentenceIndex:
+        """Loads all the segments as a single sentence index"""
+        manifest = self.read_manifest()
+        segments = [self.read_segment(segment) for segment in manifest["segments"]]
+        if len(segments) == 1:
+            return segments[0]
+        return merge_segments(segments)
+
+    def compact(self) -> int:
+        """
+        Merges the accumulated segments into one. Segments appended while the
+        compaction runs are kept after the merged segment.
+
+        Returns:
+            The number of segments which were merged.
+        """
+        with self._lock_manifest():
+            manifest = self.read_manifest()
+        to_merge = manifest["segments"]
+        if len(to_merge) < 2:
+            return 0
+        try:
+            merged = merge_segments([self.read_segment(s) for s in to_merge])
+        except FileNotFoundError:
+            # Another compaction merged (and removed) the segments first.
+            return 0
+        sources = [source for s in to_merge for source in s["sources"]]
+        merged_files = {s["file"] for s in to_merge}
+        with self._lock_manifest():
+            manifest = self.read_manifest()
+            if not merged_files <= {s["file"] for s in manifest["segments"]}:
+                # Another compaction got there first.
+                return 0
+            entry = self._write_segment(manifest, merged, sources)
+            manifest["segments"] = [entry] + [
+                s for s in manifest["segments"] if s["file"] not in merged_files
+            ]
+            _write_yaml(self.manifest_path, manifest)
+        for file_name in merged_files:
+            (self.path / file_name).unlink()
+        return len(to_merge)
+
+    def compact_in_background(self) -> threading.Thread:
+        """Compacts the index on a background thread of this process"""
+        thread = threading.Thread(target=self.compact, name="compact-index")
+        thread.start()
+        return thread
+
+    def compact_in_subprocess(self) -> subprocess.Popen:
+        """Compacts the index in a detached process, which outlives this one"""
+        return subprocess.Popen(
+            [sys.executable, "-m", "sight_words.compiled_index", str(self.path)],
+            start_new_session=True,
+        )
+
+
+def add_text(
+    name: str, sentences: List[str], source: str = "", compact: Optional[bool] = None
+) -> CompiledIndex:
+    """
+    Appends a text to the named compiled index. By default, the index is
+    compacted in the background once it has accumulated `MAX_SEGMENTS` segments.
+    """
+    index = CompiledIndex.named(name)
+    n_segments = index.append(sentences, source=source)
+    if compact is None:
+        compact = n_segments >= MAX_SEGMENTS
+    if compact:
+        index.compact_in_background()
+    return index
+
+
+if __name__ == "__main__":
+    CompiledIndex(pathlib.Path(sys.argv[1])).compact()
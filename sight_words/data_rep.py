@@ -1,8 +1,16 @@
 """Datastructures and (de)serialization"""
+from typing import Any
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Dict
+from typing import Optional
+from typing import Tuple
+from typing import Union
 from typing import TYPE_CHECKING
+import array
 import dataclasses
+import math
 
 import yaml
 
@@ -16,8 +24,12 @@ else:
 DATASET_YAML_TAG = u"!Dataset"
 DATUM_YAML_TAG = u"!SightWordDatum"
 EVENT_YAML_TAG = u"!Event"
+EVENT_LOG_YAML_TAG = u"!EventLog"
+SUMMARY_YAML_TAG = u"!WordsSummary"
 
 EVENT_WINDOW = 10
+SCHEMA_VERSION = "3"
+"""Part of the cache key of loaded datasets; bump it when these classes change"""
 
 
 @dataclass(frozen=True)  # pylint: disable=used-before-assignment
@@ -26,11 +38,17 @@ class Event:
 
     success: float
     failure: float
+    # When it happened (seconds since the epoch), in which session, and how long
+    # the student took to answer (in seconds), if known.
+    time: Optional[float] = None
+    session: Optional[int] = None
+    response_time: Optional[float] = None
 
     @staticmethod
     def yaml_representer(dumper, data):
         """Represent an Event as yaml"""
-        return dumper.represent_mapping(EVENT_YAML_TAG, dataclasses.asdict(data))
+        value = {k: v for k, v in dataclasses.asdict(data).items() if v is not None}
+        return dumper.represent_mapping(EVENT_YAML_TAG, value)
 
     @staticmethod
     def yaml_constructor(loader, node):
@@ -39,22 +57,223 @@ class Event:
         return Event(**value)
 
 
+# The typecode, and the value of missing entries, of each column of an EventLog.
+_COLUMNS = {
+    "success": ("d", 0.0),
+    "failure": ("d", 0.0),
+    "time": ("d", math.nan),
+    "session": ("q", 0),
+    "response_time": ("d", math.nan),
+}
+_OPTIONAL_COLUMNS = ("time", "session", "response_time")
+
+
+class _EventMapping(dict):
+    """The fields of an event, represented as an Event in yaml"""
+
+
+class EventLog:
+    """
+    A sequence of practice events, stored as a column per field (arrays of floats,
+    or of ints for the sessions) rather than an object per event. The optional
+    columns are None if no event has them, and otherwise hold NaN (or 0, for
+    sessions) where an event doesn't. Logs are never modified: they are
+    concatenated with `+`, into a new log.
+    """
+
+    __slots__ = tuple(_COLUMNS)
+
+    def __init__(
+        self,
+        success: Iterable[float] = (),
+        failure: Iterable[float] = (),
+        time: Optional[Iterable[float]] = None,
+        session: Optional[Iterable[int]] = None,
+        response_time: Optional[Iterable[float]] = None,
+    ):
+        """Initializes the log from its columns, which must be of equal lengths."""
+        columns = {
+            "success": success,
+            "failure": failure,
+            "time": time,
+            "session": session,
+            "response_time": response_time,
+        }
+        for name, values in columns.items():
+            if values is not None:
+                values = array.array(_COLUMNS[name][0], values)
+            setattr(self, name, values)
+        for name in _OPTIONAL_COLUMNS + ("failure",):
+            values = getattr(self, name)
+            if values is not None and len(values) != len(self.success):
+                raise ValueError(f"The {name} column has {len(values)} events.")
+
+    @classmethod
+    def _from_columns(cls, columns: Dict[str, Optional[array.array]]) -> "EventLog":
+        """A log of the arrays, without copying them"""
+        log = cls.__new__(cls)
+        for name, values in columns.items():
+            setattr(log, name, values)
+        return log
+
+    @classmethod
+    def from_events(cls, events: Iterable[Union[Event, Dict[str, Any]]]) -> "EventLog":
+        """A log of the events"""
+        events = [e if isinstance(e, Event) else Event(**e) for e in events]
+        columns = {}
+        for name, (_, missing) in _COLUMNS.items():
+            values = [getattr(event, name) for event in events]
+            if name in _OPTIONAL_COLUMNS:
+                if all(value is None for value in values):
+                    continue
+                values = [missing if value is None else value for value in values]
+            columns[name] = values
+        return cls(**columns)
+
+    def column(self, name: str) -> array.array:
+        """A column, with the missing entries filled in"""
+        values = getattr(self, name)
+        if values is None:
+            typecode, missing = _COLUMNS[name]
+            values = array.array(typecode, [missing]) * len(self)
+        return values
+
+    def __len__(self) -> int:
+        return len(self.success)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._from_columns(
+                {
+                    name: None if values is None else values[index]
+                    for name, values in self.__getstate__().items()
+                }
+            )
+        fields = {"success": self.success[index], "failure": self.failure[index]}
+        for name in _OPTIONAL_COLUMNS:
+            values = getattr(self, name)
+            if values is None:
+                continue
+            # Missing values are NaN, which isn't equal to itself (or 0).
+            value = values[index]
+            if value == value != _COLUMNS[name][1]:
+                fields[name] = value
+        return Event(**fields)
+
+    def __iter__(self) -> Iterator[Event]:
+        return (self[i] for i in range(len(self)))
+
+    def __add__(self, other: Iterable[Event]) -> "EventLog":
+        if not isinstance(other, EventLog):
+            other = EventLog.from_events(other)
+        columns = {}
+        for name in _COLUMNS:
+            if getattr(self, name) is None and getattr(other, name) is None:
+                columns[name] = None
+            else:
+                columns[name] = self.column(name) + other.column(name)
+        return self._from_columns(columns)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, EventLog):
+            try:
+                return list(self) == list(other)
+            except TypeError:
+                return NotImplemented
+        if len(self) != len(other):
+            return False
+        for name in _COLUMNS:
+            values, other_values = getattr(self, name), getattr(other, name)
+            if values is None and other_values is None:
+                continue
+            values, other_values = self.column(name), other.column(name)
+            if values.tobytes() != other_values.tobytes() and not all(
+                # Missing (NaN) entries are equal.
+                a == b or a != a and b != b
+                for a, b in zip(values, other_values)
+            ):
+                return False
+        return True
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"EventLog.from_events({list(self)!r})"
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in _COLUMNS}
+
+    def __setstate__(self, state):
+        for name, values in state.items():
+            setattr(self, name, values)
+
+    @classmethod
+    def __get_validators__(cls):
+        # pydantic 1
+        yield cls.validate
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _source, _handler):
+        # pydantic 2
+        from pydantic_core import core_schema  # pylint: disable=import-outside-toplevel
+
+        return core_schema.no_info_plain_validator_function(cls.validate)
+
+    @classmethod
+    def validate(cls, value) -> "EventLog":
+        """Validates a log, converting lists of events"""
+        return value if isinstance(value, EventLog) else cls.from_events(value)
+
+    @staticmethod
+    def yaml_representer(dumper, data):
+        """
+        Represent an EventLog as yaml: logs without times, sessions or response
+        times keep their original format (a list of events), while other logs are
+        stored as columns.
+        """
+        if all(getattr(data, name) is None for name in _OPTIONAL_COLUMNS):
+            # As Event.yaml_representer would, without making the events.
+            return dumper.represent_list(
+                [
+                    _EventMapping({"success": success, "failure": failure})
+                    for success, failure in zip(data.success, data.failure)
+                ]
+            )
+        columns = [
+            (
+                dumper.represent_str(name),
+                dumper.represent_sequence(
+                    "tag:yaml.org,2002:seq", values.tolist(), flow_style=True
+                ),
+            )
+            for name, values in ((n, getattr(data, n)) for n in _COLUMNS)
+            if values is not None
+        ]
+        return yaml.MappingNode(EVENT_LOG_YAML_TAG, columns)
+
+    @staticmethod
+    def yaml_constructor(loader, node):
+        """Construct an EventLog from yaml"""
+        value = loader.construct_mapping(node, deep=True)
+        return EventLog(**value)
+
+
 @dataclass(frozen=True)  # pylint: disable=used-before-assignment
 class SightWordDatum:
     """The data associated to a sight word: the grade, and practice events"""
 
     grade: int
-    log: List[Event]
+    log: EventLog
 
     @property
     def successes(self) -> float:
         """The number of successes in the last `EVENT_WINDOW` events"""
-        return sum(event.success for event in self.log[-EVENT_WINDOW:])
+        return sum(self.log.success[-EVENT_WINDOW:])
 
     @property
     def failures(self) -> float:
         """The number of successes in the last `EVENT_WINDOW` events"""
-        return sum(event.failure for event in self.log[-EVENT_WINDOW:])
+        return sum(self.log.failure[-EVENT_WINDOW:])
 
     @staticmethod
     def yaml_representer(dumper, data):
@@ -75,6 +294,39 @@ class SightWordDatum:
         return self.successes / (self.successes + self.failures)
 
 
+@dataclass(frozen=True)  # pylint: disable=used-before-assignment
+class WordsSummary:
+    """
+    Summary statistics of a set of words, maintained as answers are recorded (see
+    `sight_words.summaries`): the successes and failures by grade, and the (mark,
+    word) of the words with the lowest marks, lowest first.
+    """
+
+    n_words: int
+    grade_successes: Dict[int, float]
+    grade_failures: Dict[int, float]
+    worst: List[Tuple[int, str]]
+
+    @staticmethod
+    def yaml_representer(dumper, data):
+        """Represent a WordsSummary as yaml"""
+        return dumper.represent_mapping(
+            SUMMARY_YAML_TAG,
+            {
+                "n_words": data.n_words,
+                "grade_successes": data.grade_successes,
+                "grade_failures": data.grade_failures,
+                "worst": [list(mark_and_word) for mark_and_word in data.worst],
+            },
+        )
+
+    @staticmethod
+    def yaml_constructor(loader, node):
+        """Construct a WordsSummary from yaml"""
+        value = loader.construct_mapping(node, deep=True)
+        return WordsSummary(**value)
+
+
 @dataclass(frozen=True)  # pylint: disable=used-before-assignment
 class DataSet:
     """A dataset representing a child's performance on a list of words"""
@@ -82,18 +334,22 @@ class DataSet:
     spelling_words: Dict[str, SightWordDatum]
     reading_words: Dict[str, SightWordDatum]
     text: List[str] = dataclasses.field(default_factory=lambda: ["p_and_p"])
+    spelling_summary: Optional[WordsSummary] = None
+    reading_summary: Optional[WordsSummary] = None
 
     @staticmethod
     def yaml_representer(dumper, data):
         """Represent a dataset as yaml"""
-        return dumper.represent_mapping(
-            DATASET_YAML_TAG,
-            {
-                "spelling_words": data.spelling_words,
-                "reading_words": data.reading_words,
-                "text": data.text,
-            },
-        )
+        value = {
+            "spelling_words": data.spelling_words,
+            "reading_words": data.reading_words,
+            "text": data.text,
+        }
+        # Datasets without summaries keep their original format.
+        for key in ("spelling_summary", "reading_summary"):
+            if getattr(data, key) is not None:
+                value[key] = getattr(data, key)
+        return dumper.represent_mapping(DATASET_YAML_TAG, value)
 
     @staticmethod
     def yaml_constructor(loader, node):
@@ -105,8 +361,17 @@ class DataSet:
 yaml.add_representer(Event, Event.yaml_representer)
 yaml.add_constructor(EVENT_YAML_TAG, Event.yaml_constructor)
 
+yaml.add_representer(
+    _EventMapping, lambda dumper, data: dumper.represent_mapping(EVENT_YAML_TAG, data)
+)
+yaml.add_representer(EventLog, EventLog.yaml_representer)
+yaml.add_constructor(EVENT_LOG_YAML_TAG, EventLog.yaml_constructor)
+
 yaml.add_representer(SightWordDatum, SightWordDatum.yaml_representer)
 yaml.add_constructor(DATUM_YAML_TAG, SightWordDatum.yaml_constructor)
 
+yaml.add_representer(WordsSummary, WordsSummary.yaml_representer)
+yaml.add_constructor(SUMMARY_YAML_TAG, WordsSummary.yaml_constructor)
+
 yaml.add_representer(DataSet, DataSet.yaml_representer)
 yaml.add_constructor(DATASET_YAML_TAG, DataSet.yaml_constructor)
@@ -1,19 +1,31 @@
 """Utils for working with data files"""
+from typing import Callable
 from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import TYPE_CHECKING
 import abc
+import bisect
 import collections
+import contextlib
 import dataclasses
+import functools
+import heapq
+import os
 import random
 import re
 import pathlib
+import stat
 
-import nltk
-import pkg_resources
 import yaml
 
+import sight_words.cache as cache
 import sight_words.data_rep as data_rep
+import sight_words.profiling as profiling
+import sight_words.segmenters as segmenters
+import sight_words.stemming as stemming
+import sight_words.summaries as summaries
 
 
 if TYPE_CHECKING:
@@ -22,8 +34,20 @@ if TYPE_CHECKING:
 else:
     from pydantic.dataclasses import dataclass
 
+try:
+    import fcntl
+except ImportError:
+    # Data files aren't locked on windows.
+    fcntl = None
+
 PRIOR_FAILURES = 0.5
 PRIOR_SUCCESSES = 0.5
+WORDS_PER_GRADE = 10
+"""Sentence length (in words) which adds a grade to a sentence's difficulty"""
+FALLBACK_SENTENCES = 5
+"""The number of easiest sentences to choose from, when none are easy enough"""
+# Texts (and their indices and rankings) are large, so use libyaml if it's there.
+_TEXT_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def load_word_file(file_path):
@@ -35,10 +59,17 @@ def load_word_file(file_path):
 
 def load_sight_words():
     """Loads the sight words from the raw data"""
-    full_path_str = pkg_resources.resource_filename(
-        "sight_words", "data/sight_words.yml"
-    )
-    return load_word_file(full_path_str)
+    return load_word_file(cache.package_data_dir() / "sight_words.yml")
+
+
+@functools.lru_cache(maxsize=1)
+def load_word_grades() -> Dict[str, int]:
+    """Maps each (lowercase) sight word to the lowest grade it appears in"""
+    word_grades = {}
+    for grade, words in sorted(load_sight_words().items(), reverse=True):
+        for word in words:
+            word_grades[word.lower()] = grade
+    return word_grades
 
 
 def build_new_raw_dataset(
@@ -73,27 +104,228 @@ def build_new_dataset(
     return build_new_raw_dataset(sight_words, max_grade, past_grade_success_incr)
 
 
+FileStamp = Tuple[int, int, int]
+"""The inode, modification time and size of a file, which change when it's saved"""
+
+
+@contextlib.contextmanager
+def lock_data_file(file_path: pathlib.Path):
+    """Holds an exclusive lock on a data file, through a `.lock` file beside it"""
+    if fcntl is None:
+        yield
+        return
+    lock_path = file_path.with_name(file_path.name + ".lock")
+    with lock_path.open("a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _stamp(stat: os.stat_result) -> FileStamp:
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _write_dataset(file_path: pathlib.Path, dataset: data_rep.DataSet) -> FileStamp:
+    """
+    Writes the dataset to a temporary file, and moves it into place, so the file
+    is never seen half written. Returns the stamp of the new file.
+    """
+    # Unlike `tempfile.mkstemp` (which makes files only their owner can read), the
+    # new file gets the mode of the one it replaces, or else the umask's, so other
+    # users (eg. a teacher's reports) can still read it.
+    tmp_path = file_path.with_name(f"{file_path.name}.{os.urandom(8).hex()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "w") as f:
+            yaml.dump(dataset, f)
+        with contextlib.suppress(FileNotFoundError):
+            os.chmod(tmp_path, stat.S_IMODE(file_path.stat().st_mode))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return _stamp(file_path.stat())
+
+
+def _read_dataset(file_path: pathlib.Path) -> Tuple[data_rep.DataSet, FileStamp]:
+    """Reads the dataset (from the cache, if the file is unchanged), and its stamp"""
+    with file_path.open("rb") as f:
+        stamp = _stamp(os.fstat(f.fileno()))
+        blob = f.read()
+    dataset = cache.ArtifactCache.default().get_or_build(
+        "dataset",
+        # Pickles skip validation, so a dataset cached by an older version of the
+        # classes would be loaded as it was (eg. with its logs as lists).
+        cache.content_key(data_rep.SCHEMA_VERSION, blob),
+        lambda: yaml.load(blob, Loader=yaml.FullLoader),
+    )
+    return dataset, stamp
+
+
+@profiling.timed("save_dataset")
 def save_dataset(file_path: pathlib.Path, dataset: data_rep.DataSet):
-    """Save the dataset"""
-    with file_path.open("w") as f:
-        yaml.dump(dataset, f)
+    """
+    Save the dataset, overwriting the file. Use a `DatasetFile` to keep the
+    changes other sessions make to the file.
+    """
+    with lock_data_file(file_path):
+        _write_dataset(file_path, dataset)
 
 
+@profiling.timed("load_dataset")
 def load_dataset(file_path: pathlib.Path) -> data_rep.DataSet:
-    """Save the dataset"""
-    with file_path.open("r") as f:
-        dataset = yaml.load(f, Loader=yaml.FullLoader)
+    """Load the dataset, reusing the cached copy if the file is unchanged"""
+    return _read_dataset(file_path)[0]
+
+
+def merge_new_events(
+    dataset: data_rep.DataSet, base: data_rep.DataSet, new: data_rep.DataSet
+) -> data_rep.DataSet:
+    """
+    Appends the events `new` has recorded since `base` (an earlier version of it)
+    to the words of `dataset` (eg. the file, as another session saved it). Words
+    only `new` has are added.
+    """
+    for attr in ("spelling_words", "reading_words"):
+        base_words = getattr(base, attr)
+        words = getattr(dataset, attr)
+        new_words = {}
+        new_events = {}
+        for word, datum in getattr(new, attr).items():
+            base_datum = base_words.get(word)
+            # Data are replaced when they change, so most are skipped here.
+            if datum is base_datum:
+                continue
+            if word not in words:
+                new_words[word] = datum
+                continue
+            # A word both sessions added keeps one prior (the file's) event.
+            n_base_events = len(base_datum.log) if base_datum else 1
+            if len(datum.log) > n_base_events:
+                new_events[word] = datum.log[n_base_events:]
+        if new_words or new_events:
+            dataset = _append_events(dataset, attr, new_events, new_words)
     return dataset
 
 
+def _append_events(
+    dataset: data_rep.DataSet,
+    attr: str,
+    new_events: Dict[str, data_rep.EventLog],
+    new_words: Dict[str, data_rep.SightWordDatum],
+) -> data_rep.DataSet:
+    """Appends events to the logs of some words, and adds new words"""
+    words = {**getattr(dataset, attr), **new_words}
+    summary_attr = attr.replace("_words", "_summary")
+    summary = getattr(dataset, summary_attr)
+    summary = None if new_words or summary is None else summary
+    for word, events in new_events.items():
+        old_data = words[word]
+        new_data = dataclasses.replace(old_data, log=old_data.log + events)
+        words[word] = new_data
+        if summary is not None:
+            summary = summaries.update_summary(
+                summary, word, old_data, new_data, words
+            )
+    if summary is None:
+        summary = summaries.summarize(words)
+    return dataclasses.replace(dataset, **{attr: words, summary_attr: summary})
+
+
+class DatasetFile:
+    """
+    A student's data file, which several sessions may update at once (eg. `read`
+    in one terminal and `spell` in another).
+
+    Saves are made under the file's lock. If another session has saved the file
+    since this one loaded (or last saved) it, this session's new events are
+    appended to the words of the file, rather than overwriting its events.
+    Other changes (eg. adding a grade) are made with `update`, which edits the
+    file under its lock; sessions then append their new events to the edited file.
+    """
+
+    def __init__(self, file_path: pathlib.Path):
+        """Initializes the data file; `load` it to merge saves with other sessions'."""
+        self.file_path = file_path
+        # The session's dataset when it was last loaded or saved, and the file's
+        # dataset and stamp then (they differ once other sessions' events are in).
+        self._base: Optional[data_rep.DataSet] = None
+        self._on_disk: Optional[data_rep.DataSet] = None
+        self._stamp: Optional[FileStamp] = None
+
+    @profiling.timed("load_dataset")
+    def load(self) -> data_rep.DataSet:
+        """Loads the dataset"""
+        dataset, self._stamp = _read_dataset(self.file_path)
+        self._base = self._on_disk = dataset
+        return dataset
+
+    @profiling.timed("save_dataset")
+    def save(self, dataset: data_rep.DataSet) -> data_rep.DataSet:
+        """
+        Saves the dataset (a later version of the one loaded), keeping any events
+        other sessions have saved.
+
+        Returns:
+            The saved dataset.
+        """
+        with lock_data_file(self.file_path):
+            on_disk = self._on_disk
+            try:
+                stamp: Optional[FileStamp] = _stamp(self.file_path.stat())
+            except FileNotFoundError:
+                stamp = on_disk = None
+            if on_disk is not None and stamp != self._stamp:
+                on_disk, _ = _read_dataset(self.file_path)
+            if on_disk is None or on_disk is self._base:
+                merged = dataset
+            else:
+                merged = merge_new_events(on_disk, self._base, dataset)
+            self._stamp = _write_dataset(self.file_path, merged)
+        self._base = dataset
+        self._on_disk = merged
+        return merged
+
+    @profiling.timed("save_dataset")
+    def update(
+        self, edit: Callable[[data_rep.DataSet], Optional[data_rep.DataSet]]
+    ) -> data_rep.DataSet:
+        """
+        Edits the dataset as last saved, holding the file's lock so no session's
+        events are lost.
+
+        Args:
+            edit: Returns the edited dataset, or None to leave the file unchanged.
+
+        Returns:
+            The saved dataset.
+        """
+        with lock_data_file(self.file_path):
+            dataset, self._stamp = _read_dataset(self.file_path)
+            edited = edit(dataset)
+            if edited is not None:
+                self._stamp = _write_dataset(self.file_path, edited)
+                dataset = edited
+        self._base = self._on_disk = dataset
+        return dataset
+
+
 def update_dataset(
     dataset: data_rep.DataSet,
     successes=0,
     failures=0,
     spelling_word=None,
     reading_word=None,
+    time: Optional[float] = None,
+    session: Optional[int] = None,
+    response_time: Optional[float] = None,
 ) -> data_rep.DataSet:
-    """Updates a dataset with new succeses/failures"""
+    """
+    Updates a dataset with new succeses/failures, optionally recording when they
+    happened, in which session, and how long the student took to answer
+    """
     data_to_update = []
     if spelling_word:
         data_to_update.append((spelling_word, "spelling_words"))
@@ -104,35 +336,139 @@ def update_dataset(
             raise ValueError(f"Word {word} not in the dataset.")
         new_words = getattr(dataset, attr).copy()
         old_data = getattr(dataset, attr)[word]
-        log = old_data.log + [data_rep.Event(success=successes, failure=failures)]
+        event = data_rep.Event(
+            success=successes,
+            failure=failures,
+            time=time,
+            session=session,
+            response_time=response_time,
+        )
+        log = old_data.log + [event]
         new_data = dataclasses.replace(old_data, log=log)
         new_words[word] = new_data
-        return dataclasses.replace(dataset, **{attr: new_words})
+        # Keep the stored summary up to date (computing it, for older datasets).
+        summary_attr = attr.replace("_words", "_summary")
+        summary = getattr(dataset, summary_attr) or summaries.summarize(
+            getattr(dataset, attr)
+        )
+        summary = summaries.update_summary(
+            summary, word, old_data, new_data, new_words
+        )
+        return dataclasses.replace(dataset, **{attr: new_words, summary_attr: summary})
+
+
+SentenceMatches = Tuple[List[str], List[int], Optional[List[float]]]
+"""
+The sentences of an index, the indices of those matching a word (easiest first,
+if they're ranked), and their difficulties (if they're ranked)
+"""
+
+
+def choose_sentence(matches: List[SentenceMatches], grade: Optional[float]) -> str:
+    """
+    Chooses one of the matching sentences at random: one no harder than the grade
+    (sentences which aren't ranked count as easy enough), or if there are none,
+    one of the `FALLBACK_SENTENCES` easiest.
+    """
+    n_easy = []
+    for _, ixs, difficulties in matches:
+        if grade is None or difficulties is None:
+            n_easy.append(len(ixs))
+        else:
+            n_easy.append(bisect.bisect_right(difficulties, grade))
+    total = sum(n_easy)
+    if total:
+        choice = random.randrange(total)
+        for (sentences, ixs, _), n in zip(matches, n_easy):
+            if choice < n:
+                return sentences[ixs[choice]]
+            choice -= n
+    # None are easy enough, so every match is ranked.
+    easiest = heapq.nsmallest(
+        FALLBACK_SENTENCES,
+        (
+            (difficulty, i, ix)
+            for i, (_, ixs, difficulties) in enumerate(matches)
+            for difficulty, ix in zip(difficulties or [], ixs[:FALLBACK_SENTENCES])
+        ),
+    )
+    if not easiest:
+        return ""
+    _, i, ix = random.choice(easiest)
+    return matches[i][0][ix]
 
 
 class AbstractSentenceIndex(abc.ABC):
     """An Abstract sentence index"""
 
     @abc.abstractmethod
-    def get_sentence(self, word) -> str:
-        """Returns a sentence using that word"""
+    def matches(self, word: str, stems: bool = False) -> List[SentenceMatches]:
+        """
+        The sentences with the (lowercase) word, or with its inflections, in each
+        index
+        """
         raise NotImplementedError
 
+    def get_sentence(self, word, grade: Optional[float] = None) -> str:
+        """
+        Returns a sentence using that word. If a grade is given, the sentence
+        should be no harder than that grade, where possible.
+        """
+        key = word.lower()
+        # Inflections are only used if no index has the word itself.
+        matches = self.matches(key) or self.matches(key, stems=True)
+        if grade is None:
+            # Any sentence will do: take the first index's.
+            matches = matches[:1]
+        return choose_sentence(matches, grade)
+
 
 @dataclass()  # pylint: disable=used-before-assignment
 class SentenceIndex(AbstractSentenceIndex):
-    """An index of sentences"""
+    """
+    An index of sentences. The ranked index lists the sentences for each word
+    from easiest to hardest, with the corresponding difficulties. The stem index
+    holds the sentences for each inflection family, and is only consulted for
+    words with no sentences of their own (in any index merged with this one).
+    """
 
     sentences: List[str]
     index: Dict[str, List[int]]
-
-    def get_sentence(self, word) -> str:
-        """Returns a sentence using that word"""
-        ixs = self.index.get(word.lower(), [])
-        if ixs:
-            ix = random.choice(ixs)
-            return self.sentences[ix]
-        return ""
+    ranked_index: Dict[str, List[int]] = dataclasses.field(default_factory=dict)
+    ranked_difficulty: Dict[str, List[float]] = dataclasses.field(default_factory=dict)
+    stem_index: Dict[str, List[int]] = dataclasses.field(default_factory=dict)
+
+    def matches(self, word: str, stems: bool = False) -> List[SentenceMatches]:
+        """The sentences with the word (ranked, if they are), or its inflections"""
+        if stems:
+            ixs = self.stem_index.get(stemming.stem(word), [])
+        elif word in self.ranked_index:
+            ixs = self.ranked_index[word]
+            return [(self.sentences, ixs, self.ranked_difficulty[word])]
+        else:
+            ixs = self.index.get(word, [])
+        return [(self.sentences, ixs, None)] if ixs else []
+
+    def precompute(self) -> "SentenceIndex":
+        """
+        Returns the index with its ranking and stem index, computing any which
+        are missing
+        """
+        if not self.index:
+            return self
+        precomputed = self
+        if not self.ranked_index:
+            ranked_index, ranked_difficulty = rank_sentences(self.sentences, self.index)
+            precomputed = dataclasses.replace(
+                precomputed,
+                ranked_index=ranked_index,
+                ranked_difficulty=ranked_difficulty,
+            )
+        if not self.stem_index:
+            precomputed = dataclasses.replace(
+                precomputed, stem_index=_get_stem_dict(self.index)
+            )
+        return precomputed
 
 
 @dataclasses.dataclass()
@@ -141,69 +477,238 @@ class MergedIndex(AbstractSentenceIndex):
 
     components: List[AbstractSentenceIndex]
 
-    def get_sentence(self, word) -> str:
-        """Returns a sentence using that word"""
-        sentence = ""
-        for index in self.components:
-            sentence = index.get_sentence(word)
-            if sentence:
-                break
-        return sentence
+    def matches(self, word: str, stems: bool = False) -> List[SentenceMatches]:
+        """The sentences matching the word, in each component"""
+        return [
+            match
+            for index in self.components
+            for match in index.matches(word, stems=stems)
+        ]
+
 
+def normalize_text(raw_text: str) -> str:
+    """Collapses whitespace and strips non-ascii characters from a raw text."""
+    text = re.sub(" +", " ", raw_text.replace("\n", " "))
+    return text.encode("ascii", "ignore").decode()
 
-def build_new_sentence_file(input_file, output_name, max_length=100):
+
+def parse_sentences(
+    input_file,
+    max_length=100,
+    segmenter: Optional[segmenters.AbstractSegmenter] = None,
+) -> List[str]:
     """Process a text file into a list of sentences."""
+    if segmenter is None:
+        segmenter = segmenters.PunktSegmenter()
     with open(input_file) as f:
-        text = re.sub(" +", " ", f.read().replace("\n", " "))
-    nltk.download("punkt")
-    sentences = nltk.sent_tokenize(text.encode("ascii", "ignore").decode())
-    sentences = [
-        s
-        for s in sentences
-        if s and len(s) < max_length and s[0] == s[0].upper() and " " in s
-    ]
+        text = normalize_text(f.read())
+
+    def parse():
+        sentences = segmenter.segment(text)
+        return [
+            s
+            for s in sentences
+            if s and len(s) < max_length and s[0] == s[0].upper() and " " in s
+        ]
+
+    key = cache.content_key(text, type(segmenter).__name__, str(max_length))
+    return cache.ArtifactCache.default().get_or_build("sentences", key, parse)
+
+
+def build_new_sentence_file(
+    input_file,
+    output_name,
+    max_length=100,
+    segmenter: Optional[segmenters.AbstractSegmenter] = None,
+):
+    """Process a text file into a list of sentences, and save it with its index."""
+    sentences = parse_sentences(input_file, max_length=max_length, segmenter=segmenter)
+    output_dir = cache.texts_dir()
+    output_dir.mkdir(parents=True, exist_ok=True)
 
     # Now save the sentences
-    output_file = pkg_resources.resource_filename(
-        "sight_words", f"data/{output_name}.yml"
-    )
+    output_file = output_dir / f"{output_name}.yml"
     with open(output_file, "w") as f:
         yaml.dump(sentences, f)
 
     # Now save the index
     lookup_dict = _get_lookup_dict(sentences)
-    output_file = pkg_resources.resource_filename(
-        "sight_words", f"data/{output_name}_index.yml"
-    )
+    output_file = output_dir / f"{output_name}_index.yml"
     with open(output_file, "w") as f:
         yaml.dump(lookup_dict, f)
 
+    # Now save the difficulty ranking
+    save_ranked_sentences(output_dir, output_name, sentences, lookup_dict)
+
+    # Now save the postings for each inflection family
+    output_file = output_dir / f"{output_name}_stems.yml"
+    with open(output_file, "w") as f:
+        yaml.dump(
+            {"stemmer": stemming.VERSION, "stems": _get_stem_dict(lookup_dict)}, f
+        )
+
+
+def save_ranked_sentences(
+    output_dir: pathlib.Path,
+    name: str,
+    sentences: List[str],
+    index: Dict[str, List[int]],
+):
+    """
+    Ranks the sentences of a text for each word, and saves the ranking beside the
+    text (the texts bundled with the package are ranked this way too)
+    """
+    ranked_index, ranked_difficulty = rank_sentences(sentences, index)
+    with open(output_dir / f"{name}_ranked.yml", "w") as f:
+        yaml.dump(
+            {"index": ranked_index, "difficulty": ranked_difficulty},
+            f,
+            default_flow_style=None,
+        )
+
+
+def _split_words(sentence: str) -> List[str]:
+    """Splits a sentence into lowercase words, dropping punctuation"""
+    return [w.lower() for w in re.sub(r"[^\w\s]", "", sentence).split()]
+
 
 def _get_lookup_dict(sentences: List[str]) -> Dict[str, List[int]]:
     lookup_dict = collections.defaultdict(list)
     for i, sentence in enumerate(sentences):
-        words = re.sub(r"[^\w\s]", "", sentence).split()
-        words = {w.lower() for w in words}
+        words = set(_split_words(sentence))
         for word in words:
             lookup_dict[word].append(i)
     return {w: l for w, l in lookup_dict.items()}
 
 
+def stored_stems(stemmer: Optional[str], stems: Optional[Dict]) -> Dict:
+    """
+    The stored postings for each inflection family, if they were made by this
+    version of the stemmer (otherwise none, so they are recomputed)
+    """
+    if stemmer != stemming.VERSION:
+        return {}
+    return stems or {}
+
+
+def _get_stem_dict(index: Dict[str, List[int]]) -> Dict[str, List[int]]:
+    """Groups the postings of each inflection family, keyed by their stem"""
+    stem_dict = collections.defaultdict(set)
+    for word, ixs in index.items():
+        stem_dict[stemming.stem(word)].update(ixs)
+    return {stem: sorted(ixs) for stem, ixs in stem_dict.items()}
+
+
+def sentence_difficulty(
+    words: List[str], target: str, word_grades: Dict[str, int]
+) -> float:
+    """
+    The difficulty of a sentence for a target word: the mean grade of the other
+    words (words which aren't sight words count as a grade above the hardest
+    sight word), plus a grade for every `WORDS_PER_GRADE` words.
+    """
+    unknown_grade = max(word_grades.values(), default=0) + 1
+    others = [word_grades.get(w, unknown_grade) for w in words if w != target]
+    mean_grade = sum(others) / len(others) if others else 0
+    return round(mean_grade + len(words) / WORDS_PER_GRADE, 2)
+
+
+def rank_sentences(
+    sentences: List[str],
+    index: Dict[str, List[int]],
+    word_grades: Optional[Dict[str, int]] = None,
+) -> Tuple[Dict[str, List[int]], Dict[str, List[float]]]:
+    """
+    Sorts the sentences for each word by their difficulty.
+
+    Returns:
+        The ranked index, and the corresponding difficulties.
+    """
+    if word_grades is None:
+        word_grades = load_word_grades()
+    split_sentences = {}
+    ranked_index = {}
+    ranked_difficulty = {}
+    for word, ixs in index.items():
+        ranked = []
+        for ix in ixs:
+            if ix not in split_sentences:
+                split_sentences[ix] = _split_words(sentences[ix])
+            difficulty = sentence_difficulty(split_sentences[ix], word, word_grades)
+            ranked.append((difficulty, ix))
+        ranked.sort()
+        ranked_index[word] = [ix for _, ix in ranked]
+        ranked_difficulty[word] = [difficulty for difficulty, _ in ranked]
+    return ranked_index, ranked_difficulty
+
+
+def merge_rankings(
+    rankings: List[Tuple[List[float], List[int]]]
+) -> Tuple[List[float], List[int]]:
+    """Merges several (difficulty, index) rankings, keeping them sorted"""
+    merged = list(heapq.merge(*(zip(*ranking) for ranking in rankings)))
+    return [difficulty for difficulty, _ in merged], [ix for _, ix in merged]
+
+
+def load_sentences(name: str) -> List[str]:
+    """Loads the sentences of a parsed text"""
+    full_path = cache.text_path(f"{name}.yml")
+    with full_path.open("r") as f:
+        return yaml.load(f, Loader=_TEXT_LOADER)
+
+
+def _load_text_data(name: str, kind: str):
+    """Loads the data of the given kind for a parsed text, if it exists"""
+    full_path = cache.text_path(f"{name}_{kind}.yml")
+    if not full_path.exists():
+        return None
+    with full_path.open("r") as f:
+        return yaml.load(f, Loader=_TEXT_LOADER)
+
+
+def _load_text_index(name: str) -> SentenceIndex:
+    """Loads the sentence index of a parsed text"""
+    sentences = load_sentences(name)
+    index = _load_text_data(name, "index")
+    ranked = _load_text_data(name, "ranked") or {}
+    stems = _load_text_data(name, "stems") or {}
+    # Texts parsed before rankings and stems existed (unlike the bundled texts)
+    # have them computed once, when they are loaded (and then cached).
+    return SentenceIndex(
+        sentences=sentences,
+        index=index,
+        ranked_index=ranked.get("index", {}),
+        ranked_difficulty=ranked.get("difficulty", {}),
+        stem_index=stored_stems(stems.get("stemmer"), stems.get("stems")),
+    ).precompute()
+
+
+@profiling.timed("get_indexed_sentences")
 def get_indexed_sentences(*names: str):
-    """Loads the sight words from the raw data"""
+    """
+    Loads the sentence indices of the parsed texts or compiled indices with the
+    given names, reusing cached copies of any which are unchanged
+    """
+    # pylint: disable=import-outside-toplevel
+    from sight_words import compiled_index
+
+    artifact_cache = cache.ArtifactCache.default()
+    # The rankings depend on the sight word grades, and the stems on the stemmer.
+    grades_path = cache.package_data_dir() / "sight_words.yml"
     components = []
     for name in names:
-        sentences_path = pkg_resources.resource_filename(
-            "sight_words", f"data/{name}.yml"
-        )
-        full_path = pathlib.Path(sentences_path)
-        with full_path.open("r") as f:
-            sentences = yaml.load(f, Loader=yaml.SafeLoader)
-        index_path = pkg_resources.resource_filename(
-            "sight_words", f"data/{name}_index.yml"
-        )
-        full_path = pathlib.Path(index_path)
-        with full_path.open("r") as f:
-            index = yaml.load(f, Loader=yaml.SafeLoader)
-        components.append(SentenceIndex(sentences=sentences, index=index))
+        compiled = compiled_index.CompiledIndex.named(name)
+        if compiled.exists():
+            key = cache.file_key([grades_path, *compiled.files()], stemming.VERSION)
+            component = artifact_cache.get_or_build("index", key, compiled.load)
+        else:
+            paths = [
+                cache.text_path(f"{name}{suffix}.yml")
+                for suffix in ("", "_index", "_ranked", "_stems")
+            ]
+            key = cache.file_key([grades_path, *paths], stemming.VERSION)
+            component = artifact_cache.get_or_build(
+                "index", key, functools.partial(_load_text_index, name)
+            )
+        components.append(component)
     return MergedIndex(components=components)
@@ -1,9 +1,14 @@
 """An abstraction for a game"""
+from typing import Generator
+from typing import Optional
 from typing import Union
 from typing import Callable
 from typing import TYPE_CHECKING
+import dataclasses
 import enum
 import abc
+import sys
+import time
 
 import blessed
 
@@ -48,6 +53,82 @@ class GameOver:
     score: int
 
 
+@dataclasses.dataclass(frozen=True)
+class WaitForKey:
+    """
+    Yielded by a game loop to wait for the next keystroke. The loop is sent the
+    keystroke, or None if there was none before the timeout (in seconds).
+    """
+
+    timeout: Optional[float]
+
+
+@dataclasses.dataclass(frozen=True)
+class Sleep:
+    """Yielded by a game loop to pause for some seconds"""
+
+    seconds: float
+
+
+GameLoop = Generator[
+    Union[WaitForKey, Sleep],
+    Optional[blessed.keyboard.Keystroke],
+    Union[GameOver, ResumeGameHook],
+]
+"""
+A game loop, written as a generator which yields whenever it needs to wait. This
+lets the same loop be driven by blocking terminal reads, or by an event loop.
+"""
+
+
+class TickScheduler:
+    """
+    Schedules fixed ticks (eg. gravity in a falling blocks game) on the monotonic
+    clock, so a game loop can block on input until the next tick is due.
+    """
+
+    def __init__(self, interval: float, clock: Callable[[], float] = time.monotonic):
+        """Initializes the scheduler, with the first tick an interval from now."""
+        self.interval = interval
+        self.clock = clock
+        self.next_tick = clock() + interval
+
+    def reset(self):
+        """Schedules the next tick an interval from now"""
+        self.next_tick = self.clock() + self.interval
+
+    def timeout(self) -> float:
+        """The seconds until the next tick (0 if it is due)"""
+        return max(0.0, self.next_tick - self.clock())
+
+    def due(self) -> bool:
+        """Checks if the next tick is due, and if so, schedules the one after"""
+        now = self.clock()
+        if now < self.next_tick:
+            return False
+        self.next_tick += self.interval
+        if self.next_tick <= now:
+            # Fell behind (eg. the process was suspended): don't rush the ticks.
+            self.next_tick = now + self.interval
+        return True
+
+
+def run_blocking(game_loop: GameLoop, ui: blessed.Terminal):
+    """Runs a game loop, blocking on the terminal for keystrokes"""
+    reply = None
+    try:
+        while True:
+            request = game_loop.send(reply)
+            sys.stdout.flush()
+            if isinstance(request, WaitForKey):
+                reply = ui.inkey(timeout=request.timeout) or None
+            else:
+                time.sleep(request.seconds)
+                reply = None
+    except StopIteration as stop:
+        return stop.value
+
+
 class AbstractGame(abc.ABC):
     """An abstraction for a game"""
 
@@ -64,3 +145,17 @@ class AbstractGame(abc.ABC):
             Either a game over result or a resume game hook.
         """
         raise NotImplementedError
+
+    def game_loop(self, ui: blessed.Terminal) -> Optional[GameLoop]:
+        """
+        The game loop behind `play`, if the game has one. Games which provide it
+        can be played cooperatively (eg. by `sight_words.runtime`); otherwise
+        `play` is run on a thread.
+
+        Args:
+            ui: The UI needed to play. (A blessed terminal)
+
+        Returns:
+            A game loop, whose result is that of `play`.
+        """
+        return None
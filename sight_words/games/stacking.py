@@ -6,7 +6,7 @@ import itertools
 
 import blessed
 
-from sight_words import game
+from sight_words import game, render
 
 
 class StackingGame(game.AbstractGame):
@@ -24,23 +24,22 @@ class StackingGame(game.AbstractGame):
         self.fail_words = fail_words
 
     def play(self, ui: blessed.Terminal) -> Union[game.GameOver, game.ResumeGameHook]:
+        return game.run_blocking(self.game_loop(ui), ui)
+
+    def game_loop(self, ui: blessed.Terminal) -> game.GameLoop:
         left_rights = list(
             itertools.zip_longest(self.pass_words, self.fail_words, fillvalue="-")
         )
         if left_rights:
             with ui.fullscreen(), ui.cbreak(), ui.hidden_cursor():
-                print(ui.home + ui.black_on_bright_cyan + ui.clear)
-                for left, right in left_rights:
-                    line = "  " + left
-                    left_pad = ui.width // 2 - len(line)
-                    line += " " * left_pad
-                    line += ui.red
-                    line += right
-                    line += ui.black
-                    print(line)
-
-                while not ui.inkey(timeout=0.02):
-                    pass
+                renderer = render.Renderer(ui)
+                screen = renderer.begin_frame(ui.black_on_bright_cyan)
+                for y, (left, right) in enumerate(left_rights, start=1):
+                    screen.put(2, y, left, ui.black_on_bright_cyan)
+                    screen.put(ui.width // 2, y, right, ui.red_on_bright_cyan)
+                renderer.present()
+
+                yield game.WaitForKey(timeout=None)
         if len(left_rights) >= ui.height:
             return game.GameOver(score=len(self.pass_words) - len(self.fail_words))
 
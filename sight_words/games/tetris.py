@@ -1,150 +1,23 @@
-"""A tetris game"""
-import random
-import time
-from typing import List
-from typing import Tuple
+"""A tetris game, played on the terminal"""
+from typing import Callable
 from typing import Union
 import dataclasses
+import time
 
 import blessed
 
-from sight_words import game
-
-
-@dataclasses.dataclass
-class RowData:
-    """The data for a row"""
-
-    blocks_filled: List[bool]
-    word: str = ""
-
-
-@dataclasses.dataclass
-class TetrisPiece:
-    """A tetris piece"""
-
-    squares: List[Tuple[int, int]]
-    center: Tuple[float, float]
-
-    def rotate(self, n_quarter_turns: int) -> "TetrisPiece":
-        """Returns a rotated tetris piece"""
-        n_quarter_turns = n_quarter_turns % 4
-        if n_quarter_turns == 0:
-            # No rotation
-            return self
-        if n_quarter_turns == 2:
-            # Flip the piece
-            def rotate(x, y):
-                x_centered = x - self.center[0]
-                y_centered = y - self.center[1]
-                x_rot_centered = -x_centered
-                y_rot_centered = -y_centered
-                x_rot = x_rot_centered + self.center[0]
-                y_rot = y_rot_centered + self.center[1]
-                return int(2 * x_rot) // 2, int(2 * y_rot) // 2
-
-        elif n_quarter_turns == 1:
-            # Rotate the piece
-            def rotate(x, y):
-                x_centered = x - self.center[0]
-                y_centered = y - self.center[1]
-                x_rot_centered = -y_centered
-                y_rot_centered = x_centered
-                x_rot = x_rot_centered + self.center[0]
-                y_rot = y_rot_centered + self.center[1]
-                return int(2 * x_rot) // 2, int(2 * y_rot) // 2
-
-        elif n_quarter_turns == 3:
-            # Rotate the piece
-            def rotate(x, y):
-                x_centered = x - self.center[0]
-                y_centered = y - self.center[1]
-                x_rot_centered = y_centered
-                y_rot_centered = -x_centered
-                x_rot = x_rot_centered + self.center[0]
-                y_rot = y_rot_centered + self.center[1]
-                return int(2 * x_rot) // 2, int(2 * y_rot) // 2
+from sight_words import game, profiling, render
+from sight_words.games import tetris_core
 
-        else:
-            raise RuntimeError("Invalid rotation number")
-        new_squares = [rotate(x, y) for x, y in self.squares]
-        return dataclasses.replace(self, squares=new_squares)
-
-    def shift(self, x, y):
-        """Shift the piece"""
-        new_squares = [(x + x_, y + y_) for x_, y_ in self.squares]
-        return dataclasses.replace(
-            self, squares=new_squares, center=(self.center[0] + x, self.center[1] + y)
-        )
-
-    @staticmethod
-    def box(x, y):
-        """Get a box"""
-        return TetrisPiece(
-            squares=[(0, 0), (0, 1), (1, 0), (1, 1)], center=(0.5, 0.5)
-        ).shift(x, y)
-
-    @staticmethod
-    def line(x, y):
-        """Get a line"""
-        return TetrisPiece(
-            squares=[(0, 2), (0, 1), (0, 0), (0, -1)], center=(0, 0.5)
-        ).shift(x, y)
-
-    @staticmethod
-    def ell(x, y):
-        """Get a ell"""
-        return TetrisPiece(
-            squares=[(0, 2), (0, 1), (0, 0), (1, 0)], center=(0, 0.5)
-        ).shift(x, y)
-
-    @staticmethod
-    def lle(x, y):
-        """Get a lle"""
-        return TetrisPiece(
-            squares=[(0, 2), (0, 1), (0, 0), (-1, 0)], center=(0, 0.5)
-        ).shift(x, y)
-
-    @staticmethod
-    def zig(x, y):
-        """Get a zig"""
-        return TetrisPiece(
-            squares=[(0, 0), (0, 1), (1, 0), (1, -1)], center=(0.5, 0)
-        ).shift(x, y)
-
-    @staticmethod
-    def zag(x, y):
-        """Get a zag"""
-        return TetrisPiece(
-            squares=[(0, 0), (0, -1), (1, 0), (1, 1)], center=(0.5, 0)
-        ).shift(x, y)
-
-    @staticmethod
-    def tee(x, y):
-        """Get a tee"""
-        return TetrisPiece(
-            squares=[(0, 0), (-1, 0), (1, 0), (0, 1)], center=(0.0, 0)
-        ).shift(x, y)
-
-    @staticmethod
-    def random_piece(x, y) -> "TetrisPiece":
-        """Get a random piece"""
-        method = random.choice(
-            [
-                TetrisPiece.box,
-                TetrisPiece.line,
-                TetrisPiece.box,
-                TetrisPiece.line,
-                TetrisPiece.ell,
-                TetrisPiece.lle,
-                TetrisPiece.zag,
-                TetrisPiece.zig,
-                TetrisPiece.tee,
-                TetrisPiece.tee,
-            ]
-        )
-        return method(x, y)
+_CELLS = str.maketrans("01", " █")
 
+# The moves of the arrow keys (left, right, down and up).
+_KEY_MOVES = {
+    260: tetris_core.Move.LEFT,
+    261: tetris_core.Move.RIGHT,
+    258: tetris_core.Move.ROTATE_LEFT,
+    259: tetris_core.Move.ROTATE_RIGHT,
+}
 
 # TETRIS_BG_COLOR = blessed.Terminal.black_on_bright_cyan
 TOP_OFFSET = 2
@@ -152,138 +25,59 @@ BOTTOM_OFFSET = 2
 
 
 @dataclasses.dataclass
-class Tetris(game.AbstractGame):
+class Tetris(tetris_core.TetrisCore, game.AbstractGame):
     """The tetris game"""
 
-    width: int = 10
-    rows: List[RowData] = dataclasses.field(default_factory=list)
-    score: int = 0
-    piece: TetrisPiece = dataclasses.field(
-        default_factory=lambda: TetrisPiece.random_piece(5, 0)
-    )
     inv_speed: float = 1.0
+    # The clock the pieces drop by (a recording's, to replay the game exactly).
+    clock: Callable[[], float] = dataclasses.field(
+        default=time.monotonic, repr=False, compare=False
+    )
 
-    def adjust_rows(self, height):
-        """Adjusts the state to the correct height."""
-        i = 0
-        row_zap = None
-        while i < len(self.rows):
-            # Check if any rows are full:
-            row = self.rows[i]
-            if not row.word and all(row.blocks_filled):
-                # Delete the row.
-                self.rows.pop(i)
-                self.score += self.width
-                row_zap = True
-            else:
-                i += 1
-        if len(self.rows) < height:
-            new_rows = [
-                RowData([False] * self.width) for _ in range(height - len(self.rows))
-            ]
-            self.rows = new_rows + self.rows
-        self.rows = self.rows[-height:]
-        return row_zap
-
-    def render_board(self, ui: blessed.Terminal):
-        """Renders the game board"""
-        text = ui.home + ui.black_on_bright_cyan + ui.clear
-        text += " " * 2 * (self.width + 2) + f"Score: {self.score}\n"
-        for row in self.rows:
-            assert len(row.blocks_filled) == self.width
+    def draw_board(self, screen: render.ScreenBuffer, ui: blessed.Terminal):
+        """Draws the game board"""
+        style = ui.black_on_bright_cyan
+        screen.put(2 * (self.width + 2), 0, f"Score: {self.score}", style)
+        for y, row in enumerate(self.rows, start=TOP_OFFSET - 1):
             if row.word:
                 missing = self.width - len(row.word)
-                row_txt = (
-                    ui.white_on_black
-                    + "▒"
-                    + row.word
-                    + " " * missing
-                    + "▒"
-                    + ui.black_on_bright_cyan
+                screen.put(
+                    0, y, "▒" + row.word + " " * missing + "▒", ui.white_on_black
                 )
             else:
-                row_txt = (
-                    "▒"
-                    + "".join("█" if filled else " " for filled in row.blocks_filled)
-                    + "▒"
-                )
-            text += row_txt + ui.move_down()
-        text += "▒" * (self.width + 2)
-        print(text, end="")
-
-    def is_game_over(self) -> bool:
-        """Checks if the game is over"""
-        return any(self.rows[0].blocks_filled)
-
-    def render_row_zap(self, ui):
-        """Renders the game over message"""
-        print(ui.home + ui.black_on_bright_green + ui.clear, end="")
-        msg = "Row Zap!"
-        print(ui.move_xy(ui.width // 2 - 4, ui.height // 2) + msg)
-        msg = f"Score: {self.score}"
-        print(ui.move_xy((ui.width - len(msg)) // 2, ui.height // 2 + 1) + msg)
-
-    def render_game_over(self, ui):
-        """Renders the game over message"""
-        print(ui.home + ui.black_on_bright_red + ui.clear, end="")
-        msg = "Game Over!"
-        print(ui.move_xy(ui.width // 2 - 5, ui.height // 2) + msg)
-        msg = f"Score: {self.score}"
-        print(ui.move_xy((ui.width - len(msg)) // 2, ui.height // 2 + 1) + msg)
-
-    def clear_piece(self, ui):
-        """Renders the piece"""
-        for x, y in self.piece.squares:
-            with ui.location(x + 1, y + TOP_OFFSET - 1):
-                print(" ", end="")
+                cells = format(row.blocks, f"0{self.width}b")[::-1].translate(_CELLS)
+                screen.put(0, y, "▒" + cells + "▒", style)
+        screen.put(0, len(self.rows) + TOP_OFFSET - 1, "▒" * (self.width + 2), style)
 
-    def render_piece(self, ui):
-        """Renders the piece"""
+    def draw_piece(self, screen: render.ScreenBuffer, ui: blessed.Terminal):
+        """Draws the piece"""
         for x, y in self.piece.squares:
-            with ui.location(x + 1, y + TOP_OFFSET - 1):
-                print("█", end="")
-
-    def is_piece_blocked(self, piece):
-        """Checks if the piece is blocked"""
-        for x, y in piece.squares:
-            if y >= len(self.rows):
-                return True
-            if x > self.width - 1:
-                return True
-            if x < 0:
-                return True
-            if y < 0:
-                continue
-            if self.rows[y].blocks_filled[x]:
-                return True
-        return False
-
-    def reset_piece(self):
-        """Resets to a new piece"""
-        self.piece = TetrisPiece.random_piece(5, 0)
-
-    def drop_piece(self) -> bool:
-        """
-        Drop the piece one unit to the keystroke
-        Returns True if the piece could move
-
-
-        Returns:
-            Whether the piece could move
-        """
-        if self.is_piece_blocked(self.piece.shift(0, 1)):
-            for x, y in self.piece.squares:
-                self.rows[y].blocks_filled[x] = True
-            return False
-        else:
-            # y += 1
-            # y = max(0, min(y, len(self.rows) - 1))
-            # x = max(0, min(x, self.width - 1))
-            # self.piece = (x, y)
-            new_piece = self.piece.shift(0, 1)
-            if not self.is_piece_blocked(new_piece):
-                self.piece = new_piece
-        return True
+            screen.put(x + 1, y + TOP_OFFSET - 1, "█", ui.black_on_bright_cyan)
+
+    @profiling.timed("game_frame")
+    def render_frame(self, ui: blessed.Terminal, renderer: render.Renderer):
+        """Renders the board and the piece"""
+        screen = renderer.begin_frame(ui.black_on_bright_cyan)
+        self.draw_board(screen, ui)
+        self.draw_piece(screen, ui)
+        renderer.present()
+
+    def render_message(
+        self, ui: blessed.Terminal, renderer: render.Renderer, style: str, msg: str
+    ):
+        """Renders a message and the score, on a full screen of the style"""
+        screen = renderer.begin_frame(style)
+        screen.put_centered(ui.height // 2, msg, style)
+        screen.put_centered(ui.height // 2 + 1, f"Score: {self.score}", style)
+        renderer.present()
+
+    def render_row_zap(self, ui: blessed.Terminal, renderer: render.Renderer):
+        """Renders the row zap message"""
+        self.render_message(ui, renderer, ui.black_on_bright_green, "Row Zap!")
+
+    def render_game_over(self, ui: blessed.Terminal, renderer: render.Renderer):
+        """Renders the game over message"""
+        self.render_message(ui, renderer, ui.black_on_bright_red, "Game Over!")
 
     def move_piece(self, inp) -> bool:
         """
@@ -296,65 +90,62 @@ class Tetris(game.AbstractGame):
         Returns:
             Whether the piece could move
         """
-
-        if inp.code == 260:
-            new_piece = self.piece.shift(-1, 0)
-            if not self.is_piece_blocked(new_piece):
-                self.piece = new_piece
-        elif inp.code == 261:
-            new_piece = self.piece.shift(1, 0)
-            if not self.is_piece_blocked(new_piece):
-                self.piece = new_piece
-        elif inp.code == 258:
-            new_piece = self.piece.rotate(-1)
-            if not self.is_piece_blocked(new_piece):
-                self.piece = new_piece
-        elif inp.code == 259:
-            new_piece = self.piece.rotate(1)
-            if not self.is_piece_blocked(new_piece):
-                self.piece = new_piece
-        elif inp == " ":
-            new_piece = self.piece.shift(0, 1)
-            if not self.is_piece_blocked(new_piece):
-                self.piece = new_piece
+        move = _KEY_MOVES.get(inp.code)
+        if move is None and inp == " ":
+            move = tetris_core.Move.DOWN
+        return move is not None and self.apply(move)
 
     def play(self, ui: blessed.Terminal) -> Union[game.GameOver, game.ResumeGameHook]:
         """The core game play loop"""
+        return game.run_blocking(self.game_loop(ui), ui)
+
+    def game_loop(self, ui: blessed.Terminal) -> game.GameLoop:
+        """The core game play loop, yielding whenever it waits"""
 
         def resume_hook(event: game.SightWordTestEvent):
+            # The resumed game gets its own rows, as they are mutated in play.
+            rows = [dataclasses.replace(row) for row in self.rows]
             if event.result == game.TestQuestionResult.PASS:
                 return dataclasses.replace(
-                    self, score=self.score + 1, inv_speed=self.inv_speed * 0.99
+                    self,
+                    rows=rows,
+                    score=self.score + 1,
+                    inv_speed=self.inv_speed * 0.99,
                 )
             elif event.result == game.TestQuestionResult.FAIL:
-                new_row = RowData(blocks_filled=[True] * self.width, word=event.word)
-                return dataclasses.replace(self, rows=self.rows + [new_row])
+                new_row = tetris_core.RowData(blocks=self.full_mask, word=event.word)
+                return dataclasses.replace(self, rows=rows + [new_row])
 
         with ui.fullscreen(), ui.cbreak(), ui.hidden_cursor():
+            renderer = render.Renderer(ui)
+            ticks = game.TickScheduler(self.inv_speed, clock=self.clock)
+            height = None
             while True:
-                stime = time.time()
-                row_zap = self.adjust_rows(ui.height - TOP_OFFSET - BOTTOM_OFFSET)
-                if row_zap:
-                    self.render_row_zap(ui)
-                    time.sleep(1.0)
-                if self.is_game_over():
-                    self.render_game_over(ui)
-                    while not ui.inkey(timeout=2):
-                        pass
-                    return game.GameOver(score=self.score)
-                self.render_board(ui)
-                while time.time() - stime < self.inv_speed:
-                    inp = ui.inkey(timeout=0.02)
-                    if inp == "q":
-                        return resume_hook
-                    self.clear_piece(ui)
-                    self.move_piece(inp)
-                    self.render_piece(ui)
-                if not self.drop_piece():
-                    row_zap = self.adjust_rows(ui.height - TOP_OFFSET - BOTTOM_OFFSET)
-                    if row_zap:
-                        self.render_row_zap(ui)
-                        time.sleep(0.5)
-                    time.sleep(0.5)
-                    self.reset_piece()
+                if height != ui.height - TOP_OFFSET - BOTTOM_OFFSET:
+                    # Starting, or the terminal was resized.
+                    height = ui.height - TOP_OFFSET - BOTTOM_OFFSET
+                    if self.adjust_rows(height):
+                        self.render_row_zap(ui, renderer)
+                        yield game.Sleep(1.0)
+                        ticks.reset()
+                    if self.is_game_over():
+                        self.render_game_over(ui, renderer)
+                        yield game.WaitForKey(timeout=None)
+                        return game.GameOver(score=self.score)
+                    self.render_frame(ui, renderer)
+                # Block until a keystroke, or until the piece drops.
+                inp = yield game.WaitForKey(timeout=ticks.timeout())
+                if inp == "q":
                     return resume_hook
+                changed = bool(inp) and self.move_piece(inp)
+                if ticks.due():
+                    if not self.drop_piece():
+                        if self.adjust_rows(height):
+                            self.render_row_zap(ui, renderer)
+                            yield game.Sleep(0.5)
+                        yield game.Sleep(0.5)
+                        self.reset_piece()
+                        return resume_hook
+                    changed = True
+                if changed:
+                    self.render_frame(ui, renderer)
@@ -0,0 +1,147 @@
+"""
+A simple placement bot for the tetris simulation core, for testing and
+benchmarking the game logic.
+
+For each piece, the bot tries every rotation and column, drops the piece there
+on a copy of the board's row masks, and picks the placement leaving the best
+board: more cleared lines, fewer holes, and a lower, flatter stack.
+"""
+from typing import List
+from typing import Optional
+from typing import Tuple
+import dataclasses
+
+from sight_words.games import tetris_core
+
+# The weights of the lines cleared, the total column height, the holes, and the
+# bumpiness (the total height difference of neighbouring columns).
+LINES_WEIGHT = 0.76
+HEIGHT_WEIGHT = -0.51
+HOLES_WEIGHT = -0.36
+BUMPINESS_WEIGHT = -0.18
+
+
+def _count_bits(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def _fits(masks: List[int], width: int, footprint, x: int, y: int) -> bool:
+    """Checks if a footprint fits at (x, y) on the row masks"""
+    min_x, max_x, row_masks = footprint
+    left = x + min_x
+    if left < 0 or x + max_x >= width:
+        return False
+    for row_y, mask in row_masks:
+        row_y += y
+        if row_y >= len(masks) or (row_y >= 0 and masks[row_y] & mask << left):
+            return False
+    return True
+
+
+def evaluate(masks: List[int], width: int, full_mask: int) -> float:
+    """Scores a board (after clearing its full rows): higher is better"""
+    n_lines = sum(mask == full_mask for mask in masks)
+    masks = [mask for mask in masks if mask != full_mask]
+    heights = [0] * width
+    n_holes = 0
+    covered = 0
+    for i, mask in enumerate(masks):
+        # The empty blocks below a filled one are holes.
+        n_holes += _count_bits(covered & ~mask)
+        new = mask & ~covered
+        covered |= mask
+        x = 0
+        while new:
+            if new & 1:
+                heights[x] = len(masks) - i
+            new >>= 1
+            x += 1
+    bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+    return (
+        LINES_WEIGHT * n_lines
+        + HEIGHT_WEIGHT * sum(heights)
+        + HOLES_WEIGHT * n_holes
+        + BUMPINESS_WEIGHT * bumpiness
+    )
+
+
+def best_placement(game: tetris_core.TetrisCore) -> Optional[Tuple[int, int]]:
+    """The best (rotation, x) to drop the game's piece at, if it fits anywhere"""
+    piece = game.piece
+    masks = [row.blocks for row in game.rows]
+    full_mask = game.full_mask
+    best = None
+    best_score = float("-inf")
+    for rotation, footprint in enumerate(tetris_core.FOOTPRINTS[piece.shape]):
+        min_x, max_x, row_masks = footprint
+        for x in range(-min_x, game.width - max_x):
+            if not _fits(masks, game.width, footprint, x, piece.y):
+                continue
+            y = piece.y
+            while _fits(masks, game.width, footprint, x, y + 1):
+                y += 1
+            placed = masks.copy()
+            for row_y, mask in row_masks:
+                if row_y + y >= 0:
+                    placed[row_y + y] |= mask << (x + min_x)
+            score = evaluate(placed, game.width, full_mask)
+            if score > best_score:
+                best, best_score = (rotation, x), score
+    return best
+
+
+def plan_moves(
+    game: tetris_core.TetrisCore, rotation: int, x: int
+) -> List[tetris_core.Move]:
+    """The moves turning the game's piece to the rotation, and shifting it to x"""
+    n_quarter_turns = (rotation - game.piece.rotation) % 4
+    if n_quarter_turns == 3:
+        moves = [tetris_core.Move.ROTATE_LEFT]
+    else:
+        moves = [tetris_core.Move.ROTATE_RIGHT] * n_quarter_turns
+    shift = x - game.piece.x
+    direction = tetris_core.Move.RIGHT if shift > 0 else tetris_core.Move.LEFT
+    return moves + [direction] * abs(shift)
+
+
+@dataclasses.dataclass(frozen=True)
+class BotGameResult:
+    """The outcome of a game played by the bot"""
+
+    n_steps: int
+    n_pieces: int
+    n_lines: int
+    score: int
+    game_over: bool
+
+
+def play_game(
+    seed: Optional[int] = None,
+    width: int = 10,
+    height: int = 20,
+    max_steps: int = 10_000,
+) -> BotGameResult:
+    """
+    Plays a game with the bot, a move per step: it turns and shifts each piece
+    to its best placement, then drops it.
+    """
+    game = tetris_core.TetrisCore.new(width=width, height=height, seed=seed)
+    n_pieces = n_lines = 0
+    moves: List[tetris_core.Move] = []
+    planned = False
+    game_over = False
+    n_steps = 0
+    while n_steps < max_steps and not game_over:
+        if not planned:
+            placement = best_placement(game)
+            moves = plan_moves(game, *placement) if placement else []
+            moves.reverse()
+            planned = True
+        result = game.step(moves.pop() if moves else tetris_core.Move.DOWN)
+        n_steps += 1
+        if result.landed:
+            n_pieces += 1
+            n_lines += result.n_cleared
+            game_over = result.game_over
+            planned = False
+    return BotGameResult(n_steps, n_pieces, n_lines, game.score, game_over)
@@ -0,0 +1,325 @@
+"""
+The rules of tetris, without any I/O, so games can be simulated (and tested)
+without a terminal; `sight_words.games.tetris` plays them on one.
+
+The board is a list of rows, each a bitmask of its filled blocks (bit x is
+column x), so collisions, placing pieces and clearing lines are bitwise ops.
+A piece is a shape, a rotation and a position: the squares (and the row masks)
+of every rotation of every shape are computed once, at import. Pieces are drawn
+from the game's own random generator, so a seeded game always plays the same.
+"""
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+import dataclasses
+import enum
+import math
+import random
+
+
+@dataclasses.dataclass
+class RowData:
+    """The data for a row: its filled blocks, and the word of a missed word row"""
+
+    # Bit x is set when column x is filled.
+    blocks: int = 0
+    # Word rows are full, but never cleared.
+    word: str = ""
+
+
+class Shape(enum.IntEnum):
+    """The shapes of the pieces (which index the rotation tables)"""
+
+    BOX = 0
+    LINE = 1
+    ELL = 2
+    LLE = 3
+    ZIG = 4
+    ZAG = 5
+    TEE = 6
+
+
+Squares = Tuple[Tuple[int, int], ...]
+
+# The squares of each shape at (0, 0), and the center it rotates about.
+_SHAPE_DEFINITIONS: Dict[Shape, Tuple[Squares, Tuple[float, float]]] = {
+    Shape.BOX: (((0, 0), (0, 1), (1, 0), (1, 1)), (0.5, 0.5)),
+    Shape.LINE: (((0, 2), (0, 1), (0, 0), (0, -1)), (0, 0.5)),
+    Shape.ELL: (((0, 2), (0, 1), (0, 0), (1, 0)), (0, 0.5)),
+    Shape.LLE: (((0, 2), (0, 1), (0, 0), (-1, 0)), (0, 0.5)),
+    Shape.ZIG: (((0, 0), (0, 1), (1, 0), (1, -1)), (0.5, 0)),
+    Shape.ZAG: (((0, 0), (0, -1), (1, 0), (1, 1)), (0.5, 0)),
+    Shape.TEE: (((0, 0), (-1, 0), (1, 0), (0, 1)), (0.0, 0)),
+}
+
+# Boxes, lines and tees come up twice as often as the other shapes.
+_RANDOM_SHAPES = (
+    [Shape.BOX, Shape.LINE] * 2
+    + [Shape.ELL, Shape.LLE, Shape.ZAG, Shape.ZIG]
+    + [Shape.TEE] * 2
+)
+
+
+def _rotate(
+    squares: Squares, center: Tuple[float, float], n_quarter_turns: int
+) -> Squares:
+    """Rotates squares about a center, rounding down onto the grid"""
+    rotated = []
+    for x, y in squares:
+        x_centered, y_centered = x - center[0], y - center[1]
+        for _ in range(n_quarter_turns % 4):
+            x_centered, y_centered = -y_centered, x_centered
+        rotated.append(
+            (math.floor(x_centered + center[0]), math.floor(y_centered + center[1]))
+        )
+    return tuple(rotated)
+
+
+def _footprint(squares: Squares) -> Tuple[int, int, Tuple[Tuple[int, int], ...]]:
+    """
+    The (leftmost, rightmost) x of squares, and the bitmask of the squares on each
+    row (relative to the leftmost x), as (y, mask) pairs
+    """
+    min_x = min(x for x, _ in squares)
+    max_x = max(x for x, _ in squares)
+    masks: Dict[int, int] = {}
+    for x, y in squares:
+        masks[y] = masks.get(y, 0) | 1 << (x - min_x)
+    return min_x, max_x, tuple(sorted(masks.items()))
+
+
+# The squares (and footprint) of every shape, indexed by shape and rotation.
+ROTATIONS: Tuple[Tuple[Squares, ...], ...] = tuple(
+    tuple(_rotate(*_SHAPE_DEFINITIONS[shape], rotation) for rotation in range(4))
+    for shape in Shape
+)
+FOOTPRINTS = tuple(
+    tuple(_footprint(squares) for squares in rotations) for rotations in ROTATIONS
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class TetrisPiece:
+    """A tetris piece: a shape, in one of its 4 rotations, at (x, y)"""
+
+    shape: Shape
+    rotation: int = 0
+    x: int = 0
+    y: int = 0
+
+    @property
+    def squares(self) -> List[Tuple[int, int]]:
+        """The squares of the piece on the board"""
+        squares = ROTATIONS[self.shape][self.rotation]
+        return [(self.x + x, self.y + y) for x, y in squares]
+
+    def rotate(self, n_quarter_turns: int) -> "TetrisPiece":
+        """Returns a rotated tetris piece"""
+        rotation = (self.rotation + n_quarter_turns) % 4
+        return TetrisPiece(self.shape, rotation, self.x, self.y)
+
+    def shift(self, x, y):
+        """Shift the piece"""
+        return TetrisPiece(self.shape, self.rotation, self.x + x, self.y + y)
+
+    @staticmethod
+    def box(x, y):
+        """Get a box"""
+        return TetrisPiece(Shape.BOX, 0, x, y)
+
+    @staticmethod
+    def line(x, y):
+        """Get a line"""
+        return TetrisPiece(Shape.LINE, 0, x, y)
+
+    @staticmethod
+    def ell(x, y):
+        """Get a ell"""
+        return TetrisPiece(Shape.ELL, 0, x, y)
+
+    @staticmethod
+    def lle(x, y):
+        """Get a lle"""
+        return TetrisPiece(Shape.LLE, 0, x, y)
+
+    @staticmethod
+    def zig(x, y):
+        """Get a zig"""
+        return TetrisPiece(Shape.ZIG, 0, x, y)
+
+    @staticmethod
+    def zag(x, y):
+        """Get a zag"""
+        return TetrisPiece(Shape.ZAG, 0, x, y)
+
+    @staticmethod
+    def tee(x, y):
+        """Get a tee"""
+        return TetrisPiece(Shape.TEE, 0, x, y)
+
+    @staticmethod
+    def random_piece(x, y, rng: Optional[random.Random] = None) -> "TetrisPiece":
+        """Get a random piece (from the global random generator, by default)"""
+        return TetrisPiece((rng or random).choice(_RANDOM_SHAPES), 0, x, y)
+
+
+class Move(enum.Enum):
+    """The moves of a piece"""
+
+    LEFT = "left"
+    RIGHT = "right"
+    ROTATE_LEFT = "rotate_left"
+    ROTATE_RIGHT = "rotate_right"
+    DOWN = "down"
+
+
+# The (quarter turns, x shift, y shift) of each move.
+_MOVES = {
+    Move.LEFT: (0, -1, 0),
+    Move.RIGHT: (0, 1, 0),
+    Move.ROTATE_LEFT: (-1, 0, 0),
+    Move.ROTATE_RIGHT: (1, 0, 0),
+    Move.DOWN: (0, 0, 1),
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class StepResult:
+    """What happened in a step of the game"""
+
+    landed: bool
+    n_cleared: int = 0
+    game_over: bool = False
+
+
+_FALLING = StepResult(landed=False)
+
+
+@dataclasses.dataclass
+class TetrisCore:
+    """The state of a game of tetris, and its rules"""
+
+    width: int = 10
+    rows: List[RowData] = dataclasses.field(default_factory=list)
+    score: int = 0
+    piece: Optional[TetrisPiece] = None
+    rng: random.Random = dataclasses.field(
+        default_factory=random.Random, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        if self.piece is None:
+            self.reset_piece()
+
+    @classmethod
+    def new(cls, width: int = 10, height: int = 20, seed: Optional[int] = None):
+        """A game on an empty board, with pieces drawn from a seeded generator"""
+        new_game = cls(width=width, rng=random.Random(seed))
+        new_game.adjust_rows(height)
+        return new_game
+
+    @property
+    def full_mask(self) -> int:
+        """The blocks of a full row"""
+        return (1 << self.width) - 1
+
+    def adjust_rows(self, height: int) -> int:
+        """
+        Clears any full rows, and adjusts the state to the correct height.
+
+        Returns:
+            The number of rows cleared
+        """
+        full_mask = self.full_mask
+        rows = [row for row in self.rows if row.word or row.blocks != full_mask]
+        n_cleared = len(self.rows) - len(rows)
+        self.score += self.width * n_cleared
+        if len(rows) < height:
+            rows = [RowData() for _ in range(height - len(rows))] + rows
+        self.rows = rows[-height:]
+        return n_cleared
+
+    def is_game_over(self) -> bool:
+        """Checks if the game is over"""
+        return self.rows[0].blocks != 0
+
+    def is_blocked(self, shape: Shape, rotation: int, x: int, y: int) -> bool:
+        """Checks if a shape, in a rotation, is blocked at (x, y)"""
+        min_x, max_x, masks = FOOTPRINTS[shape][rotation]
+        left = x + min_x
+        if left < 0 or x + max_x >= self.width:
+            return True
+        rows = self.rows
+        for row_y, mask in masks:
+            row_y += y
+            if row_y >= len(rows):
+                return True
+            # Rows above the board (y < 0) are empty.
+            if row_y >= 0 and rows[row_y].blocks & mask << left:
+                return True
+        return False
+
+    def is_piece_blocked(self, piece: TetrisPiece) -> bool:
+        """Checks if the piece is blocked"""
+        return self.is_blocked(piece.shape, piece.rotation, piece.x, piece.y)
+
+    def try_move(self, n_quarter_turns: int = 0, x: int = 0, y: int = 0) -> bool:
+        """Rotates and shifts the piece, unless it would be blocked"""
+        piece = self.piece
+        rotation = (piece.rotation + n_quarter_turns) % 4
+        new_x, new_y = piece.x + x, piece.y + y
+        if self.is_blocked(piece.shape, rotation, new_x, new_y):
+            return False
+        self.piece = TetrisPiece(piece.shape, rotation, new_x, new_y)
+        return True
+
+    def place_piece(self):
+        """Adds the piece's squares to the board"""
+        piece = self.piece
+        min_x, _, masks = FOOTPRINTS[piece.shape][piece.rotation]
+        for row_y, mask in masks:
+            row_y += piece.y
+            if row_y >= 0:
+                self.rows[row_y].blocks |= mask << (piece.x + min_x)
+
+    def reset_piece(self):
+        """Resets to a new piece"""
+        self.piece = TetrisPiece.random_piece(self.width // 2, 0, self.rng)
+
+    def drop_piece(self) -> bool:
+        """
+        Drops the piece one unit, placing it on the board if it can't move.
+
+        Returns:
+            Whether the piece could move
+        """
+        if self.try_move(y=1):
+            return True
+        self.place_piece()
+        return False
+
+    def apply(self, move: Move) -> bool:
+        """
+        Moves the piece, unless it would be blocked.
+
+        Returns:
+            Whether the piece could move
+        """
+        return self.try_move(*_MOVES[move])
+
+    def step(self, move: Optional[Move] = None) -> StepResult:
+        """
+        Advances the game by a tick: applies the move (if any), then drops the
+        piece. Once the piece lands, full rows are cleared and the next piece
+        spawns; the game is over if it lands in the top row, or the next piece
+        is blocked.
+        """
+        if move is not None:
+            self.try_move(*_MOVES[move])
+        if self.drop_piece():
+            return _FALLING
+        n_cleared = self.adjust_rows(len(self.rows))
+        self.reset_piece()
+        game_over = self.is_game_over() or self.is_piece_blocked(self.piece)
+        return StepResult(landed=True, n_cleared=n_cleared, game_over=game_over)
@@ -0,0 +1,213 @@
+"""
+Headless, scripted practice sessions.
+
+Answers are read as JSON lines, one object per question, and the outcome of each
+question is returned as a JSON-able dict:
+ - `read` answers look like `{"success": true}`,
+ - `spell` answers look like `{"attempt": "cat"}`.
+An answer may also name the `"word"` it answers, in which case that word is asked
+instead of a chosen one (so a session's output can be replayed as its input), give
+the student's `"response_time"` (in seconds), or be `{"quit": true}` to end the
+session. No speech, game or terminal is involved.
+"""
+
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Union
+import json
+import pathlib
+
+from sight_words import data_rep, data_utils, ml, scheduling, session
+
+Answer = Dict[str, Any]
+DataFile = Union[pathlib.Path, data_utils.DatasetFile]
+
+
+def parse_answers(lines: Iterable[str]) -> Iterator[Answer]:
+    """Parses JSON lines of answers, skipping blank lines"""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            answer = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number} is not valid JSON: {e}") from e
+        if not isinstance(answer, dict):
+            raise ValueError(f"Line {line_number} is not a JSON object.")
+        yield answer
+
+
+def _outcome(
+    word: str, datum: data_rep.SightWordDatum, success: bool, **fields
+) -> Answer:
+    """The outcome of a question, with the word's updated stats"""
+    return {
+        "word": word,
+        **fields,
+        "success": success,
+        "grade": datum.grade,
+        "successes": datum.successes,
+        "failures": datum.failures,
+    }
+
+
+class _Saver:
+    """
+    Saves the dataset every `save_every` answers (as a subscriber to the session's
+    state), and at the end
+    """
+
+    def __init__(
+        self, data_file: Optional[DataFile], dataset: data_rep.DataSet, save_every
+    ):
+        if isinstance(data_file, pathlib.Path):
+            data_file = data_utils.DatasetFile(data_file)
+        self.data_file = data_file
+        self.dataset = dataset
+        self.save_every = save_every
+        self._n_unsaved = 0
+
+    def answered(self, dataset: data_rep.DataSet):
+        """Records an updated dataset"""
+        self.dataset = dataset
+        self._n_unsaved += 1
+        if self.save_every and self._n_unsaved >= self.save_every:
+            self.save()
+
+    def save(self):
+        """Saves the dataset, if it has changed"""
+        if self.data_file is not None and self._n_unsaved:
+            self.data_file.save(self.dataset)
+        self._n_unsaved = 0
+
+
+def _check_word(word: str, words: Dict[str, data_rep.SightWordDatum]) -> str:
+    """Checks that a scripted word is in the dataset"""
+    if word not in words:
+        raise ValueError(f"Word {word} not in the dataset.")
+    return word
+
+
+def _field(answer: Answer, key: str) -> Any:
+    """A required field of an answer"""
+    if key not in answer:
+        raise ValueError(f"Answer {json.dumps(answer)} has no {key!r}.")
+    return answer[key]
+
+
+def read(
+    dataset: data_rep.DataSet,
+    answers: Iterable[Answer],
+    data_file: Optional[DataFile] = None,
+    inv_temp: float = 1,
+    inv_grade_temp: float = 1,
+    save_every: int = 1,
+    strategy: str = "sampling",
+) -> Iterator[Answer]:
+    """
+    Tests reading with scripted answers.
+
+    Args:
+        dataset: The student's dataset.
+        answers: The answers, eg. parsed by `parse_answers`.
+        data_file: Where to save the dataset (if anywhere): a path, or the
+            `DatasetFile` it was loaded from, to keep other sessions' events.
+        inv_temp: As for `sight_words.ml.choose_word`.
+        inv_grade_temp: As for `sight_words.ml.choose_word`.
+        save_every: Save after this many answers (0 only saves at the end).
+        strategy: Choose words by "sampling", or by "spaced" repetition (see
+            `sight_words.scheduling`).
+
+    Yields:
+        The outcome of each answer.
+    """
+    saver = _Saver(data_file, dataset, save_every)
+    scheduler = scheduling.scheduler_for(strategy)
+    state = session.SessionState(dataset)
+    state.subscribe(saver.answered)
+    try:
+        for answer in answers:
+            if answer.get("quit"):
+                break
+            if "word" in answer:
+                word = _check_word(answer["word"], state.dataset.reading_words)
+            elif scheduler:
+                word = scheduler.choose_word(state.dataset.reading_words)
+            else:
+                word = ml.choose_word(
+                    state.dataset.reading_words,
+                    inv_temp=inv_temp,
+                    inv_grade_temp=inv_grade_temp,
+                )
+            success = bool(_field(answer, "success"))
+            dataset = state.record_answer(
+                word,
+                success,
+                spelling=False,
+                response_time=answer.get("response_time"),
+            )
+            yield _outcome(word, dataset.reading_words[word], success)
+    finally:
+        saver.save()
+
+
+def spell(
+    dataset: data_rep.DataSet,
+    answers: Iterable[Answer],
+    data_file: Optional[DataFile] = None,
+    inv_temp: float = 1,
+    inv_grade_temp: float = 1,
+    target_accuracy: float = 0.75,
+    save_every: int = 1,
+    strategy: str = "sampling",
+) -> Iterator[Answer]:
+    """
+    Tests spelling with scripted answers.
+
+    Args:
+        dataset: The student's dataset.
+        answers: The answers, eg. parsed by `parse_answers`.
+        data_file: Where to save the dataset (if anywhere): a path, or the
+            `DatasetFile` it was loaded from, to keep other sessions' events.
+        inv_temp: As for `sight_words.ml.choose_word_for_target_accuracy`.
+        inv_grade_temp: As for `sight_words.ml.choose_word_for_target_accuracy`.
+        target_accuracy: As for `sight_words.ml.choose_word_for_target_accuracy`.
+        save_every: Save after this many answers (0 only saves at the end).
+        strategy: Choose words by "sampling", or by "spaced" repetition (see
+            `sight_words.scheduling`).
+
+    Yields:
+        The outcome of each answer.
+    """
+    saver = _Saver(data_file, dataset, save_every)
+    scheduler = scheduling.scheduler_for(strategy)
+    state = session.SessionState(dataset)
+    state.subscribe(saver.answered)
+    try:
+        for answer in answers:
+            if answer.get("quit"):
+                break
+            if "word" in answer:
+                word = _check_word(answer["word"], state.dataset.spelling_words)
+            elif scheduler:
+                word = scheduler.choose_word(state.dataset.spelling_words)
+            else:
+                word = ml.choose_word_for_target_accuracy(
+                    state.dataset.spelling_words,
+                    inv_grade_temp=inv_grade_temp,
+                    inv_temp=inv_temp,
+                    target_accuracy=target_accuracy,
+                    session_successes=state.session_successes,
+                    session_failures=state.session_failures,
+                )
+            attempt = str(_field(answer, "attempt"))
+            success = attempt.lower().strip() == word.lower().strip()
+            dataset = state.record_answer(
+                word, success, response_time=answer.get("response_time")
+            )
+            yield _outcome(word, dataset.spelling_words[word], success, attempt=attempt)
+    finally:
+        saver.save()
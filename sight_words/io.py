@@ -1,8 +1,27 @@
 """This module helps handle io."""
+from concurrent import futures
+from typing import Callable
+from typing import Optional
 import enum
+import queue
+import threading
 
 import click
-import pyttsx3
+
+from sight_words import profiling, speech
+
+# The speech engine is slow to import, so it is only loaded once it is needed.
+pyttsx3 = None
+
+
+def _load_pyttsx3():
+    """Imports the speech engine module"""
+    global pyttsx3  # pylint: disable=global-statement
+    if pyttsx3 is None:
+        import pyttsx3 as module  # pylint: disable=import-outside-toplevel
+
+        pyttsx3 = module
+    return pyttsx3
 
 
 ##############################
@@ -31,19 +50,189 @@ class OutputType(enum.Enum):
     SILENT = "SILENT"
 
 
+def _init_engine():
+    """Creates a speech engine"""
+    return _load_pyttsx3().init()
+
+
 class OutputEngine:
-    """A small io class which abstracts the output mechanism (spoken vs written)"""
+    """
+    A small io class which abstracts the output mechanism (spoken vs written).
+
+    In blocking mode, `output` returns once the phrase has been output. In
+    non-blocking mode, phrases are queued (up to `max_queued` of them) and output
+    in order by a speaker thread, and `output` returns straight away with a
+    future which completes once the phrase has been output (or is cancelled by
+    `cancel` or `cancel_pending`).
+    """
+
+    def __init__(
+        self,
+        output_type: OutputType,
+        audio_cache: bool = False,
+        blocking: bool = True,
+        max_queued: int = 8,
+    ):
+        """
+        Initializes the output type.
+
+        Args:
+            output_type: Whether to speak, or print.
+            audio_cache: Whether to synthesize speech to cached audio files in the
+                background (when an audio player is available), rather than
+                speaking it directly.
+            blocking: Whether `output` waits for the phrase to be output.
+            max_queued: The most phrases waiting to be output (non-blocking mode).
+        """
+        self.engine = None
+        self.synthesizer = None
+        self.player = None
+        self.blocking = blocking
+        self._spoken = output_type == OutputType.SPOKEN
+        self._current_process = None
+        # The future of the phrase being output, and of the last one interrupted.
+        self._current_future: Optional[futures.Future] = None
+        self._interrupted: Optional[futures.Future] = None
+        if self._spoken:
+            self.player = speech.find_audio_player() if audio_cache else None
+            if self.player:
+                self.synthesizer = speech.SpeechSynthesizer(_init_engine)
+            elif blocking:
+                self.engine = _init_engine()
+        if not blocking:
+            self._utterances: "queue.Queue" = queue.Queue(maxsize=max_queued)
+            started: futures.Future = futures.Future()
+            self._speaker = threading.Thread(
+                target=self._speak_queued, args=(started,), name="speaker", daemon=True
+            )
+            self._speaker.start()
+            started.result()
 
-    def __init__(self, output_type: OutputType):
-        """Initializes the output type."""
-        if output_type == OutputType.SPOKEN:
-            self.engine = pyttsx3.init()
+    def presynthesize(self, *phrases: str):
+        """Synthesizes phrases which are likely to be output soon, in the background"""
+        if self.synthesizer:
+            for phrase in phrases:
+                self.synthesizer.synthesize(phrase)
+
+    def output(
+        self,
+        phrase: str,
+        on_done: Optional[Callable[[futures.Future], None]] = None,
+    ) -> futures.Future:
+        """
+        Outputs the str.
+
+        Args:
+            phrase: The phrase to output.
+            on_done: Called with the future once the phrase has been output, or
+                cancelled.
+
+        Returns:
+            A future which completes once the phrase has been output.
+        """
+        future: futures.Future = futures.Future()
+        if on_done:
+            future.add_done_callback(on_done)
+        if self.blocking:
+            future.set_running_or_notify_cancel()
+            self._output(phrase)
+            future.set_result(None)
         else:
-            self.engine = None
+            self._utterances.put((phrase, future))
+        return future
+
+    def cancel(self, future: futures.Future):
+        """
+        Cancels a phrase (eg. a stale prompt) which was output, leaving the others
+        queued: it is skipped if it is queued, or interrupted if it is being output
+        """
+        if self.blocking or future.cancel():
+            return
+        self._interrupt(future)
+
+    def cancel_pending(self):
+        """Cancels the queued phrases, and interrupts the current one"""
+        if self.blocking:
+            return
+        while True:
+            try:
+                _, future = self._utterances.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
+        self._interrupt(self._current_future)
+
+    def _interrupt(self, future: Optional[futures.Future]):
+        """Interrupts the phrase being output, if it is the future's"""
+        if future is None or future is not self._current_future:
+            return
+        self._interrupted = future
+        process = self._current_process
+        if process:
+            process.terminate()
+        # The speech engine is stopped by the speaker thread, in `_on_word`.
+
+    def _on_word(self, **_):
+        """Stops the speech engine, if its phrase was interrupted"""
+        interrupted = self._interrupted
+        if interrupted is not None and interrupted is self._current_future:
+            self.engine.stop()
+
+    def close(self):
+        """Waits for the queued phrases to be output, and stops the speaker thread"""
+        if not self.blocking:
+            self._utterances.put((None, None))
+            self._speaker.join()
+        if self.synthesizer:
+            self.synthesizer.close()
+
+    def _speak_queued(self, started: futures.Future):
+        """The speaker thread: outputs the queued phrases in order"""
+        try:
+            if self._spoken and not self.synthesizer:
+                # The engine is only ever used by the thread which created it
+                # (including to stop it, from its callbacks).
+                self.engine = _init_engine()
+                self.engine.connect("started-word", self._on_word)
+        except Exception as e:  # pylint: disable=broad-except
+            started.set_exception(e)
+            return
+        started.set_result(None)
+        while True:
+            phrase, future = self._utterances.get()
+            if future is None:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            self._current_future = future
+            try:
+                self._output(phrase)
+            except Exception as e:  # pylint: disable=broad-except
+                future.set_exception(e)
+            else:
+                future.set_result(None)
+            finally:
+                self._current_future = None
 
-    def output(self, phrase: str):
-        """Outputs the str."""
-        if self.engine:
+    @profiling.timed("speech_output")
+    def _output(self, phrase: str):
+        """Outputs the str, blocking until it is done."""
+        if self.synthesizer:
+            try:
+                path = self.synthesizer.synthesize(phrase, speech.URGENT).result()
+            except Exception:  # pylint: disable=broad-except
+                # Speak the phrase directly if it couldn't be synthesized.
+                self.synthesizer.say(phrase).result()
+            else:
+                self._current_process = speech.play_audio_file(self.player, path)
+                if self._current_process:
+                    interrupted = self._interrupted
+                    if interrupted is not None and interrupted is self._current_future:
+                        # Interrupted before it started playing.
+                        self._current_process.terminate()
+                    self._current_process.wait()
+                    self._current_process = None
+        elif self.engine:
             self.engine.say(phrase)
             self.engine.runAndWait()
         else:
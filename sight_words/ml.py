@@ -8,6 +8,7 @@ import collections
 import numpy as np
 
 import sight_words.data_rep as data_rep
+import sight_words.profiling as profiling
 
 SUCCESS_KEY = "successes"
 FAILURE_KEY = "failures"
@@ -45,6 +46,7 @@ def choose_grade(dataset, inv_temp=1):
     return worst_grade
 
 
+@profiling.timed("choose_word")
 def choose_word(
     dataset: Dict[str, data_rep.SightWordDatum],
     inv_grade_temp=1,
@@ -93,6 +95,7 @@ def choose_grade_for_target_accuracy(
     return target_grade
 
 
+@profiling.timed("choose_word")
 def choose_word_for_target_accuracy(
     dataset: Dict[str, data_rep.SightWordDatum],
     inv_grade_temp=1,
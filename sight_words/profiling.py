@@ -0,0 +1,156 @@
+"""
+Per-phase timing of sessions.
+
+Phases (loading the dataset, choosing words, speech, game frames, saving...) are
+timed with `phase` or `timed`, when profiling is enabled by `word_practice
+--profile` or the `SIGHT_WORDS_PROFILE` environment variable. The durations of
+each phase are kept for the whole session, and summarized (count, p50, p95, max,
+total) at exit. Optionally, the session is also run under cProfile, and its
+stats are dumped (`--profile_dump` or `SIGHT_WORDS_PROFILE_DUMP`).
+
+When profiling is disabled, timing a phase costs a flag check.
+"""
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import TypeVar
+import atexit
+import collections
+import contextlib
+import functools
+import math
+import os
+import sys
+import time
+
+PROFILE_ENV = "SIGHT_WORDS_PROFILE"
+PROFILE_DUMP_ENV = "SIGHT_WORDS_PROFILE_DUMP"
+
+F = TypeVar("F", bound=Callable)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """The nearest-rank percentile of sorted values"""
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Profiler:
+    """Collects the durations of each phase"""
+
+    def __init__(self):
+        """Initializes a disabled profiler."""
+        self.enabled = False
+        self.durations: Dict[str, List[float]] = collections.defaultdict(list)
+        self._cprofile = None
+        self._dump_path: Optional[str] = None
+
+    def enable(self, dump_path: Optional[str] = None, report_at_exit: bool = True):
+        """
+        Starts profiling.
+
+        Args:
+            dump_path: If given, also run cProfile, and dump its stats here at exit.
+            report_at_exit: Print the summary to stderr at exit.
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        if dump_path:
+            import cProfile  # pylint: disable=import-outside-toplevel
+
+            self._dump_path = dump_path
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        if report_at_exit:
+            atexit.register(self.finish)
+
+    def record(self, name: str, seconds: float):
+        """Records a duration of a phase"""
+        # list.append is atomic, so phases may be timed on any thread.
+        self.durations[name].append(seconds)
+
+    @contextlib.contextmanager
+    def _phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def phase(self, name: str):
+        """A context manager timing a phase"""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._phase(name)
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """A decorator timing every call of a function as a phase"""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """The count, and p50/p95/max/total seconds, of each phase"""
+        summary = {}
+        for name, durations in sorted(self.durations.items()):
+            values = sorted(durations)
+            summary[name] = {
+                "count": len(values),
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+                "max": values[-1],
+                "total": sum(values),
+            }
+        return summary
+
+    def format_summary(self) -> str:
+        """The summary, as a table in milliseconds"""
+        lines = [
+            f"{'phase':24} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'max ms':>9} {'total ms':>10}"
+        ]
+        for name, stats in self.summary().items():
+            lines.append(
+                f"{name:24} {stats['count']:7d} {1000 * stats['p50']:9.2f} "
+                f"{1000 * stats['p95']:9.2f} {1000 * stats['max']:9.2f} "
+                f"{1000 * stats['total']:10.1f}"
+            )
+        return "\n".join(lines)
+
+    def finish(self):
+        """Stops profiling, printing the summary and dumping the cProfile stats"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self._dump_path)
+        print(self.format_summary(), file=sys.stderr)
+        if self._dump_path:
+            print(f"cProfile stats written to {self._dump_path}.", file=sys.stderr)
+
+
+profiler = Profiler()
+phase = profiler.phase
+timed = profiler.timed
+
+
+def enable_from_env():
+    """Enables profiling if the environment asks for it"""
+    dump_path = os.environ.get(PROFILE_DUMP_ENV)
+    if os.environ.get(PROFILE_ENV, "") not in ("", "0") or dump_path:
+        profiler.enable(dump_path=dump_path)
@@ -0,0 +1,328 @@
+"""
+Compact recordings of game sessions, and their replay.
+
+A recording holds the game, the seed of its random generator, and everything the
+game's loop saw: the terminal size, each keystroke (or timeout), every reading of
+its clock, and the SightWordTestEvents between words. Replaying a recording feeds
+the game the same inputs at the same clock times, so it plays out exactly as it
+did, headlessly, either as fast as possible or in real time.
+
+The file starts with `MAGIC`, the format version, the game and the seed, followed
+by records: a tag byte, then varints and length-prefixed UTF-8 strings. Clock
+readings are microsecond deltas, so most records take 2 or 3 bytes.
+"""
+from typing import BinaryIO
+from typing import Callable
+from typing import Optional
+from typing import Tuple
+import dataclasses
+import io
+import pathlib
+import random
+import struct
+import time
+
+import blessed
+from blessed.keyboard import Keystroke
+
+from sight_words import game as game_module
+from sight_words.games import stacking, tetris
+
+MAGIC = b"SWREC"
+FORMAT_VERSION = 1
+
+_GAME = b"G"  # A game loop starts: the terminal width and height.
+_CLOCK = b"C"  # The game read its clock: microseconds since the last reading.
+_KEY = b"K"  # A keystroke: its code (0 for none) and text.
+_TIMEOUT = b"T"  # A wait ended without a keystroke.
+_EVENT = b"E"  # A word was tested: the result, pass probability and word.
+
+_RESULTS = list(game_module.TestQuestionResult)
+
+GAMES = ("tetris", "stacking")
+
+
+class ReplayError(Exception):
+    """The recording is invalid, or the game no longer plays as it did"""
+
+
+def new_game(
+    name: str, seed: int, clock: Callable[[], float] = time.monotonic
+) -> game_module.AbstractGame:
+    """A new game, drawing any random numbers from the seed"""
+    if name == "tetris":
+        return tetris.Tetris(rng=random.Random(seed), clock=clock)
+    if name == "stacking":
+        return stacking.StackingGame()
+    raise ValueError(f"Unknown game: {name}.")
+
+
+def _write_varint(f: BinaryIO, value: int):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    f.write(out)
+
+
+def _write_str(f: BinaryIO, value: str):
+    data = value.encode("utf-8")
+    _write_varint(f, len(data))
+    f.write(data)
+
+
+class _Reader:
+    """Reads the fields of records"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def at_end(self) -> bool:
+        return self.pos >= len(self.data)
+
+    def read(self, n: int) -> bytes:
+        if self.pos + n > len(self.data):
+            raise ReplayError("The recording is truncated.")
+        value = self.data[self.pos : self.pos + n]
+        self.pos += n
+        return value
+
+    def varint(self) -> int:
+        value = shift = 0
+        while True:
+            byte = self.read(1)[0]
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value
+
+    def str(self) -> str:
+        return self.read(self.varint()).decode("utf-8")
+
+
+class Recorder:
+    """Records a game session"""
+
+    def __init__(
+        self,
+        f: BinaryIO,
+        game_name: str,
+        seed: Optional[int] = None,
+        time_source: Callable[[], float] = time.monotonic,
+    ):
+        """Initializes the recorder, writing the header to the (binary) file."""
+        if game_name not in GAMES:
+            raise ValueError(f"Unknown game: {game_name}.")
+        self.f = f
+        self.game_name = game_name
+        self.seed = random.randrange(2 ** 63) if seed is None else seed
+        self.time_source = time_source
+        self._last_us = 0
+        f.write(MAGIC + bytes([FORMAT_VERSION]))
+        _write_str(f, game_name)
+        f.write(struct.pack("<Q", self.seed))
+
+    @classmethod
+    def open(cls, path: pathlib.Path, game_name: str, seed: Optional[int] = None):
+        """A recorder writing to a file"""
+        return cls(open(path, "wb"), game_name, seed=seed)
+
+    def new_game(self) -> game_module.AbstractGame:
+        """The game to record: seeded, and on the recorder's clock"""
+        return new_game(self.game_name, self.seed, clock=self.clock)
+
+    def clock(self) -> float:
+        """Reads the time (to the microsecond), recording it"""
+        now_us = max(self._last_us, round(self.time_source() * 1e6))
+        self.f.write(_CLOCK)
+        _write_varint(self.f, now_us - self._last_us)
+        self._last_us = now_us
+        return now_us / 1e6
+
+    def record_loop(
+        self, game_loop: game_module.GameLoop, ui: blessed.Terminal
+    ) -> game_module.GameLoop:
+        """Wraps a game loop, recording the terminal size and what it is sent"""
+        self.f.write(_GAME)
+        _write_varint(self.f, ui.width)
+        _write_varint(self.f, ui.height)
+        reply = None
+        while True:
+            try:
+                request = game_loop.send(reply)
+            except StopIteration as stop:
+                return stop.value
+            reply = yield request
+            if reply:
+                self.f.write(_KEY)
+                _write_varint(self.f, reply.code or 0)
+                _write_str(self.f, str(reply))
+            else:
+                self.f.write(_TIMEOUT)
+
+    def record_event(self, event: game_module.SightWordTestEvent):
+        """Records a tested word"""
+        self.f.write(_EVENT)
+        self.f.write(bytes([_RESULTS.index(event.result)]))
+        self.f.write(struct.pack("<d", event.pass_probability))
+        _write_str(self.f, event.word)
+        # Events are rare, so keep the recording complete should the session crash.
+        self.f.flush()
+
+    def close(self):
+        """Closes the file"""
+        self.f.close()
+
+
+class ReplayTerminal(blessed.Terminal):
+    """A terminal of a fixed size, writing to a stream rather than a tty"""
+
+    def __init__(self, stream, kind: str = "xterm-256color"):
+        super().__init__(kind=kind, stream=stream, force_styling=True)
+        self.size = (80, 24)
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+
+class _CountingStream(io.TextIOBase):
+    """Discards the text written to it, counting it"""
+
+    def __init__(self):
+        self.n_chars = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.n_chars += len(text)
+        return len(text)
+
+
+@dataclasses.dataclass
+class ReplayResult:
+    """What happened in a replay"""
+
+    game_name: str
+    seed: int
+    n_games: int = 0
+    n_inputs: int = 0
+    n_events: int = 0
+    n_chars_written: int = 0
+    seconds: float = 0
+    final_state: Optional[game_module.AbstractGame] = None
+    game_over: Optional[game_module.GameOver] = None
+
+
+class _Player:
+    """Replays the records of a recording"""
+
+    def __init__(self, reader: _Reader, speed: Optional[float]):
+        self.reader = reader
+        self.speed = speed
+        self._now_us = 0
+        self._first_us: Optional[int] = None
+        self.start = time.perf_counter()
+
+    def expect(self, *tags: bytes) -> bytes:
+        """Reads the tag of the next record, which must be one of the tags"""
+        tag = self.reader.read(1)
+        if tag not in tags:
+            raise ReplayError(
+                f"The game didn't play as recorded: expected {tags}, found {tag}."
+            )
+        return tag
+
+    def clock(self) -> float:
+        """The recorded time of the game's next clock reading"""
+        self.expect(_CLOCK)
+        self._now_us += self.reader.varint()
+        if self._first_us is None:
+            self._first_us = self._now_us
+        elif self.speed:
+            # Wait until the recorded time, in real time.
+            due = (self._now_us - self._first_us) / 1e6 / self.speed
+            time.sleep(max(0.0, due - (time.perf_counter() - self.start)))
+        return self._now_us / 1e6
+
+    def reply(self) -> Optional[Keystroke]:
+        """The recorded reply to the game loop's next request"""
+        if self.expect(_KEY, _TIMEOUT) == _TIMEOUT:
+            return None
+        code = self.reader.varint() or None
+        return Keystroke(self.reader.str(), code=code)
+
+
+def read_header(reader: _Reader) -> Tuple[str, int]:
+    """Reads the game and seed of a recording"""
+    if reader.read(len(MAGIC)) != MAGIC:
+        raise ReplayError("This isn't a recording.")
+    version = reader.read(1)[0]
+    if version != FORMAT_VERSION:
+        raise ReplayError(f"Unsupported recording version: {version}.")
+    game_name = reader.str()
+    (seed,) = struct.unpack("<Q", reader.read(8))
+    return game_name, seed
+
+
+def replay(data: bytes, speed: Optional[float] = None, stream=None) -> ReplayResult:
+    """
+    Replays a recording.
+
+    Args:
+        data: The recording.
+        speed: Replay in real time, sped up by this factor (by default, replay as
+            fast as possible).
+        stream: Where the game draws (by default, the output is only counted).
+
+    Returns:
+        What happened.
+    """
+    reader = _Reader(data)
+    game_name, seed = read_header(reader)
+    player = _Player(reader, speed)
+    result = ReplayResult(game_name=game_name, seed=seed)
+    counter = _CountingStream()
+    ui = ReplayTerminal(stream if stream is not None else counter)
+    state = new_game(game_name, seed, clock=player.clock)
+    hook: Optional[game_module.ResumeGameHook] = None
+    while not reader.at_end():
+        tag = player.expect(_GAME, _EVENT)
+        if tag == _EVENT:
+            game_result = _RESULTS[reader.read(1)[0]]
+            (pass_probability,) = struct.unpack("<d", reader.read(8))
+            event = game_module.SightWordTestEvent(
+                reader.str(), pass_probability, game_result
+            )
+            if hook is None:
+                raise ReplayError("An event was recorded outside of a game.")
+            state = hook(event)
+            hook = None
+            result.n_events += 1
+            continue
+        ui.size = (reader.varint(), reader.varint())
+        game_loop = state.game_loop(ui)
+        result.n_games += 1
+        reply = None
+        try:
+            while True:
+                game_loop.send(reply)
+                reply = player.reply()
+                result.n_inputs += 1
+        except StopIteration as stop:
+            outcome = stop.value
+        if isinstance(outcome, game_module.GameOver):
+            result.game_over = outcome
+        else:
+            hook = outcome
+    result.seconds = time.perf_counter() - player.start
+    result.n_chars_written = counter.n_chars
+    result.final_state = state
+    return result
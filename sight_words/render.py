@@ -0,0 +1,120 @@
+"""
+A double-buffered terminal renderer for the games.
+
+A game draws each frame into the back buffer, a grid of (character, style) cells,
+and `present`s it. The renderer compares it with the front buffer (what the
+terminal shows), and writes only the changed cells, with as few cursor moves and
+style changes as it can, in a single write. This avoids the flicker (and the
+bandwidth, over slow connections) of clearing and redrawing the whole screen.
+"""
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import blessed
+
+Cell = Tuple[str, str]
+"""A character, and the terminal sequence of its style (eg. `ui.red_on_black`)"""
+
+# Rewriting a few unchanged cells is cheaper than moving the cursor past them.
+MAX_SKIPPED_CELLS = 4
+
+
+class ScreenBuffer:
+    """A grid of cells"""
+
+    def __init__(self, width: int, height: int, style: str = ""):
+        """Initializes a buffer of blank cells."""
+        self.width = width
+        self.height = height
+        self.rows: List[List[Cell]] = []
+        self.fill(style)
+
+    def fill(self, style: str):
+        """Blanks every cell, in the style"""
+        self.rows = [[(" ", style)] * self.width for _ in range(self.height)]
+
+    def put(self, x: int, y: int, text: str, style: str):
+        """Writes text at (x, y), clipping anything off the screen"""
+        if not 0 <= y < self.height:
+            return
+        row = self.rows[y]
+        for i, char in enumerate(text):
+            if 0 <= x + i < self.width:
+                row[x + i] = (char, style)
+
+    def put_centered(self, y: int, text: str, style: str):
+        """Writes text centered on a row"""
+        self.put((self.width - len(text)) // 2, y, text, style)
+
+
+class Renderer:
+    """Presents frames drawn into a back buffer, writing only what changed"""
+
+    def __init__(self, ui: blessed.Terminal, stream=None):
+        """
+        Initializes the renderer. The terminal's contents are assumed unknown, so
+        the first frame is drawn in full.
+        """
+        self.ui = ui
+        self.stream = stream if stream is not None else ui.stream
+        self.back = ScreenBuffer(ui.width, ui.height)
+        self.front: Optional[ScreenBuffer] = None
+
+    def invalidate(self):
+        """Forgets what the terminal shows, so the next frame is drawn in full"""
+        self.front = None
+
+    def begin_frame(self, style: str) -> ScreenBuffer:
+        """Returns the back buffer, blanked in the style, to draw the next frame in"""
+        if (self.back.width, self.back.height) != (self.ui.width, self.ui.height):
+            # The terminal was resized.
+            self.back = ScreenBuffer(self.ui.width, self.ui.height)
+            self.invalidate()
+        self.back.fill(style)
+        return self.back
+
+    def diff(self) -> str:
+        """The terminal output which turns the front buffer into the back buffer"""
+        out = []
+        cursor: Optional[Tuple[int, int]] = None
+        current_style: Optional[str] = None
+
+        def write(cell: Cell):
+            nonlocal current_style
+            char, style = cell
+            if style != current_style:
+                out.append(style)
+                current_style = style
+            out.append(char)
+
+        for y, row in enumerate(self.back.rows):
+            front_row = self.front.rows[y] if self.front else None
+            if row == front_row:
+                continue
+            for x, cell in enumerate(row):
+                if front_row is not None and cell == front_row[x]:
+                    continue
+                if cursor != (x, y):
+                    gap = x - cursor[0] if cursor and cursor[1] == y else 0
+                    if 0 < gap <= MAX_SKIPPED_CELLS:
+                        for skipped in row[cursor[0] : x]:
+                            write(skipped)
+                    else:
+                        out.append(self.ui.move_xy(x, y))
+                write(cell)
+                # Writing the last column leaves the cursor in limbo.
+                cursor = (x + 1, y) if x + 1 < self.back.width else None
+        return "".join(out)
+
+    def present(self):
+        """Writes the changes to the terminal, and swaps the buffers"""
+        text = self.diff()
+        if text:
+            self.stream.write(text)
+            self.stream.flush()
+        front, self.front = self.front, self.back
+        size = (self.front.width, self.front.height)
+        if front is None or (front.width, front.height) != size:
+            front = ScreenBuffer(*size)
+        self.back = front
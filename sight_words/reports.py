@@ -1,11 +1,27 @@
 """Utils to generate reports"""
+
 import math
+from typing import Any
 from typing import Dict
+from typing import Iterable
+from typing import List
 from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
 from collections import OrderedDict
+from concurrent import futures
+import collections
+import csv
+import glob
+import itertools
+import os
+import pathlib
+
 
+from sight_words import data_rep, data_utils, ml, summaries
 
-from sight_words import data_rep, ml
+KINDS = ("spelling", "reading")
 
 
 def marks_by_grade(dataset: Dict[str, data_rep.SightWordDatum]) -> Mapping[str, int]:
@@ -27,3 +43,171 @@ def marks_by_word(dataset: Dict[str, data_rep.SightWordDatum]) -> Mapping[str, i
     """Retrieves the marks by word, sorted from lowest to highest"""
     marks = {word: math.ceil(100 * datum.score) for word, datum in dataset.items()}
     return OrderedDict(sorted(marks.items(), key=lambda x: x[1]))
+
+
+def summary_marks_by_grade(
+    dataset: Dict[str, data_rep.SightWordDatum],
+    summary: Optional[data_rep.WordsSummary],
+) -> Mapping[str, int]:
+    """Retrieves the marks by grade from the stored summary, if there is one"""
+    if summary is None:
+        return marks_by_grade(dataset)
+    return summaries.grade_marks(summary)
+
+
+def summary_worst_words(
+    dataset: Dict[str, data_rep.SightWordDatum],
+    summary: Optional[data_rep.WordsSummary],
+    n_worst: int,
+) -> Mapping[str, int]:
+    """
+    Retrieves the marks of the n_worst worst words, from the stored summary if it
+    knows enough of them
+    """
+    marks = summaries.worst_words(summary, n_worst) if summary else None
+    if marks is None:
+        marks = OrderedDict(itertools.islice(marks_by_word(dataset).items(), n_worst))
+    return marks
+
+
+def find_data_files(paths: Iterable[str]) -> List[pathlib.Path]:
+    """
+    Expands data file paths: directories to the `.yml` files in them, and glob
+    patterns to their matches.
+    """
+    data_files = []
+    for path_str in paths:
+        path = pathlib.Path(path_str)
+        if path.is_dir():
+            data_files.extend(sorted(path.glob("*.yml")))
+        elif path.exists():
+            data_files.append(path)
+        else:
+            matches = sorted(glob.glob(path_str, recursive=True))
+            if not matches:
+                raise FileNotFoundError(f"No data files match {path_str}.")
+            data_files.extend(pathlib.Path(match) for match in matches)
+    # Drop duplicates, keeping the order.
+    return list(OrderedDict.fromkeys(data_files))
+
+
+def student_report(
+    data_file: pathlib.Path, n_worst: int = 10
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, int]]]:
+    """
+    Reports on a student.
+
+    Returns:
+        The (JSON-able) report, and the student's marks by word for each kind.
+    """
+    dataset = data_utils.load_dataset(data_file)
+    report: Dict[str, Any] = {"student": data_file.stem, "file": str(data_file)}
+    word_marks = {}
+    for kind in KINDS:
+        words = getattr(dataset, f"{kind}_words")
+        summary = getattr(dataset, f"{kind}_summary")
+        report[f"{kind}_grades"] = dict(summary_marks_by_grade(words, summary))
+        word_marks[kind] = dict(marks_by_word(words))
+        report[f"{kind}_worst"] = dict(
+            itertools.islice(word_marks[kind].items(), n_worst)
+        )
+    return report, word_marks
+
+
+def _safe_student_report(data_file: pathlib.Path, n_worst: int):
+    """A student report, or the error which stopped it"""
+    try:
+        return student_report(data_file, n_worst=n_worst), None
+    except Exception as e:  # pylint: disable=broad-except
+        return None, f"{type(e).__name__}: {e}"
+
+
+def class_report(
+    data_files: Sequence[pathlib.Path],
+    n_worst: int = 10,
+    n_hardest: int = 10,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Reports on a class of students, scoring their data files across a process pool.
+
+    A data file which can't be read is listed in the `errors`, rather than stopping
+    the report.
+
+    Args:
+        data_files: A data file per student.
+        n_worst: The number of each student's worst words to report.
+        n_hardest: The number of class-wide hardest words to report.
+        max_workers: The number of processes (1 scores the files in this process).
+
+    Returns:
+        A (JSON-able) report, with the `students`, the class-wide `hardest` words of
+        each kind (by mean mark), and the `errors`.
+    """
+    n_worst_list = [n_worst] * len(data_files)
+    if max_workers == 1 or len(data_files) <= 1:
+        results = list(map(_safe_student_report, data_files, n_worst_list))
+    else:
+        n_workers = max_workers or os.cpu_count() or 1
+        # Batch the files, so small classes don't pay a round trip per student.
+        chunksize = max(1, len(data_files) // (4 * n_workers))
+        with futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(
+                executor.map(
+                    _safe_student_report, data_files, n_worst_list, chunksize=chunksize
+                )
+            )
+
+    students = []
+    errors = []
+    total_marks = {kind: collections.Counter() for kind in KINDS}
+    n_students = {kind: collections.Counter() for kind in KINDS}
+    for data_file, (result, error) in zip(data_files, results):
+        if error:
+            errors.append({"file": str(data_file), "error": error})
+            continue
+        report, word_marks = result
+        students.append(report)
+        for kind in KINDS:
+            total_marks[kind].update(word_marks[kind])
+            n_students[kind].update(word_marks[kind].keys())
+
+    hardest = {}
+    for kind in KINDS:
+        mean_marks = sorted(
+            (total / n_students[kind][word], word)
+            for word, total in total_marks[kind].items()
+        )
+        hardest[kind] = [
+            {
+                "word": word,
+                "mean_mark": round(mark, 1),
+                "students": n_students[kind][word],
+            }
+            for mark, word in mean_marks[:n_hardest]
+        ]
+    return {"students": students, "hardest": hardest, "errors": errors}
+
+
+def write_class_report_csv(report: Dict[str, Any], f):
+    """Writes a class report as CSV: a row per student, with a column per mark"""
+    grade_columns = OrderedDict()
+    for student in report["students"]:
+        for kind in KINDS:
+            for grade in student[f"{kind}_grades"]:
+                grade_columns[(kind, grade)] = f"{kind}_grade_{grade}"
+    fieldnames = [
+        "student",
+        "file",
+        *grade_columns.values(),
+        *(f"{kind}_worst" for kind in KINDS),
+    ]
+    writer = csv.DictWriter(f, fieldnames=fieldnames)
+    writer.writeheader()
+    for student in report["students"]:
+        row = {"student": student["student"], "file": student["file"]}
+        for (kind, grade), column in grade_columns.items():
+            row[column] = student[f"{kind}_grades"].get(grade, "")
+        for kind in KINDS:
+            row[f"{kind}_worst"] = " ".join(student[f"{kind}_worst"])
+        writer.writerow(row)
@@ -0,0 +1,205 @@
+"""
+Provisioning a roster of students' data files in bulk.
+
+A roster is a CSV file with a row per student, and the columns:
+ - `student`: the name of the student (their data file is `<student>.yml`),
+ - `grade`: the student's grade,
+ - `words` (optional): a word list yaml file (by default, the bundled sight words),
+ - `texts` (optional): space separated names of texts.
+Each word list is loaded once, and the data files are created (or updated with any
+missing grades) across a process pool.
+"""
+from concurrent import futures
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+import collections
+import csv
+import dataclasses
+import enum
+import functools
+import os
+import pathlib
+
+from sight_words import data_rep, data_utils
+
+WordList = Dict[int, List[str]]
+
+
+@dataclasses.dataclass(frozen=True)
+class RosterEntry:
+    """A row of the roster"""
+
+    student: str
+    grade: int
+    words: Optional[str] = None
+    texts: Tuple[str, ...] = ()
+
+
+class Action(enum.Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    FAILED = "failed"
+
+
+@dataclasses.dataclass(frozen=True)
+class ProvisionResult:
+    """What provisioning did to a student's data file"""
+
+    student: str
+    path: pathlib.Path
+    action: Action
+    n_words_added: int = 0
+    error: str = ""
+
+
+def read_roster(lines) -> List[RosterEntry]:
+    """Reads the roster from CSV lines"""
+    reader = csv.DictReader(lines)
+    missing = {"student", "grade"} - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"The roster has no {', '.join(sorted(missing))} column.")
+    entries = []
+    for row in reader:
+        student = (row["student"] or "").strip()
+        if not student:
+            raise ValueError(f"Line {reader.line_num} has no student.")
+        if any(sep in student for sep in ("/", "\\")) or student.startswith("."):
+            raise ValueError(f"Line {reader.line_num}: {student!r} isn't a name.")
+        try:
+            grade = int(row["grade"])
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Line {reader.line_num} has no valid grade.") from e
+        entries.append(
+            RosterEntry(
+                student=student,
+                grade=grade,
+                words=(row.get("words") or "").strip() or None,
+                texts=tuple((row.get("texts") or "").split()),
+            )
+        )
+    return entries
+
+
+def provision_student(
+    entry: RosterEntry,
+    data_dir: pathlib.Path,
+    word_list: WordList,
+    default_texts: Sequence[str],
+    past_grade_success_incr: int = 1,
+    dry_run: bool = False,
+) -> ProvisionResult:
+    """Creates a student's data file, or adds any grades it is missing"""
+    path = data_dir / f"{entry.student}.yml"
+    words = data_utils.build_new_raw_dataset(
+        word_list,
+        max_grade=entry.grade,
+        past_grade_success_incr=past_grade_success_incr,
+    )
+    texts = list(entry.texts or default_texts)
+    if not path.exists():
+        if not dry_run:
+            dataset = data_rep.DataSet(
+                spelling_words=words, reading_words=words, text=texts
+            )
+            data_utils.DatasetFile(path).save(dataset)
+        return ProvisionResult(entry.student, path, Action.CREATED, len(words))
+
+    n_added = 0
+    changed = False
+
+    def add_grades(dataset: data_rep.DataSet) -> Optional[data_rep.DataSet]:
+        nonlocal n_added, changed
+        new_spelling_words = {**words, **dataset.spelling_words}
+        new_reading_words = {**words, **dataset.reading_words}
+        n_added = len(new_spelling_words) - len(dataset.spelling_words)
+        n_added += len(new_reading_words) - len(dataset.reading_words)
+        new_texts = texts if entry.texts else dataset.text
+        changed = bool(n_added) or new_texts != dataset.text
+        if dry_run or not changed:
+            return None
+        return dataclasses.replace(
+            dataset,
+            spelling_words=new_spelling_words,
+            reading_words=new_reading_words,
+            text=new_texts,
+            # The summaries are recomputed once the student next practices.
+            spelling_summary=None,
+            reading_summary=None,
+        )
+
+    if dry_run:
+        add_grades(data_utils.load_dataset(path))
+    else:
+        # Under the file's lock, so a session open on it keeps its events.
+        data_utils.DatasetFile(path).update(add_grades)
+    if not changed:
+        return ProvisionResult(entry.student, path, Action.UNCHANGED)
+    return ProvisionResult(entry.student, path, Action.UPDATED, n_added)
+
+
+def _safe_provision_student(args, **kwargs) -> ProvisionResult:
+    """Provisions a student, reporting (rather than raising) any error"""
+    entry, data_dir = args[:2]
+    try:
+        return provision_student(*args, **kwargs)
+    except Exception as e:  # pylint: disable=broad-except
+        path = data_dir / f"{entry.student}.yml"
+        return ProvisionResult(
+            entry.student, path, Action.FAILED, error=f"{type(e).__name__}: {e}"
+        )
+
+
+def provision_roster(
+    entries: Sequence[RosterEntry],
+    data_dir: pathlib.Path,
+    default_texts: Sequence[str],
+    past_grade_success_incr: int = 1,
+    max_workers: Optional[int] = None,
+    dry_run: bool = False,
+) -> List[ProvisionResult]:
+    """
+    Creates or updates the data file of every student in the roster.
+
+    Args:
+        entries: The roster.
+        data_dir: The directory of the data files.
+        default_texts: The texts of students without any in the roster.
+        past_grade_success_incr: As for `data_utils.build_new_raw_dataset`.
+        max_workers: The number of processes (1 provisions in this process).
+        dry_run: Report what would change, without writing anything.
+
+    Returns:
+        The result for each entry, in order.
+    """
+    counts = collections.Counter(entry.student for entry in entries)
+    duplicates = sorted(student for student, n in counts.items() if n > 1)
+    if duplicates:
+        raise ValueError(f"The roster repeats {', '.join(duplicates)}.")
+    data_dir.mkdir(parents=True, exist_ok=True)
+    word_lists: Dict[Optional[str], WordList] = {}
+    for entry in entries:
+        if entry.words not in word_lists:
+            word_lists[entry.words] = (
+                data_utils.load_word_file(entry.words)
+                if entry.words
+                else data_utils.load_sight_words()
+            )
+
+    args = [
+        (entry, data_dir, word_lists[entry.words], default_texts) for entry in entries
+    ]
+    provision = functools.partial(
+        _safe_provision_student,
+        past_grade_success_incr=past_grade_success_incr,
+        dry_run=dry_run,
+    )
+    if max_workers == 1 or len(entries) <= 1:
+        return list(map(provision, args))
+    n_workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(args) // (4 * n_workers))
+    with futures.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(provision, args, chunksize=chunksize))
@@ -0,0 +1,295 @@
+"""
+An asyncio runtime for practice sessions.
+
+A single event loop drives the game, the speech output, keyboard input and
+saving, as cooperative tasks: keystrokes are read when the terminal is readable,
+speech runs on the output engine's thread, and saves run on an executor thread.
+Nothing polls, so an idle session uses (almost) no CPU.
+"""
+from typing import Optional
+import asyncio
+import contextlib
+import pathlib
+import sys
+import threading
+import time
+
+import blessed
+import click
+
+from sight_words import data_rep, data_utils, io, ml, profiling, recording
+from sight_words import scheduling, session
+from sight_words import game as game_module
+from sight_words.games import tetris
+
+
+class KeyReader:
+    """Reads keystrokes from a (cbreak mode) terminal onto an asyncio queue"""
+
+    def __init__(self, ui: blessed.Terminal):
+        """Initializes the reader; call `start` from within the event loop."""
+        self.ui = ui
+        self.keys: "asyncio.Queue[blessed.keyboard.Keystroke]" = asyncio.Queue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._reading = threading.Event()
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Starts reading keystrokes"""
+        self._loop = asyncio.get_running_loop()
+        self._reading.set()
+        try:
+            self._loop.add_reader(sys.stdin.fileno(), self._on_readable)
+        except (NotImplementedError, ValueError, OSError):
+            # Eg. windows consoles can't be watched by the event loop.
+            self._thread = threading.Thread(
+                target=self._read_in_thread, name="key-reader", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stops reading keystrokes"""
+        self._reading.clear()
+        self._stopped.set()
+        if self._thread is None and self._loop is not None:
+            self._loop.remove_reader(sys.stdin.fileno())
+
+    def _on_readable(self):
+        """Moves the available keystrokes onto the queue"""
+        if not self._reading.is_set():
+            return
+        key = self.ui.inkey(timeout=0)
+        while key:
+            self.keys.put_nowait(key)
+            key = self.ui.inkey(timeout=0)
+
+    def _read_in_thread(self):
+        """Reads keystrokes on a thread, for terminals the loop can't watch"""
+        while not self._stopped.is_set():
+            if not self._reading.wait(timeout=0.1):
+                continue
+            key = self.ui.inkey(timeout=0.1)
+            if key:
+                self._loop.call_soon_threadsafe(self.keys.put_nowait, key)
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Stops reading keystrokes, so something else can read the terminal"""
+        self._reading.clear()
+        try:
+            yield
+        finally:
+            # Drop anything typed for the other reader.
+            while not self.keys.empty():
+                self.keys.get_nowait()
+            self._reading.set()
+
+    async def get(self, timeout: Optional[float] = None):
+        """Returns the next keystroke, or None if there is none before the timeout"""
+        try:
+            return await asyncio.wait_for(self.keys.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def read_line(self, prompt: str) -> str:
+        """Reads a line of text, echoing it to the terminal"""
+        print(prompt, end="", flush=True)
+        chars = []
+        while True:
+            key = await self.get()
+            if key.code == self.ui.KEY_ENTER or key in ("\n", "\r"):
+                print(flush=True)
+                return "".join(chars)
+            if key.code in (self.ui.KEY_BACKSPACE, self.ui.KEY_DELETE) or key in (
+                "\x7f",
+                "\b",
+            ):
+                if chars:
+                    chars.pop()
+                    print("\b \b", end="", flush=True)
+            elif not key.is_sequence and key.isprintable():
+                chars.append(str(key))
+                print(key, end="", flush=True)
+
+
+async def play_game(
+    game: game_module.AbstractGame,
+    ui: blessed.Terminal,
+    keys: KeyReader,
+    recorder: Optional[recording.Recorder] = None,
+):
+    """Plays a game cooperatively, if it has a game loop, or on a thread if not"""
+    game_loop = game.game_loop(ui)
+    if game_loop is not None and recorder is not None:
+        game_loop = recorder.record_loop(game_loop, ui)
+    if game_loop is None:
+        with keys.paused():
+            return await asyncio.get_running_loop().run_in_executor(None, game.play, ui)
+    reply = None
+    try:
+        while True:
+            request = game_loop.send(reply)
+            sys.stdout.flush()
+            if isinstance(request, game_module.WaitForKey):
+                reply = await keys.get(timeout=request.timeout)
+            else:
+                await asyncio.sleep(request.seconds)
+                reply = None
+    except StopIteration as stop:
+        return stop.value
+
+
+class BackgroundSaver:
+    """Saves the latest dataset on an executor thread, one save at a time"""
+
+    def __init__(self, data_file: data_utils.DatasetFile):
+        """Initializes the saver; call `start` from within the event loop."""
+        self.data_file = data_file
+        self._latest: Optional[data_rep.DataSet] = None
+        self._pending = asyncio.Event()
+        self._closed = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Starts the saving task"""
+        self._loop = asyncio.get_running_loop()
+        self._task = self._loop.create_task(self._run())
+
+    def save(self, dataset: data_rep.DataSet):
+        """
+        Schedules a save; if saves are queued up, only the latest is written. It
+        may be called from any thread.
+        """
+        self._latest = dataset
+        if self._loop is None or self._is_loop_thread():
+            self._pending.set()
+        else:
+            self._loop.call_soon_threadsafe(self._pending.set)
+
+    def _is_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    async def _run(self):
+        """Writes the pending datasets, until closed"""
+        loop = asyncio.get_running_loop()
+        while not (self._closed and self._latest is None):
+            await self._pending.wait()
+            self._pending.clear()
+            if self._latest is not None:
+                dataset, self._latest = self._latest, None
+                await loop.run_in_executor(None, self.data_file.save, dataset)
+
+    async def close(self):
+        """Waits for the pending saves, and stops the saving task"""
+        self._closed = True
+        self._pending.set()
+        await self._task
+
+
+async def spell(
+    data_file: pathlib.Path,
+    inv_temp: float = 1,
+    inv_grade_temp: float = 1,
+    spoken: bool = True,
+    target_accuracy: float = 0.75,
+    game: bool = True,
+    audio_cache: bool = True,
+    record: Optional[pathlib.Path] = None,
+    strategy: str = "sampling",
+):
+    """Tests spelling; the asyncio counterpart of `sight_words.cli.spell`"""
+    loop = asyncio.get_running_loop()
+    output_type = io.OutputType.SPOKEN if spoken else io.OutputType.SILENT
+    # Printing is instant, so only speech is queued.
+    engine = io.OutputEngine(
+        output_type=output_type, audio_cache=audio_cache, blocking=not spoken
+    )
+    dataset_file = data_utils.DatasetFile(data_file)
+    dataset = await loop.run_in_executor(None, dataset_file.load)
+    text = await loop.run_in_executor(
+        None, data_utils.get_indexed_sentences, *dataset.text
+    )
+    # Choose context sentences no harder than the student's grade.
+    student_grade = max(datum.grade for datum in dataset.spelling_words.values())
+
+    ui = blessed.Terminal()
+    keys = KeyReader(ui)
+    saver = BackgroundSaver(dataset_file)
+    recorder = recording.Recorder.open(record, "tetris") if record else None
+    if recorder:
+        game_state = recorder.new_game()
+    else:
+        game_state = tetris.Tetris() if game else None
+    state = session.SessionState(dataset, game=game_state)
+    scheduler = scheduling.scheduler_for(strategy)
+
+    with ui.cbreak():
+        keys.start()
+        saver.start()
+        state.subscribe(saver.save)
+        try:
+            while True:
+                if scheduler:
+                    word = scheduler.choose_word(state.dataset.spelling_words)
+                else:
+                    word = ml.choose_word_for_target_accuracy(
+                        state.dataset.spelling_words,
+                        inv_grade_temp=inv_grade_temp,
+                        inv_temp=inv_temp,
+                        target_accuracy=target_accuracy,
+                        session_successes=state.session_successes,
+                        session_failures=state.session_failures,
+                    )
+                with profiling.phase("get_sentence"):
+                    sentence = text.get_sentence(word, grade=student_grade)
+                phrase = f"Please spell {word}"
+                if sentence:
+                    phrase += f", as in: {sentence}. {word}."
+                correction = f"Sorry! The correct spelling is: {', '.join(word)}."
+                engine.presynthesize(phrase, "Correct!", correction)
+
+                if state.game:
+                    state.game_played(await play_game(state.game, ui, keys, recorder))
+                if state.game_over:
+                    break
+
+                asked = time.monotonic()
+                attempt = r"\repeat"
+                prompt = None
+                while attempt == r"\repeat":
+                    if prompt:
+                        engine.cancel(prompt)
+                    prompt = engine.output(phrase)
+                    attempt = await keys.read_line(r"spelling (or \quit or \repeat): ")
+                response_time = time.monotonic() - asked
+                engine.cancel(prompt)
+                if attempt == r"\quit":
+                    click.secho("Quitting...")
+                    break
+
+                success = attempt.lower().strip() == word.lower().strip()
+                if success:
+                    result = game_module.TestQuestionResult.PASS
+                    engine.output("Correct!")
+                else:
+                    result = game_module.TestQuestionResult.FAIL
+                    click.secho(f"{word} is the correct spelling.")
+                    if spoken:
+                        engine.output(correction)
+                # Saved in the background, by the subscribed saver.
+                state.record_answer(word, success, response_time=response_time)
+                event = game_module.SightWordTestEvent(word, 1, result)
+                if state.resume_game(event) and recorder:
+                    recorder.record_event(event)
+        finally:
+            keys.stop()
+            saver.save(state.dataset)
+            await saver.close()
+            await loop.run_in_executor(None, engine.close)
+            if recorder:
+                recorder.close()
@@ -0,0 +1,137 @@
+"""
+Spaced repetition: an alternative to sampling words (in `sight_words.ml`), which
+scales to very large word lists.
+
+Each word is next due some time after it was last answered: soon after a failure,
+and (exponentially) later after each success in a row. The words are kept in two
+heaps, so choosing the next word takes O(log n), however many words there are:
+ - the practiced words, by when they're next due,
+ - the new words (never practiced, or only before answers had times), weakest
+   first.
+Words that are due come first, then new words, and then (when every word has
+been practiced, and none is due) the word that's due soonest.
+
+A chosen word is rescheduled the next time a word is chosen, from its (then
+updated) log, so the scheduler needs nothing but the words it chooses from.
+"""
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+import heapq
+import math
+import time
+
+from sight_words import data_rep, profiling
+
+FAILURE_INTERVAL = 60.0
+"""The seconds until a word is due again, after a failure"""
+SUCCESS_INTERVAL = 10 * 60.0
+"""The seconds until a word is due again, after a (first) success"""
+EASE = 3.0
+"""How much longer a word waits, after each further success in a row"""
+MAX_STREAK = 20
+"""The longest streak counted (so intervals stay finite)"""
+
+STRATEGIES = ("sampling", "spaced")
+"""The ways of choosing words: sampling (`sight_words.ml`), or spaced repetition"""
+
+Entry = Tuple[float, str]
+
+
+def success_streak(log: data_rep.EventLog) -> int:
+    """The number of successes in a row, at the end of the log (but its prior)"""
+    streak = 0
+    for i in range(len(log) - 1, max(len(log) - 1 - MAX_STREAK, 0), -1):
+        if log.success[i] <= log.failure[i]:
+            break
+        streak += 1
+    return streak
+
+
+def review_interval(streak: int) -> float:
+    """The seconds until a word is due again, after a streak of successes"""
+    if streak == 0:
+        return FAILURE_INTERVAL
+    return SUCCESS_INTERVAL * EASE ** (min(streak, MAX_STREAK) - 1)
+
+
+def due_time(datum: data_rep.SightWordDatum) -> Optional[float]:
+    """When the word is next due, or None if its last answer has no time"""
+    log = datum.log
+    if len(log) < 2 or log.time is None or math.isnan(log.time[-1]):
+        return None
+    return log.time[-1] + review_interval(success_streak(log))
+
+
+class SpacedRepetitionScheduler:
+    """Chooses words as they come due, for one session"""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        # The (due time, word) of practiced words, and (score, word) of new ones.
+        self._due: List[Entry] = []
+        self._new: List[Entry] = []
+        self._started = False
+        # The last word chosen: its heap and entry, and the length of its log.
+        self._chosen: Optional[Tuple[List[Entry], Entry, int]] = None
+
+    def _start(self, words: Dict[str, data_rep.SightWordDatum]):
+        """Schedules the words"""
+        for word, datum in words.items():
+            due = due_time(datum)
+            if due is None:
+                self._new.append((datum.score, word))
+            else:
+                self._due.append((due, word))
+        heapq.heapify(self._new)
+        heapq.heapify(self._due)
+        self._started = True
+
+    def _reschedule_chosen(self, words: Dict[str, data_rep.SightWordDatum]):
+        """Reschedules the last word chosen, if it was answered since"""
+        heap, entry, n_events = self._chosen
+        self._chosen = None
+        word = entry[1]
+        datum = words.get(word)
+        if datum is None:
+            return
+        if len(datum.log) == n_events:
+            heapq.heappush(heap, entry)
+            return
+        due = due_time(datum)
+        if due is None:
+            # Answered without a time: due as though it had been answered now.
+            due = self.clock() + review_interval(success_streak(datum.log))
+        heapq.heappush(self._due, (due, word))
+
+    @profiling.timed("choose_word")
+    def choose_word(self, words: Dict[str, data_rep.SightWordDatum]) -> str:
+        """
+        Chooses the next word (the words should be the same as for previous
+        choices, with their new events).
+        """
+        if not self._started:
+            self._start(words)
+        elif self._chosen is not None:
+            self._reschedule_chosen(words)
+        now = self.clock()
+        while self._due or self._new:
+            if self._due and (self._due[0][0] <= now or not self._new):
+                heap = self._due
+            else:
+                heap = self._new
+            entry = heapq.heappop(heap)
+            datum = words.get(entry[1])
+            if datum is not None:
+                self._chosen = (heap, entry, len(datum.log))
+                return entry[1]
+        raise ValueError("There are no words to choose from.")
+
+
+def scheduler_for(strategy: str) -> Optional[SpacedRepetitionScheduler]:
+    """A scheduler for the strategy, or None if words are sampled"""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}.")
+    return SpacedRepetitionScheduler() if strategy == "spaced" else None
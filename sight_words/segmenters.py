@@ -0,0 +1,190 @@
+"""Sentence segmenters used to split raw texts into sentences"""
+from typing import Dict
+from typing import List
+from typing import Match
+from typing import Set
+from typing import Type
+import abc
+import dataclasses
+import re
+
+
+# Abbreviations which end in a period but rarely end a sentence.
+ABBREVIATIONS = frozenset(
+    {
+        "mr",
+        "mrs",
+        "ms",
+        "dr",
+        "st",
+        "jr",
+        "sr",
+        "prof",
+        "rev",
+        "hon",
+        "capt",
+        "col",
+        "gen",
+        "lt",
+        "sgt",
+        "mt",
+        "ft",
+        "vs",
+        "no",
+        "co",
+        "inc",
+        "ltd",
+        "e.g",
+        "i.e",
+    }
+)
+
+# A terminator (with any closing quotes or brackets) followed by whitespace.
+_BOUNDARY_RE = re.compile(r"([.!?]+|…)([\"'”’)\]]*)(\s+)")
+# Characters which may open a new sentence.
+_OPENERS = "\"'“‘(["
+
+
+class AbstractSegmenter(abc.ABC):
+    """An abstract sentence segmenter"""
+
+    @abc.abstractmethod
+    def segment(self, text: str) -> List[str]:
+        """Splits the text into sentences"""
+        raise NotImplementedError
+
+
+class RegexSegmenter(AbstractSegmenter):
+    """
+    A pure-python segmenter which needs no downloads. It handles common
+    abbreviations, initials, and the quoted dialogue found in children's books.
+    """
+
+    def __init__(self, abbreviations: Set[str] = ABBREVIATIONS):
+        """Initializes the segmenter with a set of (lowercase) abbreviations."""
+        self.abbreviations = frozenset(abbreviations)
+
+    def is_boundary(self, text: str, match: Match) -> bool:
+        """Checks whether the candidate boundary match ends a sentence"""
+        next_ix = match.end()
+        if next_ix >= len(text):
+            return True
+        next_char = text[next_ix]
+        if next_char in _OPENERS:
+            # Skip the opening quote when checking the capitalization.
+            next_char = text[next_ix + 1 : next_ix + 2] or next_char
+        if not (next_char.isupper() or next_char.isdigit() or next_char in _OPENERS):
+            # Eg. '"Where?" asked Henry.' or 'etc. and so on'
+            return False
+        terminator, closer = match.group(1), match.group(2)
+        if terminator != "." or closer:
+            return True
+        start = max(
+            text.rfind(" ", 0, match.start()), text.rfind("\n", 0, match.start())
+        )
+        prev_word = text[start + 1 : match.start()].lstrip(_OPENERS)
+        if prev_word.lower() in self.abbreviations:
+            return False
+        if len(prev_word) == 1 and prev_word.isupper():
+            # An initial, eg. "J. H. Alden"
+            return False
+        return True
+
+    def segment(self, text: str) -> List[str]:
+        """Splits the text into sentences"""
+        sentences = []
+        start = 0
+        for match in _BOUNDARY_RE.finditer(text):
+            if self.is_boundary(text, match):
+                end = match.start(3)
+                sentences.append(text[start:end].strip())
+                start = match.end()
+        sentences.append(text[start:].strip())
+        return [s for s in sentences if s]
+
+
+class PunktSegmenter(AbstractSegmenter):
+    """
+    The nltk punkt segmenter. The pretrained model is downloaded only if it is
+    missing; if it can't be found, punkt is trained on the text itself.
+    """
+
+    def __init__(self, download: bool = True):
+        """Initializes the segmenter."""
+        self.download = download
+
+    def segment(self, text: str) -> List[str]:
+        """Splits the text into sentences"""
+        import nltk  # pylint: disable=import-outside-toplevel
+
+        try:
+            return nltk.sent_tokenize(text)
+        except LookupError:
+            if self.download:
+                for resource in ("punkt", "punkt_tab"):
+                    nltk.download(resource, quiet=True)
+                try:
+                    return nltk.sent_tokenize(text)
+                except LookupError:
+                    pass
+        tokenizer = nltk.tokenize.punkt.PunktSentenceTokenizer(text)
+        return tokenizer.tokenize(text)
+
+
+SEGMENTERS: Dict[str, Type[AbstractSegmenter]] = {
+    "punkt": PunktSegmenter,
+    "regex": RegexSegmenter,
+}
+
+
+def get_segmenter(name: str) -> AbstractSegmenter:
+    """Returns a segmenter by name"""
+    if name not in SEGMENTERS:
+        raise ValueError(
+            f"Unknown segmenter {name}, please choose one of {sorted(SEGMENTERS)}."
+        )
+    return SEGMENTERS[name]()
+
+
+@dataclasses.dataclass(frozen=True)
+class SegmentationAgreement:
+    """How well a candidate segmentation agrees with a reference one"""
+
+    reference_sentences: int
+    candidate_sentences: int
+    shared_boundaries: int
+    precision: float
+    recall: float
+
+    @property
+    def f1(self) -> float:
+        """The harmonic mean of precision and recall"""
+        if not self.precision + self.recall:
+            return 0.0
+        return 2 * self.precision * self.recall / (self.precision + self.recall)
+
+
+def _boundaries(sentences: List[str]) -> Set[int]:
+    """The sentence boundaries, as offsets into the text with whitespace removed"""
+    boundaries = set()
+    offset = 0
+    for sentence in sentences:
+        offset += len("".join(sentence.split()))
+        boundaries.add(offset)
+    return boundaries
+
+
+def compare_segmentations(
+    reference: List[str], candidate: List[str]
+) -> SegmentationAgreement:
+    """Compares the sentence boundaries of two segmentations of the same text"""
+    reference_boundaries = _boundaries(reference)
+    candidate_boundaries = _boundaries(candidate)
+    shared = len(reference_boundaries & candidate_boundaries)
+    return SegmentationAgreement(
+        reference_sentences=len(reference),
+        candidate_sentences=len(candidate),
+        shared_boundaries=shared,
+        precision=shared / max(len(candidate_boundaries), 1),
+        recall=shared / max(len(reference_boundaries), 1),
+    )
@@ -0,0 +1,136 @@
+"""
+The shared state of a practice session.
+
+The session loop, the game, speech and saving may run on different threads (or
+asyncio tasks), so they share the session's state through a `SessionState`:
+ - Datasets are immutable, so the current one is read without locking. Answers
+   are recorded one at a time, under a lock, and each new dataset is passed to
+   the subscribers (eg. a background saver) in order.
+ - The game is swapped (when it ends, or resumes after a word) under its own
+   lock, so recording an answer never waits on the game, nor the game on saving.
+
+Answers are recorded with their time, the session's id, and (when it is known) how
+long the student took to answer.
+"""
+from typing import Callable
+from typing import List
+from typing import Optional
+from typing import Union
+import random
+import threading
+import time
+
+from sight_words import data_rep, data_utils
+from sight_words import game as game_module
+
+Subscriber = Callable[[data_rep.DataSet], None]
+
+_session_ids = random.SystemRandom()
+
+
+def new_session_id() -> int:
+    """A random id for a session (never 0, which marks events without a session)"""
+    return _session_ids.randrange(1, 2 ** 48)
+
+
+class SessionState:
+    """The dataset, session statistics and game of a practice session"""
+
+    def __init__(
+        self,
+        dataset: data_rep.DataSet,
+        game: Optional[game_module.AbstractGame] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initializes the state of a new session."""
+        self.session_id = new_session_id()
+        self.clock = clock
+        self._dataset = dataset
+        self._dataset_lock = threading.Lock()
+        self._subscribers: List[Subscriber] = []
+        self.version = 0
+        # Use a jeffrey's prior:
+        self.session_successes = 0.5
+        self.session_failures = 0.5
+        self._game = game
+        self._game_outcome: Union[
+            None, game_module.GameOver, game_module.ResumeGameHook
+        ] = None
+        self._game_lock = threading.Lock()
+
+    @property
+    def dataset(self) -> data_rep.DataSet:
+        """The current dataset"""
+        return self._dataset
+
+    def subscribe(self, subscriber: Subscriber):
+        """
+        Calls the subscriber with every new dataset, in order. It is called with
+        the lock held, so it should only hand the dataset off (eg. to a saver).
+        """
+        with self._dataset_lock:
+            self._subscribers.append(subscriber)
+
+    def record_answer(
+        self,
+        word: str,
+        success: bool,
+        spelling: bool = True,
+        response_time: Optional[float] = None,
+    ) -> data_rep.DataSet:
+        """
+        Records an answer to a spelling (or reading) question, and how long the
+        student took to answer it (in seconds), if known.
+
+        Returns:
+            The updated dataset.
+        """
+        word_kwarg = "spelling_word" if spelling else "reading_word"
+        with self._dataset_lock:
+            dataset = data_utils.update_dataset(
+                self._dataset,
+                successes=int(success),
+                failures=int(not success),
+                time=self.clock(),
+                session=self.session_id,
+                response_time=response_time,
+                **{word_kwarg: word},
+            )
+            self._dataset = dataset
+            self.version += 1
+            self.session_successes += success
+            self.session_failures += not success
+            for subscriber in self._subscribers:
+                subscriber(dataset)
+        return dataset
+
+    @property
+    def game(self) -> Optional[game_module.AbstractGame]:
+        """The game to play next, if any"""
+        return self._game
+
+    @property
+    def game_over(self) -> bool:
+        """Whether the game has ended"""
+        return isinstance(self._game_outcome, game_module.GameOver)
+
+    def game_played(
+        self, outcome: Union[game_module.GameOver, game_module.ResumeGameHook]
+    ):
+        """Records the outcome of playing the game"""
+        with self._game_lock:
+            self._game_outcome = outcome
+
+    def resume_game(self, event: game_module.SightWordTestEvent) -> bool:
+        """
+        Resumes the paused game with a tested word.
+
+        Returns:
+            Whether there was a game to resume.
+        """
+        with self._game_lock:
+            if self._game_outcome is None or self.game_over:
+                return False
+            self._game = self._game_outcome(event)
+            self._game_outcome = None
+            return True
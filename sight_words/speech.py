@@ -0,0 +1,189 @@
+"""
+Background speech synthesis, backed by an on-disk audio cache.
+
+Phrases are synthesized to audio files by a worker thread, which owns the text
+to speech engine, and cached by a hash of the phrase and voice settings. Playing
+a cached phrase only needs an audio player, so repeated phrases (like
+"Correct!") and phrases synthesized ahead of time play instantly.
+"""
+from concurrent import futures
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+import itertools
+import os
+import pathlib
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+
+from sight_words import cache, profiling
+
+AUDIO_KIND = "audio"
+# Synthesis jobs are prioritized: phrases about to be spoken jump the queue.
+URGENT = 0
+AHEAD = 1
+
+# Command line audio players, in order of preference.
+AUDIO_PLAYERS = (
+    ["afplay"],
+    ["paplay"],
+    ["aplay", "-q"],
+    ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"],
+)
+
+
+def find_audio_player() -> Optional[List[str]]:
+    """Returns the command of an installed audio player, if any"""
+    if sys.platform == "win32":
+        return ["winsound"]
+    for command in AUDIO_PLAYERS:
+        if shutil.which(command[0]):
+            return command
+    return None
+
+
+def play_audio_file(player: List[str], path: pathlib.Path) -> Optional[Any]:
+    """
+    Starts playing an audio file.
+
+    Returns:
+        The player process (if any), which can be waited on or terminated.
+    """
+    if player == ["winsound"]:
+        import winsound  # pylint: disable=import-outside-toplevel,import-error
+
+        winsound.PlaySound(str(path), winsound.SND_FILENAME)
+        return None
+    return subprocess.Popen(
+        [*player, str(path)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+class SpeechSynthesizer:
+    """Synthesizes phrases to cached audio files on a background thread"""
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], Any],
+        artifact_cache: Optional[cache.ArtifactCache] = None,
+    ):
+        """
+        Starts the worker thread, which creates (and solely uses) the engine.
+
+        Args:
+            engine_factory: Creates a pyttsx3 (like) engine.
+            artifact_cache: The cache to store the audio in.
+        """
+        if artifact_cache is None:
+            artifact_cache = cache.ArtifactCache.default()
+        self.artifact_cache = artifact_cache
+        self.suffix = ".aiff" if sys.platform == "darwin" else ".wav"
+        self.voice_key = ""
+        self._engine_factory = engine_factory
+        self._jobs: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._pending: Dict[str, futures.Future] = {}
+        self._lock = threading.Lock()
+        started: futures.Future = futures.Future()
+        self._thread = threading.Thread(
+            target=self._run, args=(started,), name="speech-synthesizer", daemon=True
+        )
+        self._thread.start()
+        started.result()
+
+    def audio_path(self, phrase: str) -> pathlib.Path:
+        """The cached audio file for a phrase"""
+        key = cache.content_key(phrase, self.voice_key)
+        return self.artifact_cache.path_for(AUDIO_KIND, key, suffix=self.suffix)
+
+    def synthesize(self, phrase: str, priority: int = AHEAD) -> futures.Future:
+        """
+        Synthesizes the phrase in the background, unless it is cached.
+
+        Returns:
+            A future of the path to the audio file.
+        """
+        path = self.audio_path(phrase)
+        with self._lock:
+            if phrase in self._pending:
+                future = self._pending[phrase]
+                if priority == URGENT and not future.running():
+                    # Bump it up the queue; the worker skips finished jobs.
+                    self._jobs.put((priority, next(self._counter), phrase, future))
+                return future
+            future = futures.Future()
+            if path.exists():
+                self.artifact_cache.touch(path)
+                future.set_result(path)
+                return future
+            self._pending[phrase] = future
+        self._jobs.put((priority, next(self._counter), phrase, future))
+        return future
+
+    def say(self, phrase: str) -> futures.Future:
+        """Speaks the phrase directly with the engine (used without a player)"""
+        future: futures.Future = futures.Future()
+        self._jobs.put((URGENT, next(self._counter), None, (phrase, future)))
+        return future
+
+    def close(self):
+        """Stops the worker thread, once it has finished its current job"""
+        self._jobs.put((-1, next(self._counter), None, None))
+        self._thread.join()
+
+    def _run(self, started: futures.Future):
+        """The worker loop"""
+        try:
+            engine = self._engine_factory()
+            self.voice_key = repr(
+                [engine.getProperty(p) for p in ("voice", "rate", "volume")]
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            started.set_exception(e)
+            return
+        started.set_result(None)
+        while True:
+            _, _, phrase, job = self._jobs.get()
+            if job is None:
+                return
+            if phrase is None:
+                self._say(engine, *job)
+            elif job.running() or job.done():
+                # A duplicate of a job bumped up the queue.
+                continue
+            elif job.set_running_or_notify_cancel():
+                self._synthesize(engine, phrase, job)
+
+    def _say(self, engine, phrase: str, future: futures.Future):
+        """Speaks the phrase"""
+        try:
+            engine.say(phrase)
+            engine.runAndWait()
+            future.set_result(None)
+        except Exception as e:  # pylint: disable=broad-except
+            future.set_exception(e)
+
+    @profiling.timed("speech_synthesis")
+    def _synthesize(self, engine, phrase: str, future: futures.Future):
+        """Synthesizes the phrase to the cache"""
+        path = self.audio_path(phrase)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}{path.suffix}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            engine.save_to_file(phrase, str(tmp_path))
+            engine.runAndWait()
+            os.replace(tmp_path, path)
+        except Exception as e:  # pylint: disable=broad-except
+            with self._lock:
+                del self._pending[phrase]
+            future.set_exception(e)
+            return
+        with self._lock:
+            del self._pending[phrase]
+        future.set_result(path)
+        self.artifact_cache.added(path)
@@ -0,0 +1,205 @@
+"""
+A light, dependency free stemmer, mapping inflections of a word to a shared key.
+
+The keys aren't necessarily words (eg. "make", "makes" and "making" all map to
+"mak"), they only need to agree across an inflection family.
+"""
+import functools
+
+VERSION = "2"
+"""Stored stems record it; bump it whenever the stems of words change"""
+
+# Irregular inflections, mapped to their base form (which isn't itself mapped).
+IRREGULAR_FORMS = {
+    "am": "be",
+    "is": "be",
+    "are": "be",
+    "was": "be",
+    "were": "be",
+    "been": "be",
+    "being": "be",
+    "having": "have",
+    "doing": "do",
+    "going": "go",
+    "has": "have",
+    "had": "have",
+    "does": "do",
+    "did": "do",
+    "done": "do",
+    "goes": "go",
+    "went": "go",
+    "gone": "go",
+    "ran": "run",
+    "saw": "see",
+    "seen": "see",
+    "came": "come",
+    "made": "make",
+    "said": "say",
+    "says": "say",
+    "took": "take",
+    "taken": "take",
+    "gave": "give",
+    "given": "give",
+    "got": "get",
+    "gotten": "get",
+    "ate": "eat",
+    "eaten": "eat",
+    "knew": "know",
+    "known": "know",
+    "grew": "grow",
+    "grown": "grow",
+    "threw": "throw",
+    "thrown": "throw",
+    "flew": "fly",
+    "flown": "fly",
+    "drew": "draw",
+    "drawn": "draw",
+    "wrote": "write",
+    "written": "write",
+    "rode": "ride",
+    "ridden": "ride",
+    "spoke": "speak",
+    "spoken": "speak",
+    "broke": "break",
+    "broken": "break",
+    "chose": "choose",
+    "chosen": "choose",
+    "froze": "freeze",
+    "frozen": "freeze",
+    "began": "begin",
+    "begun": "begin",
+    "sang": "sing",
+    "sung": "sing",
+    "swam": "swim",
+    "swum": "swim",
+    "drank": "drink",
+    "drunk": "drink",
+    "rang": "ring",
+    "rung": "ring",
+    "sat": "sit",
+    "stood": "stand",
+    "understood": "understand",
+    "found": "find",
+    "thought": "think",
+    "brought": "bring",
+    "bought": "buy",
+    "caught": "catch",
+    "taught": "teach",
+    "fought": "fight",
+    "told": "tell",
+    "sold": "sell",
+    "held": "hold",
+    "kept": "keep",
+    "slept": "sleep",
+    "felt": "feel",
+    "left": "leave",
+    "meant": "mean",
+    "met": "meet",
+    "led": "lead",
+    "fed": "feed",
+    "fell": "fall",
+    "fallen": "fall",
+    "heard": "hear",
+    "paid": "pay",
+    # "lay" is the past of "lie", but also a verb of its own.
+    "laid": "lay",
+    "lain": "lie",
+    "lying": "lie",
+    "lost": "lose",
+    "sent": "send",
+    "spent": "spend",
+    "built": "build",
+    "lent": "lend",
+    "won": "win",
+    "wore": "wear",
+    "worn": "wear",
+    "tore": "tear",
+    "torn": "tear",
+    "hid": "hide",
+    "hidden": "hide",
+    "bit": "bite",
+    "bitten": "bite",
+    "woke": "wake",
+    "woken": "wake",
+    "shook": "shake",
+    "shaken": "shake",
+    "stole": "steal",
+    "stolen": "steal",
+    "forgot": "forget",
+    "forgotten": "forget",
+    "children": "child",
+    "men": "man",
+    "women": "woman",
+    "feet": "foot",
+    "teeth": "tooth",
+    "mice": "mouse",
+    "people": "person",
+    "better": "good",
+    "best": "good",
+    "worse": "bad",
+    "worst": "bad",
+}
+
+# Words which look inflected, but aren't.
+UNINFLECTED = frozenset(
+    {
+        "anything",
+        "ceiling",
+        "darling",
+        "during",
+        "evening",
+        "everything",
+        "hundred",
+        "morning",
+        "naked",
+        "nothing",
+        "pudding",
+        "sacred",
+        "sibling",
+        "something",
+        "wicked",
+    }
+)
+
+_VOWELS = set("aeiouy")
+
+
+def _has_vowel(stem: str) -> bool:
+    """Whether the stem has a vowel, as any stem left by removing a suffix should"""
+    return any(c in _VOWELS for c in stem)
+
+
+def _undouble(stem: str) -> str:
+    """Removes a doubled final consonant, eg. "runn" -> "run"."""
+    if len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] not in _VOWELS | set("lsz"):
+        return stem[:-1]
+    return stem
+
+
+@functools.lru_cache(maxsize=None)
+def stem(word: str) -> str:
+    """Returns the key of the inflection family of a word."""
+    word = word.lower()
+    word = IRREGULAR_FORMS.get(word, word)
+    if word in UNINFLECTED:
+        return word
+    if len(word) > 4 and word.endswith(("ies", "ied")):
+        word = word[:-3] + "y"
+    elif len(word) > 5 and word.endswith("ing") and _has_vowel(word[:-3]):
+        # The guards keep words like "thing", "bring" and "string" intact.
+        word = _undouble(word[:-3])
+    elif (
+        len(word) > 4
+        and word.endswith("ed")
+        and not word.endswith("eed")
+        and _has_vowel(word[:-2])
+    ):
+        # Words like "need" and "speed" aren't inflections.
+        word = _undouble(word[:-2])
+    elif len(word) > 4 and word.endswith(("ches", "shes", "sses", "xes", "zes")):
+        word = word[:-2]
+    elif len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    if len(word) > 3 and word.endswith("e"):
+        word = word[:-1]
+    return word
@@ -0,0 +1,139 @@
+"""
+Materialized report summaries, stored with the dataset.
+
+A summary is updated in O(grades + SUMMARY_WORST_WORDS) as each answer is recorded,
+so reports are answered without touching the event logs.
+
+The summary's `worst` list always holds the true lowest (mark, word) keys, but
+it may shrink: when a word in it improves past the rest, the next worst word is
+unknown without a full scan. Given the words, an update refills it (with a full
+scan) once it is down to half its size, so the scans are rare.
+
+The sums by grade are rounded to `SUM_DIGITS` places, so that adding and
+subtracting (floating point) counts answer after answer doesn't drift from the
+exact totals.
+"""
+
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+from collections import OrderedDict
+import bisect
+import collections
+import heapq
+import math
+
+from sight_words import data_rep
+
+SUMMARY_WORST_WORDS = 50
+SUM_DIGITS = 9
+
+
+def word_mark(datum: data_rep.SightWordDatum) -> int:
+    """The mark of a word, as in `sight_words.reports.marks_by_word`"""
+    return math.ceil(100 * datum.score)
+
+
+def summarize(words: Dict[str, data_rep.SightWordDatum]) -> data_rep.WordsSummary:
+    """Computes the summary of the words from their event logs"""
+    grade_successes: Dict[int, List[float]] = collections.defaultdict(list)
+    grade_failures: Dict[int, List[float]] = collections.defaultdict(list)
+    for datum in words.values():
+        grade_successes[datum.grade].append(datum.successes)
+        grade_failures[datum.grade].append(datum.failures)
+    return data_rep.WordsSummary(
+        n_words=len(words),
+        grade_successes={
+            grade: round(math.fsum(counts), SUM_DIGITS)
+            for grade, counts in grade_successes.items()
+        },
+        grade_failures={
+            grade: round(math.fsum(counts), SUM_DIGITS)
+            for grade, counts in grade_failures.items()
+        },
+        worst=_worst_keys(words),
+    )
+
+
+def _worst_keys(words: Dict[str, data_rep.SightWordDatum]) -> List[Tuple[int, str]]:
+    """The (mark, word) of the `SUMMARY_WORST_WORDS` worst words, lowest first"""
+    return heapq.nsmallest(
+        SUMMARY_WORST_WORDS, ((word_mark(datum), word) for word, datum in words.items())
+    )
+
+
+def update_summary(
+    summary: data_rep.WordsSummary,
+    word: str,
+    old_datum: data_rep.SightWordDatum,
+    new_datum: data_rep.SightWordDatum,
+    words: Optional[Dict[str, data_rep.SightWordDatum]] = None,
+) -> data_rep.WordsSummary:
+    """
+    Updates the summary for a change to one word's datum. Given the (updated)
+    words, the worst words are refilled once they're down to half their number.
+    """
+    grade_successes = dict(summary.grade_successes)
+    grade_failures = dict(summary.grade_failures)
+    grade_successes[old_datum.grade] = round(
+        grade_successes[old_datum.grade] - old_datum.successes, SUM_DIGITS
+    )
+    grade_failures[old_datum.grade] = round(
+        grade_failures[old_datum.grade] - old_datum.failures, SUM_DIGITS
+    )
+    grade_successes[new_datum.grade] = round(
+        grade_successes.get(new_datum.grade, 0) + new_datum.successes, SUM_DIGITS
+    )
+    grade_failures[new_datum.grade] = round(
+        grade_failures.get(new_datum.grade, 0) + new_datum.failures, SUM_DIGITS
+    )
+
+    worst = list(summary.worst)
+    old_key = (word_mark(old_datum), word)
+    index = bisect.bisect_left(worst, old_key)
+    if index < len(worst) and worst[index] == old_key:
+        del worst[index]
+    new_key = (word_mark(new_datum), word)
+    # Every word outside the list is at least its last key; a word below that is
+    # among the worst, while one above it could be behind unknown words (unless
+    # every other word is in the list).
+    if len(worst) == summary.n_words - 1 or (worst and new_key < worst[-1]):
+        bisect.insort(worst, new_key)
+        del worst[SUMMARY_WORST_WORDS:]
+    if words is not None and len(worst) < min(SUMMARY_WORST_WORDS, len(words)) // 2:
+        worst = _worst_keys(words)
+
+    return data_rep.WordsSummary(
+        n_words=summary.n_words,
+        grade_successes=grade_successes,
+        grade_failures=grade_failures,
+        worst=worst,
+    )
+
+
+def grade_marks(summary: data_rep.WordsSummary) -> Mapping[str, int]:
+    """The marks by grade, as in `sight_words.reports.marks_by_grade`"""
+    # Imported here: data_utils uses this module, and numpy is slow to import.
+    from sight_words import ml  # pylint: disable=import-outside-toplevel
+
+    marks = OrderedDict()
+    for grade in sorted(summary.grade_successes, reverse=True):
+        successes = ml.PRIOR_SUCCESSES + summary.grade_successes[grade]
+        failures = ml.PRIOR_FAILURES + summary.grade_failures[grade]
+        grade_str = "K" if grade == 0 else str(grade)
+        marks[grade_str] = math.ceil(100 * successes / (successes + failures))
+    return marks
+
+
+def worst_words(
+    summary: data_rep.WordsSummary, n_worst: int
+) -> Optional[Mapping[str, int]]:
+    """
+    The marks of the `n_worst` worst words, lowest first, or None if the summary
+    no longer knows that many.
+    """
+    if len(summary.worst) < min(n_worst, summary.n_words):
+        return None
+    return OrderedDict((word, mark) for mark, word in summary.worst[:n_worst])
@@ -0,0 +1,12 @@
+"""Shared test fixtures"""
+import pytest
+
+from sight_words import cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory, monkeypatch):
+    """Keeps the tests from reading or writing the user's cache"""
+    path = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv(cache.CACHE_DIR_ENV, str(path))
+    return path
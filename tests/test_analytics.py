@@ -0,0 +1,100 @@
+"""Tests for the learning-curve analytics"""
+import json
+
+import numpy as np
+
+from sight_words import analytics, data_rep
+
+PRIOR = data_rep.Event(0.5, 0.5)
+HOUR = analytics.HOUR
+
+
+def _event(success, time=None, session=None, response_time=None):
+    return data_rep.Event(
+        int(success),
+        int(not success),
+        time=time,
+        session=session,
+        response_time=response_time,
+    )
+
+
+def _dataset(**words):
+    """A dataset of spelling words, given as (grade, events) pairs"""
+    spelling_words = {
+        word: data_rep.SightWordDatum(grade, [PRIOR, *events])
+        for word, (grade, events) in words.items()
+    }
+    return data_rep.DataSet(spelling_words=spelling_words, reading_words={})
+
+
+def _students():
+    alice = _dataset(
+        cat=(0, [_event(0, 0, 1, 4.0), _event(1, HOUR, 1, 2.0), _event(1, 2 * HOUR)]),
+        dog=(1, [_event(1, 10, 1), _event(1, 3 * 24 * HOUR, 2, 1.0)]),
+        the=(0, []),
+    )
+    # Events recorded before times and sessions were.
+    bob = _dataset(cat=(0, [_event(0), _event(0)]))
+    return {"alice": alice, "bob": bob}
+
+
+def test_event_table():
+    """Tests flattening the students' events, without their priors"""
+    table = analytics.event_table(_students())
+    assert len(table) == 7
+    assert table.students == ["alice", "bob"]
+    words = [table.words[i] for i in table.word]
+    assert words == ["cat"] * 3 + ["dog"] * 2 + ["cat"] * 2
+    assert table.student.tolist() == [0] * 5 + [1] * 2
+    assert table.attempt.tolist() == [1, 2, 3, 1, 2, 1, 2]
+    assert table.session.tolist() == [1, 1, 0, 1, 2, 0, 0]
+    assert np.isnan(table.time[-2:]).all()
+
+
+def test_learning_curves():
+    """Tests the accuracy at each attempt, by grade and by word"""
+    table = analytics.event_table(_students())
+    curves = analytics.learning_curves(table, max_attempts=2)
+    assert curves.groups == [0, 1]
+    assert curves.trials.tolist() == [[2, 2], [1, 1]]
+    np.testing.assert_allclose(curves.accuracy, [[0, 0.5], [1, 1]])
+
+    curves = analytics.learning_curves(table, by="word", max_attempts=3)
+    assert curves.groups == ["cat", "dog"]
+    np.testing.assert_allclose(curves.accuracy, [[0, 0.5, 1], [1, 1, np.nan]])
+
+
+def test_retention():
+    """Tests the accuracy by the time since the last attempt"""
+    table = analytics.event_table(_students())
+    kept = analytics.retention(table)
+    # An hour later (twice), then 3 days later.
+    assert kept.trials.tolist() == [0, 0, 0, 2, 1, 0, 0]
+    assert kept.successes.tolist() == [0, 0, 0, 2, 1, 0, 0]
+
+
+def test_session_summaries():
+    """Tests summarizing the sessions, in the order they started"""
+    table = analytics.event_table(_students())
+    sessions = analytics.session_summaries(table)
+    assert sessions.student == ["alice", "alice"]
+    assert sessions.session.tolist() == [1, 2]
+    assert sessions.n_events.tolist() == [3, 1]
+    np.testing.assert_allclose(sessions.accuracy, [2 / 3, 1])
+    np.testing.assert_allclose(sessions.end - sessions.start, [HOUR, 0])
+    np.testing.assert_allclose(sessions.mean_response_time, [3.0, 1.0])
+
+
+def test_report():
+    """Tests that the report is JSON-able, and empty datasets are reported"""
+    report = analytics.report(_students(), by="word")
+    assert report["n_events"] == 7
+    assert report["learning_curves"][0]["word"] == "cat"
+    assert report["sessions"][0]["seconds"] == HOUR
+    json.dumps(report)
+
+    report = analytics.report({"carol": _dataset()})
+    assert report["n_events"] == 0
+    assert report["sessions"] == []
+    json.dumps(report)
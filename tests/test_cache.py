@@ -0,0 +1,99 @@
+"""Tests for the artifact cache"""
+import os
+import pickle
+from unittest import mock
+
+from sight_words import cache
+
+
+def test_get_or_build(tmp_path):
+    """Tests that artifacts are built once, then reused"""
+    artifact_cache = cache.ArtifactCache(tmp_path)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {"a": [1, 2]}
+
+    key = cache.content_key("inputs")
+    assert artifact_cache.get_or_build("test", key, build) == {"a": [1, 2]}
+    assert artifact_cache.get_or_build("test", key, build) == {"a": [1, 2]}
+    assert len(calls) == 1
+    # Changing the inputs invalidates the artifact
+    other_key = cache.content_key("other inputs")
+    artifact_cache.get_or_build("test", other_key, build)
+    assert len(calls) == 2
+
+
+def test_corrupt_artifacts_are_rebuilt(tmp_path):
+    """Tests that a corrupt artifact is treated as missing"""
+    artifact_cache = cache.ArtifactCache(tmp_path)
+    key = cache.content_key("inputs")
+    path = artifact_cache.path_for("test", key)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"garbage")
+    assert artifact_cache.get("test", key) is None
+    assert not path.exists()
+
+
+class _Incompatible:
+    """Unpickles by raising a ValueError (eg. as a changed class might)"""
+
+    def __reduce__(self):
+        return (int, ("not a number",))
+
+
+def test_incompatible_artifacts_are_dropped(tmp_path):
+    """Tests that an artifact which fails to unpickle in any way is a miss"""
+    artifact_cache = cache.ArtifactCache(tmp_path)
+    key = cache.content_key("inputs")
+    path = artifact_cache.path_for("test", key)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(pickle.dumps(_Incompatible()))
+    assert artifact_cache.get("test", key) is None
+    assert not path.exists()
+
+
+def test_puts_keep_a_running_size(tmp_path):
+    """Tests that the artifacts are only scanned when the cache may be too big"""
+    artifact_cache = cache.ArtifactCache(tmp_path, max_bytes=10 ** 9)
+    with mock.patch.object(
+        artifact_cache, "_artifacts", wraps=artifact_cache._artifacts
+    ) as scans:
+        for i in range(20):
+            artifact_cache.put("test", cache.content_key(str(i)), "x" * 1000)
+        assert scans.call_count == 1
+        # Once the cache is full, each eviction makes room for several artifacts.
+        artifact_cache.max_bytes = artifact_cache.size()
+        scans.reset_mock()
+        for i in range(20, 40):
+            artifact_cache.put("test", cache.content_key(str(i)), "x" * 1000)
+        assert 1 <= scans.call_count <= 5
+    assert artifact_cache.size() <= artifact_cache.max_bytes
+
+
+def test_eviction(tmp_path):
+    """Tests that the least recently used artifacts are evicted first"""
+    artifact_cache = cache.ArtifactCache(tmp_path, max_bytes=10 ** 9)
+    keys = [cache.content_key(str(i)) for i in range(3)]
+    for i, key in enumerate(keys):
+        artifact_cache.put("test", key, "x" * 1000)
+        os.utime(artifact_cache.path_for("test", key), (i, i))
+    # Using the oldest artifact makes it the most recent
+    assert artifact_cache.get("test", keys[0]) == "x" * 1000
+
+    size = artifact_cache.path_for("test", keys[0]).stat().st_size
+    assert artifact_cache.evict(max_bytes=2 * size) == 1
+    assert not artifact_cache.path_for("test", keys[1]).exists()
+    assert artifact_cache.path_for("test", keys[0]).exists()
+    assert artifact_cache.path_for("test", keys[2]).exists()
+
+
+def test_text_path(cache_dir):
+    """Tests that the user's texts shadow the bundled ones"""
+    assert cache.text_path("boxcar.yml").parent == cache.package_data_dir()
+    user_path = cache.texts_dir() / "boxcar.yml"
+    user_path.parent.mkdir(parents=True)
+    user_path.write_text("[]")
+    assert cache.text_path("boxcar.yml") == user_path
+    assert cache.text_path("new.yml") == cache.texts_dir() / "new.yml"
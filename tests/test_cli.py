@@ -0,0 +1,28 @@
+"""Tests for the command line interface"""
+import yaml
+from click.testing import CliRunner
+
+from sight_words import cli, data_utils, reports
+
+
+def test_add_grade_to_data_file(tmp_path):
+    """Tests that adding a grade reports on it, once the student has practiced"""
+    data_file = tmp_path / "student.yml"
+    word_file = tmp_path / "words.yml"
+    word_file.write_text(yaml.dump({2: ["crimson", "dungeon"]}))
+    runner = CliRunner()
+    result = runner.invoke(cli.main, ["new_data_file", str(data_file), "1"])
+    assert result.exit_code == 0, result.output
+    dataset = data_utils.load_dataset(data_file)
+    word = next(iter(dataset.spelling_words))
+    data_utils.save_dataset(
+        data_file, data_utils.update_dataset(dataset, spelling_word=word, successes=1)
+    )
+
+    result = runner.invoke(
+        cli.main, ["add_grade_to_data_file", str(data_file), str(word_file), "2"]
+    )
+    assert result.exit_code == 0, result.output
+    report, _ = reports.student_report(data_file)
+    assert len(report["spelling_grades"]) == 3
+    assert report["spelling_grades"] == report["reading_grades"]
@@ -0,0 +1,73 @@
+"""Tests for the compiled sentence index"""
+import concurrent.futures
+
+from sight_words import compiled_index
+
+
+def test_append_and_compact(tmp_path):
+    """Tests that appended texts are found before and after compaction"""
+    index = compiled_index.CompiledIndex(tmp_path / "test.index")
+    assert not index.exists()
+    assert index.append(["hi there", "bob ate the cat"], source="a") == 1
+    assert index.append(["there is a way", "Bob ran"], source="b") == 2
+    assert index.exists()
+
+    loaded = index.load()
+    assert loaded.sentences == [
+        "hi there",
+        "bob ate the cat",
+        "there is a way",
+        "Bob ran",
+    ]
+    assert loaded.index["there"] == [0, 2]
+    assert loaded.index["bob"] == [1, 3]
+    assert loaded.get_sentence("way") == "there is a way"
+
+    assert index.compact() == 2
+    manifest = index.read_manifest()
+    assert len(manifest["segments"]) == 1
+    assert manifest["segments"][0]["sources"] == ["a", "b"]
+    assert sorted(p.name for p in index.path.iterdir()) == [
+        "manifest.yml",
+        "manifest.yml.lock",
+        manifest["segments"][0]["file"],
+    ]
+    assert index.load() == loaded
+
+    # Appending after a compaction extends the compacted index
+    index.append(["a new cat"], source="c")
+    assert index.load().index["cat"] == [1, 4]
+
+
+def test_merge_segments():
+    """Tests that merging offsets the postings of later segments"""
+    merged = compiled_index.merge_segments(
+        [
+            compiled_index.data_utils.SentenceIndex(
+                sentences=["a b"], index={"a": [0], "b": [0]}
+            ),
+            compiled_index.data_utils.SentenceIndex(
+                sentences=["b c", "c"], index={"b": [0], "c": [0, 1]}
+            ),
+        ]
+    )
+    assert merged.sentences == ["a b", "b c", "c"]
+    assert merged.index == {"a": [0], "b": [0, 1], "c": [1, 2]}
+
+
+def _append_and_compact(path, source):
+    """Appends a text to the index, and compacts it (in another process)"""
+    index = compiled_index.CompiledIndex(path)
+    index.append([f"a sentence from {source}"], source=source)
+    index.compact()
+
+
+def test_concurrent_appends_and_compactions(tmp_path):
+    """Tests that processes appending and compacting don't lose segments"""
+    path = tmp_path / "test.index"
+    sources = [str(i) for i in range(8)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_append_and_compact, [path] * len(sources), sources))
+    manifest = compiled_index.CompiledIndex(path).read_manifest()
+    kept = [source for s in manifest["segments"] for source in s["sources"]]
+    assert sorted(kept) == sources
@@ -22,3 +22,43 @@ def test_deserialization():
     data = yaml.load(blob)
 
     assert data == expected_data
+
+
+def test_event_log():
+    """Tests that event logs behave as lists of events"""
+    events = [
+        data_rep.Event(1, 0),
+        data_rep.Event(0, 1, time=1e9, session=7, response_time=2.5),
+    ]
+    log = data_rep.EventLog.from_events(events)
+    assert len(log) == 2
+    assert list(log) == events
+    assert log[-1] == events[-1]
+    assert log[:1] == events[:1]
+    assert data_rep.EventLog.from_events(events[:1]).time is None
+    assert list(log[:1] + log[1:]) == events
+    assert data_rep.SightWordDatum(1, events).log == log
+    assert data_rep.SightWordDatum(1, log).failures == 1
+
+
+def test_event_log_validation():
+    """Tests that data validate their logs, with the installed version of pydantic"""
+    events = [data_rep.Event(1, 0), data_rep.Event(0, 1)]
+    log = data_rep.EventLog.from_events(events)
+    assert data_rep.SightWordDatum(1, log).log is log
+    converted = data_rep.SightWordDatum(2, events).log
+    assert isinstance(converted, data_rep.EventLog)
+    assert converted == log
+
+
+def test_event_log_serialization():
+    """Tests that logs with times are stored as columns, and round trip"""
+    datum = data_rep.SightWordDatum(
+        1, [data_rep.Event(1, 0), data_rep.Event(0, 1, time=1e9, session=7)]
+    )
+    blob = yaml.dump(datum)
+    assert blob == (
+        "!SightWordDatum\ngrade: 1\nlog: !EventLog\n  success: [1.0, 0.0]\n"
+        "  failure: [0.0, 1.0]\n  time: [.nan, 1000000000.0]\n  session: [0, 7]\n"
+    )
+    assert yaml.load(blob, Loader=yaml.FullLoader) == datum
@@ -1,12 +1,19 @@
 """Tests for the data utils"""
 import copy
+import dataclasses
+import os
 import pathlib
+import stat
+import threading
 
 import hypothesis
 import hypothesis.strategies as h_strats
 
+import sight_words.cache as cache
 import sight_words.data_utils as data_utils
 import sight_words.data_rep as data_rep
+import sight_words.stemming as stemming
+import sight_words.summaries as summaries
 
 
 def test_load_sight_words():
@@ -143,3 +150,258 @@ def test_merged_index_object():
     assert index.get_sentence("way") == "there is a way"
     assert index.get_sentence("cats") == "cats are great"
     assert index.get_sentence("jeff") == ""
+
+
+def test_ranked_sentence_selection(monkeypatch):
+    """Tests that sentences no harder than the grade are chosen"""
+    sentences = ["the cat sat", "the cat ate a marmalade sandwich", "a cat"]
+    index = data_utils.SentenceIndex(
+        sentences=sentences, index=data_utils._get_lookup_dict(sentences)
+    ).precompute()
+    word_grades = {"the": 0, "a": 0, "cat": 0, "sat": 1, "ate": 2}
+
+    ranked_index, ranked_difficulty = data_utils.rank_sentences(
+        sentences, index.index, word_grades
+    )
+    assert ranked_index["cat"] == [2, 0, 1]
+    assert ranked_difficulty["cat"] == sorted(ranked_difficulty["cat"])
+
+    index = data_utils.SentenceIndex(
+        sentences=sentences,
+        index=index.index,
+        ranked_index=ranked_index,
+        ranked_difficulty=ranked_difficulty,
+    )
+    easiest = ranked_difficulty["cat"][0]
+    assert {index.get_sentence("cat", grade=easiest) for _ in range(20)} == {"a cat"}
+    # Fall back to one of the easiest sentences if none are easy enough.
+    assert {index.get_sentence("cat", grade=-1) for _ in range(50)} == set(sentences)
+    monkeypatch.setattr(data_utils, "FALLBACK_SENTENCES", 2)
+    assert {index.get_sentence("cat", grade=-1) for _ in range(50)} == {
+        "a cat",
+        "the cat sat",
+    }
+    assert index.get_sentence("marmalade", grade=0) == sentences[1]
+    assert index.get_sentence("dog", grade=0) == ""
+
+
+def test_merged_ranked_selection():
+    """Tests that easy enough sentences are chosen from any component"""
+    word_grades = {"the": 0, "a": 0, "cat": 0, "sat": 1, "ate": 2}
+
+    def ranked_index(sentences):
+        index = data_utils._get_lookup_dict(sentences)
+        ranked_index, ranked_difficulty = data_utils.rank_sentences(
+            sentences, index, word_grades
+        )
+        return data_utils.SentenceIndex(
+            sentences=sentences,
+            index=index,
+            ranked_index=ranked_index,
+            ranked_difficulty=ranked_difficulty,
+        )
+
+    hard = ranked_index(["the cat ate a marmalade sandwich"])
+    easy = ranked_index(["a cat", "the cat sat"])
+    index = data_utils.MergedIndex([hard, easy])
+    assert index.get_sentence("cat", grade=0.5) == "a cat"
+    assert {index.get_sentence("cat", grade=-1) for _ in range(50)} == {
+        "a cat",
+        "the cat sat",
+        "the cat ate a marmalade sandwich",
+    }
+
+
+def test_exact_matches_come_first():
+    """Tests that any text's sentences with a word come before inflections"""
+    inflected = data_utils.SentenceIndex(
+        sentences=["she jumped"], index={"she": [0], "jumped": [0]}
+    ).precompute()
+    exact = data_utils.SentenceIndex(
+        sentences=["they jump"], index={"they": [0], "jump": [0]}
+    ).precompute()
+    index = data_utils.MergedIndex([inflected, exact])
+    assert index.get_sentence("jump") == "they jump"
+    assert index.get_sentence("jump", grade=10) == "they jump"
+    assert index.get_sentence("jumping") == "she jumped"
+
+
+def test_stale_stems_are_recomputed():
+    """Tests that stems stored by another version of the stemmer are dropped"""
+    stems = {"jump": [0]}
+    assert data_utils.stored_stems(stemming.VERSION, stems) == stems
+    assert data_utils.stored_stems(None, stems) == {}
+
+
+def test_stem_fallback():
+    """Tests that words with no sentences fall back to their inflections"""
+    sentences = ["they went home", "she goes to school", "the cat ran"]
+    index = data_utils.SentenceIndex(
+        sentences=sentences, index=data_utils._get_lookup_dict(sentences)
+    ).precompute()
+
+    assert index.get_sentence("went") == "they went home"
+    assert index.get_sentence("go") in sentences[:2]
+    assert index.get_sentence("running") == "the cat ran"
+    assert index.get_sentence("jumping") == ""
+
+
+def _practice(dataset, word, successes, failures):
+    """Records a practice event for a spelling word"""
+    return data_utils.update_dataset(
+        dataset, spelling_word=word, successes=successes, failures=failures
+    )
+
+
+def test_dataset_file_merges_sessions(tmp_path):
+    """Tests that sessions sharing a data file keep each other's events"""
+    words = data_utils.build_new_dataset(max_grade=1)
+    path = tmp_path / "student.yml"
+    data_utils.save_dataset(
+        path, data_rep.DataSet(spelling_words=words, reading_words=words)
+    )
+    cat, dog = list(words)[:2]
+
+    reading, spelling = data_utils.DatasetFile(path), data_utils.DatasetFile(path)
+    reading_dataset = _practice(reading.load(), cat, 1, 0)
+    spelling_dataset = _practice(spelling.load(), cat, 0, 1)
+    reading.save(reading_dataset)
+    saved = spelling.save(spelling_dataset)
+    assert saved.spelling_words[cat].log[1:] == [
+        data_rep.Event(success=1, failure=0),
+        data_rep.Event(success=0, failure=1),
+    ]
+    # Events already merged aren't merged again.
+    spelling_dataset = _practice(spelling_dataset, dog, 1, 0)
+    spelling.save(spelling_dataset)
+    reading_dataset = _practice(reading_dataset, dog, 0, 1)
+    saved = reading.save(reading_dataset)
+    assert len(saved.spelling_words[cat].log) == 3
+    assert len(saved.spelling_words[dog].log) == 3
+    assert saved.spelling_summary == summaries.summarize(saved.spelling_words)
+    assert data_utils.load_dataset(path) == saved
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "student.yml",
+        "student.yml.lock",
+    ]
+
+
+def test_sessions_adding_the_same_word(tmp_path):
+    """Tests that a word both sessions added keeps one prior, and both's events"""
+    words = data_utils.build_new_dataset(max_grade=0)
+    path = tmp_path / "student.yml"
+    data_utils.save_dataset(
+        path, data_rep.DataSet(spelling_words=words, reading_words=words)
+    )
+    new_words = data_utils.build_new_raw_dataset({1: ["crimson"]}, max_grade=1)
+
+    def add_and_practice(data_file, successes, failures):
+        dataset = data_file.load()
+        dataset = dataclasses.replace(
+            dataset, spelling_words={**dataset.spelling_words, **new_words}
+        )
+        return _practice(dataset, "crimson", successes, failures)
+
+    first, second = data_utils.DatasetFile(path), data_utils.DatasetFile(path)
+    first_dataset = add_and_practice(first, 1, 0)
+    second_dataset = add_and_practice(second, 0, 1)
+    first.save(first_dataset)
+    saved = second.save(second_dataset)
+    assert list(saved.spelling_words["crimson"].log) == [
+        new_words["crimson"].log[0],
+        data_rep.Event(success=1, failure=0),
+        data_rep.Event(success=0, failure=1),
+    ]
+
+
+def test_updates_keep_session_events(tmp_path):
+    """Tests that editing a file while a session saves to it loses neither change"""
+    words = data_utils.build_new_dataset(max_grade=0)
+    path = tmp_path / "student.yml"
+    data_utils.save_dataset(
+        path, data_rep.DataSet(spelling_words=words, reading_words=words)
+    )
+    word = next(iter(words))
+    session = data_utils.DatasetFile(path)
+    dataset = _practice(session.load(), word, 1, 0)
+    editing, saving = threading.Event(), threading.Event()
+
+    def save():
+        editing.wait(timeout=5)
+        saving.set()
+        session.save(dataset)
+
+    def add_texts(dataset):
+        editing.set()
+        # The session's save waits for the file's lock.
+        saving.wait(timeout=5)
+        return dataclasses.replace(dataset, text=["boxcar"])
+
+    thread = threading.Thread(target=save)
+    thread.start()
+    data_utils.DatasetFile(path).update(add_texts)
+    thread.join()
+    saved = data_utils.load_dataset(path)
+    assert saved.text == ["boxcar"]
+    assert len(saved.spelling_words[word].log) == 2
+
+
+def test_stale_cached_dataset_is_rebuilt(tmp_path):
+    """Tests that a dataset cached before the classes changed isn't reused"""
+    words = data_utils.build_new_dataset(max_grade=0)
+    dataset = data_rep.DataSet(spelling_words=words, reading_words=words)
+    path = tmp_path / "student.yml"
+    data_utils.save_dataset(path, dataset)
+    # As cached before logs were `EventLog`s: unpickling doesn't validate.
+    stale = copy.deepcopy(dataset)
+    for datum in stale.spelling_words.values():
+        object.__setattr__(datum, "log", list(datum.log))
+    cache.ArtifactCache.default().put(
+        "dataset", cache.content_key(path.read_bytes()), stale
+    )
+    dataset = data_utils.load_dataset(path)
+    assert all(
+        isinstance(datum.log, data_rep.EventLog)
+        for datum in dataset.spelling_words.values()
+    )
+
+
+def test_saves_keep_file_modes(tmp_path):
+    """Tests that saves keep the mode of the file, or (new files) get the umask's"""
+    words = data_utils.build_new_dataset(max_grade=0)
+    dataset = data_rep.DataSet(spelling_words=words, reading_words=words)
+    path = tmp_path / "student.yml"
+    umask = os.umask(0o022)
+    try:
+        data_utils.save_dataset(path, dataset)
+        assert stat.S_IMODE(path.stat().st_mode) == 0o644
+        path.chmod(0o640)
+        data_file = data_utils.DatasetFile(path)
+        data_file.save(_practice(data_file.load(), next(iter(words)), 1, 0))
+        assert stat.S_IMODE(path.stat().st_mode) == 0o640
+    finally:
+        os.umask(umask)
+
+
+def test_dataset_file_concurrent_saves(tmp_path):
+    """Tests that concurrent sessions' saves don't lose events"""
+    words = data_utils.build_new_dataset(max_grade=0)
+    path = tmp_path / "student.yml"
+    data_utils.save_dataset(
+        path, data_rep.DataSet(spelling_words=words, reading_words=words)
+    )
+    word = list(words)[0]
+
+    def session():
+        data_file = data_utils.DatasetFile(path)
+        dataset = data_file.load()
+        for _ in range(5):
+            dataset = _practice(dataset, word, 1, 0)
+            data_file.save(dataset)
+
+    threads = [threading.Thread(target=session) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(data_utils.load_dataset(path).spelling_words[word].log) == 1 + 20
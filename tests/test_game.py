@@ -0,0 +1,40 @@
+"""Tests for the game abstraction"""
+from sight_words import game
+
+
+class FakeClock:
+    """A clock which only moves when told to"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_tick_scheduler():
+    """Tests that ticks fall due at fixed intervals"""
+    clock = FakeClock()
+    ticks = game.TickScheduler(1.0, clock=clock)
+    assert ticks.timeout() == 1.0
+    clock.now += 0.25
+    assert not ticks.due()
+    assert ticks.timeout() == 0.75
+    clock.now += 0.8
+    assert ticks.due()
+    # The next tick keeps to the schedule, rather than starting from now.
+    assert abs(ticks.timeout() - 0.95) < 1e-9
+    assert not ticks.due()
+
+
+def test_tick_scheduler_falling_behind():
+    """Tests that missed ticks aren't all made up at once"""
+    clock = FakeClock()
+    ticks = game.TickScheduler(1.0, clock=clock)
+    clock.now += 10
+    assert ticks.due()
+    assert not ticks.due()
+    assert ticks.timeout() == 1.0
+    clock.now += 0.5
+    ticks.reset()
+    assert ticks.timeout() == 1.0
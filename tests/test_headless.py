@@ -0,0 +1,56 @@
+"""Tests for headless, scripted sessions"""
+import json
+
+import pytest
+
+from sight_words import data_rep, data_utils, headless
+
+
+def _dataset():
+    words = data_utils.build_new_dataset(max_grade=2)
+    return data_rep.DataSet(spelling_words=words, reading_words=words, text=[])
+
+
+def test_parse_answers():
+    """Tests parsing JSON lines, and reporting bad lines"""
+    lines = ['{"success": true}\n', "\n", '{"attempt": "cat"}\n']
+    assert list(headless.parse_answers(lines)) == [
+        {"success": True},
+        {"attempt": "cat"},
+    ]
+    with pytest.raises(ValueError, match="Line 2"):
+        list(headless.parse_answers(["{}", "[1]"]))
+
+
+def test_spell_replays_and_saves(tmp_path):
+    """Tests that a session's outcomes replay as its answers, and are saved"""
+    data_file = tmp_path / "student.yml"
+    answers = [{"attempt": "the"}, {"attempt": "xyz"}, {"attempt": "is"}]
+    outcomes = list(headless.spell(_dataset(), answers, data_file=data_file))
+    assert len(outcomes) == 3
+    for answer, outcome in zip(answers, outcomes):
+        assert outcome["attempt"] == answer["attempt"]
+        assert outcome["success"] == (outcome["word"] == answer["attempt"])
+    json.dumps(outcomes)
+
+    replayed = list(headless.spell(_dataset(), outcomes))
+    assert [o["word"] for o in replayed] == [o["word"] for o in outcomes]
+    assert [o["success"] for o in replayed] == [o["success"] for o in outcomes]
+
+    saved = data_utils.load_dataset(data_file)
+    n_events = sum(len(datum.log) for datum in saved.spelling_words.values())
+    initial = sum(len(datum.log) for datum in _dataset().spelling_words.values())
+    assert n_events == initial + 3
+
+
+def test_read_quits(tmp_path):
+    """Tests that a read session stops at a quit, saving only at the end"""
+    data_file = tmp_path / "student.yml"
+    answers = [{"word": "the", "success": True}, {"quit": True}, {"success": True}]
+    outcomes = headless.read(_dataset(), answers, data_file=data_file, save_every=0)
+    first = next(outcomes)
+    assert first["word"] == "the" and first["success"]
+    assert not data_file.exists()
+    assert list(outcomes) == []
+    saved = data_utils.load_dataset(data_file)
+    assert saved.reading_words["the"].successes == first["successes"]
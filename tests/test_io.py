@@ -1,4 +1,7 @@
 """Tests the IO module"""
+from concurrent import futures
+import threading
+import time
 from unittest import mock
 
 from sight_words import io
@@ -26,3 +29,99 @@ def test_silent_output(click):
     phrase = "hi there bob"
     engine.output(phrase)
     click.secho.assert_called_with(phrase)
+
+
+@mock.patch("sight_words.io.pyttsx3")
+def test_queued_output(pyttsx3):
+    """Tests that non-blocking output is spoken in order, off the calling thread"""
+    engine_mock = mock.MagicMock()
+    pyttsx3.init.return_value = engine_mock
+    engine = io.OutputEngine(io.OutputType.SPOKEN, blocking=False)
+
+    done = []
+    first = engine.output("hi there", on_done=done.append)
+    second = engine.output("bob")
+    second.result(timeout=5)
+    assert first.done()
+    assert done == [first]
+    assert [c.args for c in engine_mock.say.call_args_list] == [("hi there",), ("bob",)]
+    engine.close()
+
+
+def test_cancel_pending():
+    """Tests that stale phrases are cancelled"""
+    engine = io.OutputEngine(io.OutputType.SILENT, blocking=False)
+    release = threading.Event()
+    with mock.patch.object(engine, "_output", side_effect=lambda _: release.wait()):
+        current = engine.output("a")
+        while not current.running():
+            time.sleep(0.001)
+        stale = [engine.output(phrase) for phrase in ("b", "c")]
+        engine.cancel_pending()
+        release.set()
+        current.result(timeout=5)
+    assert all(future.cancelled() for future in stale)
+    engine.close()
+
+
+def test_cancel_keeps_feedback():
+    """Tests that cancelling a stale prompt leaves the phrases after it queued"""
+    engine = io.OutputEngine(io.OutputType.SILENT, blocking=False)
+    release = threading.Event()
+    with mock.patch.object(engine, "_output", side_effect=lambda _: release.wait()):
+        current = engine.output("a")
+        while not current.running():
+            time.sleep(0.001)
+        prompt = engine.output("b")
+        feedback = engine.output("c")
+        engine.cancel(prompt)
+        release.set()
+        feedback.result(timeout=5)
+    assert prompt.cancelled()
+    assert current.done() and not current.cancelled()
+    engine.close()
+
+
+@mock.patch("sight_words.io.pyttsx3")
+def test_cancel_stops_speech_on_speaker_thread(pyttsx3):
+    """Tests that interrupted speech is stopped by the thread which owns the engine"""
+    engine_mock = mock.MagicMock()
+    pyttsx3.init.return_value = engine_mock
+    speaking, release = threading.Event(), threading.Event()
+    stopped_by = []
+
+    def run_and_wait():
+        speaking.set()
+        release.wait()
+        (on_word,) = [c.args[1] for c in engine_mock.connect.call_args_list]
+        on_word(name=None, location=0, length=1)
+
+    engine_mock.runAndWait.side_effect = run_and_wait
+    engine_mock.stop.side_effect = lambda: stopped_by.append(
+        threading.current_thread().name
+    )
+    engine = io.OutputEngine(io.OutputType.SPOKEN, blocking=False)
+    prompt = engine.output("spell cat")
+    speaking.wait(timeout=5)
+    engine.cancel(prompt)
+    assert not engine_mock.stop.called
+    release.set()
+    prompt.result(timeout=5)
+    assert stopped_by == ["speaker"]
+    engine.close()
+
+
+@mock.patch("sight_words.io.speech")
+def test_blocking_audio_cache_output(speech):
+    """Tests that cached audio is played through in blocking mode"""
+    speech.find_audio_player.return_value = ["player"]
+    synthesized: futures.Future = futures.Future()
+    synthesized.set_result("hi.wav")
+    speech.SpeechSynthesizer.return_value.synthesize.return_value = synthesized
+    process = speech.play_audio_file.return_value
+    engine = io.OutputEngine(io.OutputType.SPOKEN, audio_cache=True)
+
+    engine.output("hi")
+    engine.output("there")
+    assert process.wait.call_count == 2
+    assert not process.terminate.called
@@ -0,0 +1,36 @@
+"""Tests for the per-phase profiling"""
+from sight_words import profiling
+
+
+def test_phases_are_timed_when_enabled():
+    """Tests that phases are only recorded once profiling is enabled"""
+    profiler = profiling.Profiler()
+
+    @profiler.timed("double")
+    def double(x):
+        return 2 * x
+
+    assert double(2) == 4
+    with profiler.phase("block"):
+        pass
+    assert not profiler.durations
+
+    profiler.enable(report_at_exit=False)
+    for i in range(20):
+        assert double(i) == 2 * i
+    with profiler.phase("block"):
+        pass
+    summary = profiler.summary()
+    assert summary["double"]["count"] == 20
+    assert summary["block"]["count"] == 1
+    stats = summary["double"]
+    assert 0 <= stats["p50"] <= stats["p95"] <= stats["max"] <= stats["total"]
+    assert "double" in profiler.format_summary()
+
+
+def test_percentile():
+    """Tests the nearest-rank percentiles"""
+    values = list(range(1, 101))
+    assert profiling.percentile(values, 0.5) == 50
+    assert profiling.percentile(values, 0.95) == 95
+    assert profiling.percentile([3.0], 0.95) == 3.0
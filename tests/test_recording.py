@@ -0,0 +1,95 @@
+"""Tests for recording and replaying games"""
+import io
+
+import pytest
+from blessed.keyboard import Keystroke
+
+from sight_words import game, recording
+
+
+class ScriptedTerminal(recording.ReplayTerminal):
+    """A terminal whose keystrokes arrive on a script, on a fake clock"""
+
+    def __init__(self, stream, script):
+        super().__init__(stream)
+        self.size = (40, 16)
+        self.now = 1000.0
+        # (seconds to wait, keystroke) pairs.
+        self.script = list(script)
+
+    def inkey(self, timeout=None, esc_delay=0.35):
+        if self.script and (timeout is None or self.script[0][0] <= timeout):
+            wait, key = self.script.pop(0)
+            self.now += wait
+            return key
+        if self.script:
+            self.script[0] = (self.script[0][0] - timeout, self.script[0][1])
+        self.now += timeout
+        return Keystroke("")
+
+
+LEFT = Keystroke("\x1b[D", code=260)
+UP = Keystroke("\x1b[A", code=259)
+
+
+def record_session(script, events, game_name="tetris"):
+    """Records a session which plays a game between each event, and ends with q"""
+    f = io.BytesIO()
+    output = io.StringIO()
+    ui = ScriptedTerminal(output, script)
+    recorder = recording.Recorder(f, game_name, seed=7, time_source=lambda: ui.now)
+    state = recorder.new_game()
+    for event in events + [None]:
+        hook = game.run_blocking(recorder.record_loop(state.game_loop(ui), ui), ui)
+        if event is None or isinstance(hook, game.GameOver):
+            break
+        recorder.record_event(event)
+        state = hook(event)
+    return f.getvalue(), state, output.getvalue()
+
+
+def test_replay_tetris():
+    """Tests that a replayed game of tetris plays out exactly as recorded"""
+    script = [(0.3, LEFT), (0.2, UP), (2.5, LEFT), (30, Keystroke("q"))] * 2
+    events = [
+        game.SightWordTestEvent("cat", 1, game.TestQuestionResult.FAIL),
+    ]
+    data, state, output = record_session(script, events)
+    assert data.startswith(recording.MAGIC)
+
+    replayed_output = io.StringIO()
+    result = recording.replay(data, stream=replayed_output)
+    assert result.n_games == 2
+    assert result.n_events == 1
+    assert result.final_state.rows == state.rows
+    assert result.final_state.piece == state.piece
+    assert result.final_state.score == state.score
+    assert replayed_output.getvalue() == output
+    assert recording.replay(data).n_chars_written == len(output)
+
+
+def test_replay_stacking():
+    """Tests that stacking games replay"""
+    events = [
+        game.SightWordTestEvent("cat", 1, game.TestQuestionResult.PASS),
+        game.SightWordTestEvent("dog", 1, game.TestQuestionResult.FAIL),
+    ]
+    script = [(0.1, Keystroke("x"))] * 3
+    data, state, output = record_session(script, events, game_name="stacking")
+    result = recording.replay(data)
+    assert result.n_games == 3
+    assert result.final_state.pass_words == ["cat"]
+    assert result.final_state.fail_words == ["dog"]
+
+
+def test_replay_errors():
+    """Tests that invalid and diverging recordings are reported"""
+    with pytest.raises(recording.ReplayError):
+        recording.replay(b"not a recording")
+    data, _, _ = record_session([(0.5, LEFT), (1, Keystroke("q"))], [])
+    with pytest.raises(recording.ReplayError):
+        recording.replay(data[:-3])
+    # A key where the game read its clock.
+    index = data.rindex(b"C")
+    with pytest.raises(recording.ReplayError):
+        recording.replay(data[:index] + b"T" + data[index + 1 :])
@@ -0,0 +1,80 @@
+"""Tests for the double-buffered renderer"""
+import io
+
+from sight_words import render
+
+
+class FakeTerminal:
+    """A terminal with readable cursor moves"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def move_xy(self, x, y):
+        return f"<{x},{y}>"
+
+
+def present(renderer):
+    """Presents a frame, returning what was written"""
+    renderer.stream.seek(0)
+    renderer.stream.truncate()
+    renderer.present()
+    return renderer.stream.getvalue()
+
+
+def test_first_frame_is_drawn_in_full():
+    """Tests that the first frame writes every cell"""
+    renderer = render.Renderer(FakeTerminal(3, 2), stream=io.StringIO())
+    screen = renderer.begin_frame("S")
+    screen.put(1, 0, "ab", "T")
+    assert present(renderer) == "<0,0>S T" + "ab" + "<0,1>S   "
+
+
+def test_only_changes_are_written():
+    """Tests that later frames write only the changed cells"""
+    renderer = render.Renderer(FakeTerminal(20, 3), stream=io.StringIO())
+    renderer.begin_frame("S").put(0, 1, "hello", "S")
+    present(renderer)
+
+    renderer.begin_frame("S").put(0, 1, "hello", "S")
+    assert present(renderer) == ""
+
+    screen = renderer.begin_frame("S")
+    screen.put(0, 1, "jello", "S")
+    assert present(renderer) == "<0,1>Sj"
+
+    # A short gap is rewritten, rather than moved over.
+    screen = renderer.begin_frame("S")
+    screen.put(0, 1, "jelly", "S")
+    screen.put(2, 2, "x", "S")
+    screen.put(15, 2, "y", "T")
+    assert present(renderer) == "<4,1>Sy<2,2>x<15,2>Ty"
+
+    screen = renderer.begin_frame("S")
+    screen.put(0, 1, "jelly", "S")
+    screen.put(2, 2, "x", "S")
+    screen.put(15, 2, "y", "T")
+    screen.put(5, 1, "!", "S")
+    screen.put(9, 1, "?", "S")
+    assert present(renderer) == "<5,1>S!   ?"
+
+
+def test_put_clips():
+    """Tests that text off the screen is clipped"""
+    screen = render.ScreenBuffer(4, 2)
+    screen.put(-1, 0, "abcdef", "S")
+    screen.put(0, 5, "ignored", "S")
+    assert "".join(char for char, _ in screen.rows[0]) == "bcde"
+    assert "".join(char for char, _ in screen.rows[1]) == "    "
+
+
+def test_resize_redraws():
+    """Tests that a resized terminal is drawn in full"""
+    ui = FakeTerminal(2, 1)
+    renderer = render.Renderer(ui, stream=io.StringIO())
+    renderer.begin_frame("S")
+    present(renderer)
+    ui.width = 3
+    renderer.begin_frame("S")
+    assert present(renderer) == "<0,0>S   "
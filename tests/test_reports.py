@@ -0,0 +1,42 @@
+"""Tests for the reports"""
+import io
+
+from sight_words import data_rep, data_utils, reports
+
+
+def _save_student(data_file, failed_word=None):
+    words = data_utils.build_new_dataset(max_grade=1)
+    dataset = data_rep.DataSet(spelling_words=words, reading_words=words, text=[])
+    if failed_word:
+        for _ in range(3):
+            dataset = data_utils.update_dataset(
+                dataset, spelling_word=failed_word, failures=1
+            )
+    data_utils.save_dataset(data_file, dataset)
+
+
+def test_class_report(tmp_path):
+    """Tests a class report, run across a process pool"""
+    _save_student(tmp_path / "ann.yml", failed_word="the")
+    _save_student(tmp_path / "bob.yml", failed_word="the")
+    _save_student(tmp_path / "cat.yml")
+    (tmp_path / "bad.yml").write_text("spelling_words: [")
+
+    data_files = reports.find_data_files([str(tmp_path)])
+    assert [f.stem for f in data_files] == ["ann", "bad", "bob", "cat"]
+    report = reports.class_report(data_files, n_worst=1, n_hardest=2, max_workers=2)
+
+    assert [s["student"] for s in report["students"]] == ["ann", "bob", "cat"]
+    assert [e["file"] for e in report["errors"]] == [str(tmp_path / "bad.yml")]
+    assert list(report["students"][0]["spelling_worst"]) == ["the"]
+    assert report["hardest"]["spelling"][0]["word"] == "the"
+    assert report["hardest"]["spelling"][0]["students"] == 3
+    assert report == reports.class_report(
+        data_files, n_worst=1, n_hardest=2, max_workers=1
+    )
+
+    csv_file = io.StringIO()
+    reports.write_class_report_csv(report, csv_file)
+    lines = csv_file.getvalue().splitlines()
+    assert lines[0].startswith("student,file,spelling_grade_1,spelling_grade_K")
+    assert len(lines) == 4
@@ -0,0 +1,52 @@
+"""Tests for provisioning a roster of students"""
+
+import pytest
+
+from sight_words import data_utils, roster
+
+
+def test_read_roster():
+    """Tests reading a roster, and rejecting bad rows"""
+    entries = roster.read_roster(
+        ["student,grade,texts", "ann,1,boxcar p_and_p", "bob,0,"]
+    )
+    assert entries == [
+        roster.RosterEntry("ann", 1, texts=("boxcar", "p_and_p")),
+        roster.RosterEntry("bob", 0),
+    ]
+    with pytest.raises(ValueError, match="grade"):
+        roster.read_roster(["student", "ann"])
+    with pytest.raises(ValueError, match="Line 2"):
+        roster.read_roster(["student,grade", "../ann,1"])
+
+
+def test_provision_roster(tmp_path):
+    """Tests creating data files, then adding grades to them in parallel"""
+    entries = [roster.RosterEntry("ann", 0), roster.RosterEntry("bob", 1)]
+    results = roster.provision_roster(entries, tmp_path, default_texts=["boxcar"])
+    assert [r.action for r in results] == [roster.Action.CREATED] * 2
+
+    entries = [
+        roster.RosterEntry("ann", 1),
+        roster.RosterEntry("bob", 1),
+        roster.RosterEntry("cat", 0),
+    ]
+    results = roster.provision_roster(
+        entries, tmp_path, default_texts=["boxcar"], max_workers=2
+    )
+    assert [r.action for r in results] == [
+        roster.Action.UPDATED,
+        roster.Action.UNCHANGED,
+        roster.Action.CREATED,
+    ]
+    ann = data_utils.load_dataset(tmp_path / "ann.yml")
+    bob = data_utils.load_dataset(tmp_path / "bob.yml")
+    assert set(ann.spelling_words) == set(bob.spelling_words)
+    assert ann.text == ["boxcar"]
+    assert results[0].n_words_added == 2 * (
+        len(ann.spelling_words)
+        - len(data_utils.load_dataset(tmp_path / "cat.yml").spelling_words)
+    )
+
+    with pytest.raises(ValueError, match="repeats ann"):
+        roster.provision_roster(entries * 2, tmp_path, default_texts=[])
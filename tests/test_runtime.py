@@ -0,0 +1,70 @@
+"""Tests for the asyncio session runtime"""
+import asyncio
+from unittest import mock
+
+from sight_words import data_utils, game, runtime
+
+
+class FakeKeys:
+    """A key reader which replays a list of keys"""
+
+    def __init__(self, keys):
+        self._keys = list(keys)
+        self.timeouts = []
+
+    async def get(self, timeout=None):
+        self.timeouts.append(timeout)
+        return self._keys.pop(0) if self._keys else None
+
+
+class CountingGame(game.AbstractGame):
+    """A game which counts key presses until it sees a q"""
+
+    def play(self, ui):
+        return game.run_blocking(self.game_loop(ui), ui)
+
+    def game_loop(self, ui):
+        presses = 0
+        yield game.Sleep(0)
+        while True:
+            key = yield game.WaitForKey(timeout=0.5)
+            if key == "q":
+                return game.GameOver(score=presses)
+            if key:
+                presses += 1
+
+
+def test_run_blocking():
+    """Tests that a game loop can be driven by blocking terminal reads"""
+    ui = mock.Mock()
+    ui.inkey.side_effect = ["a", "", "b", "q"]
+    result = CountingGame().play(ui)
+    assert result == game.GameOver(score=2)
+    assert ui.inkey.call_count == 4
+
+
+def test_play_game():
+    """Tests that the same game loop can be driven by the event loop"""
+    keys = FakeKeys(["a", None, "b", "c", "q"])
+    result = asyncio.run(runtime.play_game(CountingGame(), mock.Mock(), keys))
+    assert result == game.GameOver(score=3)
+    assert keys.timeouts == [0.5] * 5
+
+
+def test_background_saver_keeps_latest(tmp_path):
+    """Tests that queued up saves are coalesced, and flushed on close"""
+    saved = []
+
+    async def session():
+        saver = runtime.BackgroundSaver(data_utils.DatasetFile(tmp_path / "data.yml"))
+        saver.start()
+        for i in range(5):
+            saver.save(i)
+        await saver.close()
+
+    with mock.patch(
+        "sight_words.data_utils.DatasetFile.save",
+        side_effect=lambda dataset: saved.append(dataset),
+    ):
+        asyncio.run(session())
+    assert saved == [4]
@@ -0,0 +1,98 @@
+"""Tests for spaced repetition scheduling"""
+import pytest
+
+from sight_words import data_rep, headless, scheduling, session
+
+PRIOR = data_rep.Event(0.5, 0.5)
+
+
+class _Clock:
+    """A clock that only moves when told to"""
+
+    def __init__(self, now=1e9):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _datum(*successes, time=None):
+    """A datum with an event per success, the last at the time (if any)"""
+    events = [PRIOR] + [data_rep.Event(int(s), int(not s)) for s in successes]
+    if time is not None:
+        last = events[-1]
+        events[-1] = data_rep.Event(last.success, last.failure, time=time)
+    return data_rep.SightWordDatum(1, events)
+
+
+def test_review_intervals():
+    """Tests that intervals grow with the streak of successes, but not the prior"""
+    assert scheduling.success_streak(_datum().log) == 0
+    assert scheduling.success_streak(_datum(1, 0, 1, 1).log) == 2
+    assert scheduling.review_interval(0) == scheduling.FAILURE_INTERVAL
+    assert scheduling.review_interval(2) == (
+        scheduling.SUCCESS_INTERVAL * scheduling.EASE
+    )
+    assert scheduling.due_time(_datum(1)) is None
+    assert scheduling.due_time(_datum(1, 1, time=100.0)) == (
+        100.0 + scheduling.review_interval(2)
+    )
+
+
+def test_due_words_come_first():
+    """Tests choosing due words, then new words (weakest first), then the next due"""
+    clock = _Clock(now=10_000.0)
+    words = {
+        "due": _datum(0, time=0.0),
+        "later": _datum(1, 1, 1, time=9_000.0),
+        "weak": _datum(0, 0),
+        "new": _datum(),
+    }
+    scheduler = scheduling.SpacedRepetitionScheduler(clock=clock)
+    chosen = []
+    while words:
+        chosen.append(scheduler.choose_word(words))
+        # Words no longer in the dataset aren't rescheduled.
+        del words[chosen[-1]]
+    assert chosen == ["due", "weak", "new", "later"]
+
+
+def test_answers_reschedule_words():
+    """Tests that a failed word comes back soon, and a known word much later"""
+    clock = _Clock()
+    words = {"cat": _datum(), "dog": _datum(), "the": _datum()}
+    dataset = data_rep.DataSet(spelling_words=words, reading_words={})
+    state = session.SessionState(dataset, clock=clock)
+    scheduler = scheduling.SpacedRepetitionScheduler(clock=clock)
+
+    def answer(success):
+        clock.now += 1
+        word = scheduler.choose_word(state.dataset.spelling_words)
+        state.record_answer(word, success)
+        return word
+
+    failed = answer(False)
+    known = answer(True)
+    other = answer(True)
+    assert len({failed, known, other}) == 3
+    # Every word has been practiced, but none is due: the soonest due comes next.
+    assert answer(True) == failed
+    assert answer(True) == known
+    clock.now += scheduling.SUCCESS_INTERVAL
+    assert answer(True) == other
+    # An unanswered word is chosen again.
+    word = scheduler.choose_word(state.dataset.spelling_words)
+    assert scheduler.choose_word(state.dataset.spelling_words) == word
+
+
+def test_headless_spaced_repetition():
+    """Tests choosing words by spaced repetition in a scripted session"""
+    words = {word: _datum() for word in ("cat", "dog", "the")}
+    dataset = data_rep.DataSet(spelling_words=words, reading_words=words)
+    answers = [{"attempt": "xyz"}] * 4
+    outcomes = list(headless.spell(dataset, answers, strategy="spaced"))
+    chosen = [outcome["word"] for outcome in outcomes]
+    assert sorted(chosen[:3]) == ["cat", "dog", "the"]
+    assert chosen[3] == chosen[0]
+    with pytest.raises(ValueError, match="Unknown strategy"):
+        list(headless.read(dataset, answers, strategy="random"))
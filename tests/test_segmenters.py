@@ -0,0 +1,34 @@
+"""Tests for the sentence segmenters"""
+from sight_words import segmenters
+
+
+def test_regex_segmenter():
+    """Tests that the regex segmenter handles abbreviations and dialogue"""
+    segmenter = segmenters.RegexSegmenter()
+    text = (
+        'Mr. Alden met J. H. Moore. "Where are you going?" asked Henry. '
+        '"Home!" Benny ran off. They ate bread, cheese, etc. and milk.'
+    )
+    assert segmenter.segment(text) == [
+        "Mr. Alden met J. H. Moore.",
+        '"Where are you going?" asked Henry.',
+        '"Home!"',
+        "Benny ran off.",
+        "They ate bread, cheese, etc. and milk.",
+    ]
+
+
+def test_get_segmenter():
+    """Tests looking up segmenters by name"""
+    assert isinstance(segmenters.get_segmenter("regex"), segmenters.RegexSegmenter)
+    assert isinstance(segmenters.get_segmenter("punkt"), segmenters.PunktSegmenter)
+
+
+def test_compare_segmentations():
+    """Tests the boundary agreement between two segmentations"""
+    reference = ["A b.", "C d.", "E f."]
+    candidate = ["A b. C d.", "E f."]
+    agreement = segmenters.compare_segmentations(reference, candidate)
+    assert agreement.shared_boundaries == 2
+    assert agreement.precision == 1.0
+    assert agreement.recall == 2 / 3
@@ -0,0 +1,110 @@
+"""Tests for the shared session state"""
+import io
+import threading
+
+from blessed.keyboard import Keystroke
+
+from sight_words import data_rep, data_utils, game, recording, session
+from sight_words.games import tetris
+
+
+def make_dataset():
+    """A small dataset, of reading and spelling words"""
+    return data_rep.DataSet(
+        reading_words=data_utils.build_new_dataset(max_grade=0),
+        spelling_words=data_utils.build_new_dataset(max_grade=0),
+    )
+
+
+def test_concurrent_answers():
+    """Tests that answers recorded from several threads are all kept, in order"""
+    dataset = make_dataset()
+    words = list(dataset.spelling_words)[:4]
+    state = session.SessionState(dataset)
+    versions = []
+    state.subscribe(lambda dataset: versions.append(state.version))
+
+    def answer(word):
+        for i in range(25):
+            state.record_answer(word, success=i % 5 != 0)
+
+    threads = [threading.Thread(target=answer, args=(word,)) for word in words]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert state.version == 100
+    assert versions == list(range(1, 101))
+    assert state.session_successes == 0.5 + 80
+    assert state.session_failures == 0.5 + 20
+    for word in words:
+        datum = state.dataset.spelling_words[word]
+        old_datum = dataset.spelling_words[word]
+        new_events = datum.log[len(old_datum.log) :]
+        assert sum(event.success for event in new_events) == 20
+        assert sum(event.failure for event in new_events) == 5
+    assert state.dataset.reading_words == dataset.reading_words
+
+
+def test_reading_answers():
+    """Tests that reading answers update the reading words"""
+    dataset = make_dataset()
+    word = list(dataset.reading_words)[0]
+    state = session.SessionState(dataset)
+    new_dataset = state.record_answer(word, success=False, spelling=False)
+    assert state.dataset is new_dataset
+    assert (
+        new_dataset.reading_words[word].failures
+        == dataset.reading_words[word].failures + 1
+    )
+    assert new_dataset.spelling_words == dataset.spelling_words
+
+
+def quit_game(state):
+    """Plays the game, quitting at once"""
+    game_loop = state.game_loop(recording.ReplayTerminal(io.StringIO()))
+    reply = None
+    try:
+        while True:
+            request = game_loop.send(reply)
+            reply = Keystroke("q") if isinstance(request, game.WaitForKey) else None
+    except StopIteration as stop:
+        return stop.value
+
+
+def test_resume_game():
+    """Tests that the game resumes after each word, until it is over"""
+    state = session.SessionState(make_dataset(), game=tetris.Tetris())
+    event = game.SightWordTestEvent("cat", 1, game.TestQuestionResult.FAIL)
+    # The game hasn't been played.
+    assert not state.resume_game(event)
+
+    old_game = state.game
+    state.game_played(quit_game(old_game))
+    assert not state.game_over
+    assert state.resume_game(event)
+    assert state.game is not old_game
+    assert state.game.rows[-1].word == "cat"
+    # The resumed game doesn't share rows with the old one.
+    state.game.rows[0].blocks = 1
+    assert old_game.rows[0].blocks == 0
+    # It can only resume once.
+    assert not state.resume_game(event)
+
+    state.game_played(game.GameOver(score=3))
+    assert state.game_over
+    assert not state.resume_game(event)
+
+
+def test_answers_are_timestamped():
+    """Tests that answers record their time, session and response time"""
+    dataset = make_dataset()
+    word = list(dataset.spelling_words)[0]
+    state = session.SessionState(dataset, clock=lambda: 1e9)
+    state.record_answer(word, success=True, response_time=1.5)
+    event = state.dataset.spelling_words[word].log[-1]
+    assert event == data_rep.Event(
+        1, 0, time=1e9, session=state.session_id, response_time=1.5
+    )
+    assert state.session_id != session.SessionState(dataset).session_id
@@ -0,0 +1,60 @@
+"""Tests for background speech synthesis"""
+import pathlib
+import threading
+from unittest import mock
+
+from sight_words import cache, io, speech
+
+
+class FakeEngine:
+    """A pyttsx3-like engine which writes the phrase to the file"""
+
+    def __init__(self):
+        self.saved = []
+        self.threads = set()
+        self._to_save = None
+
+    def getProperty(self, name):
+        return {"voice": "fake", "rate": 200, "volume": 1.0}[name]
+
+    def save_to_file(self, phrase, path):
+        self.threads.add(threading.get_ident())
+        self._to_save = (phrase, path)
+
+    def runAndWait(self):
+        phrase, path = self._to_save
+        pathlib.Path(path).write_text(phrase)
+        self.saved.append(phrase)
+
+
+def test_synthesis_is_cached(tmp_path):
+    """Tests that each phrase is synthesized once, on the worker thread"""
+    engine = FakeEngine()
+    synthesizer = speech.SpeechSynthesizer(
+        lambda: engine, artifact_cache=cache.ArtifactCache(tmp_path)
+    )
+    first = synthesizer.synthesize("Correct!")
+    second = synthesizer.synthesize("Please spell cat", priority=speech.URGENT)
+    assert first.result().read_text() == "Correct!"
+    assert second.result().read_text() == "Please spell cat"
+
+    assert synthesizer.synthesize("Correct!").result() == first.result()
+    synthesizer.close()
+    assert sorted(engine.saved) == ["Correct!", "Please spell cat"]
+    assert engine.threads == {synthesizer._thread.ident}
+
+
+@mock.patch("sight_words.io.speech.play_audio_file")
+@mock.patch("sight_words.io.speech.find_audio_player", return_value=["player"])
+@mock.patch("sight_words.io.pyttsx3")
+def test_cached_output(pyttsx3, find_audio_player, play_audio_file):
+    """Tests that cached phrases are played rather than spoken"""
+    engine = FakeEngine()
+    pyttsx3.init.return_value = engine
+    output_engine = io.OutputEngine(io.OutputType.SPOKEN, audio_cache=True)
+    output_engine.presynthesize("Correct!")
+    output_engine.output("Correct!")
+
+    path = output_engine.synthesizer.audio_path("Correct!")
+    play_audio_file.assert_called_with(["player"], path)
+    assert engine.saved == ["Correct!"]
@@ -0,0 +1,42 @@
+"""Tests for the stemmer"""
+import pytest
+
+from sight_words import stemming
+
+
+@pytest.mark.parametrize(
+    "family",
+    [
+        ["go", "goes", "going", "gone", "went"],
+        ["run", "runs", "running", "ran"],
+        ["make", "makes", "making", "made"],
+        ["cry", "cries", "cried", "crying"],
+        ["box", "boxes"],
+        ["jump", "jumps", "jumped", "jumping"],
+        ["lay", "lays", "laid", "laying"],
+        ["lie", "lies", "lain", "lying"],
+    ],
+)
+def test_inflection_families(family):
+    """Tests that inflections of a word share a stem"""
+    assert len({stemming.stem(word) for word in family}) == 1
+
+
+def test_short_words_are_kept():
+    """Tests that words which merely look inflected keep their stem"""
+    assert stemming.stem("thing") != stemming.stem("th")
+    assert stemming.stem("bring") == "bring"
+    assert stemming.stem("pass") == "pass"
+
+
+@pytest.mark.parametrize(
+    "word", ["string", "spring", "morning", "evening", "during", "speed", "this"]
+)
+def test_uninflected_words_are_kept(word):
+    """Tests that words which end like inflections aren't stemmed"""
+    assert stemming.stem(word) == word
+
+
+def test_irregular_forms_are_consistent():
+    """Tests that irregular forms map to base forms, which aren't mapped again"""
+    assert not set(stemming.IRREGULAR_FORMS.values()) & set(stemming.IRREGULAR_FORMS)
@@ -0,0 +1,84 @@
+"""Tests for the materialized report summaries"""
+
+import random
+
+import yaml
+
+from sight_words import data_rep, data_utils, reports, summaries
+
+
+def test_summary_tracks_answers(monkeypatch):
+    """Tests that the maintained summary agrees with one recomputed from the logs"""
+    monkeypatch.setattr(summaries, "SUMMARY_WORST_WORDS", 5)
+    words = data_utils.build_new_dataset(max_grade=2)
+    dataset = data_rep.DataSet(spelling_words=words, reading_words=words, text=[])
+    rng = random.Random(0)
+    hard_words = rng.sample(sorted(words), 10)
+    for _ in range(200):
+        word = rng.choice(hard_words)
+        success = rng.random() < 0.3
+        dataset = data_utils.update_dataset(
+            dataset,
+            spelling_word=word,
+            successes=int(success),
+            failures=int(not success),
+        )
+        maintained = dataset.spelling_summary
+        recomputed = summaries.summarize(dataset.spelling_words)
+        assert summaries.grade_marks(maintained) == reports.marks_by_grade(
+            dataset.spelling_words
+        )
+        # The maintained worst words are always the true worst words.
+        assert maintained.worst == recomputed.worst[: len(maintained.worst)]
+    assert dataset.reading_summary is None
+
+
+def test_summary_sums_dont_drift():
+    """Tests that the sums by grade stay exact over many fractional answers"""
+    words = data_utils.build_new_dataset(max_grade=1)
+    dataset = data_rep.DataSet(spelling_words=words, reading_words=words, text=[])
+    rng = random.Random(0)
+    for _ in range(500):
+        dataset = data_utils.update_dataset(
+            dataset, spelling_word=rng.choice(sorted(words)), successes=0.1
+        )
+    recomputed = summaries.summarize(dataset.spelling_words)
+    assert dataset.spelling_summary.grade_successes == recomputed.grade_successes
+    assert dataset.spelling_summary.grade_failures == recomputed.grade_failures
+
+
+def test_worst_words_are_refilled(monkeypatch):
+    """Tests that the worst words shrink as they improve, until they're refilled"""
+    monkeypatch.setattr(summaries, "SUMMARY_WORST_WORDS", 6)
+    words = data_utils.build_new_dataset(max_grade=1)
+    summary = summaries.summarize(words)
+    lengths = []
+    for _ in range(4):
+        word = summary.worst[0][1]
+        old_datum = words[word]
+        new_datum = data_utils.update_dataset(
+            data_rep.DataSet(spelling_words=words, reading_words={}),
+            spelling_word=word,
+            successes=100,
+        ).spelling_words[word]
+        words = {**words, word: new_datum}
+        # Without the words, an improved word leaves the list unreplaced.
+        shrunk = summaries.update_summary(summary, word, old_datum, new_datum)
+        assert len(shrunk.worst) == len(summary.worst) - 1
+        summary = summaries.update_summary(summary, word, old_datum, new_datum, words)
+        lengths.append(len(summary.worst))
+        assert summary.worst == summaries.summarize(words).worst[: len(summary.worst)]
+    assert lengths == [5, 4, 3, 6]
+
+
+def test_summary_serialization():
+    """Tests that summaries round trip through the data file"""
+    words = data_utils.build_new_dataset(max_grade=1)
+    dataset = data_rep.DataSet(spelling_words=words, reading_words=words, text=[])
+    dataset = data_utils.update_dataset(dataset, reading_word="the", failures=1)
+    loaded = yaml.load(yaml.dump(dataset), Loader=yaml.FullLoader)
+    assert loaded.reading_summary == dataset.reading_summary
+    worst = summaries.worst_words(loaded.reading_summary, 3)
+    all_marks = reports.marks_by_word(loaded.reading_words)
+    assert list(worst.values()) == sorted(all_marks.values())[:3]
+    assert all(all_marks[word] == mark for word, mark in worst.items())
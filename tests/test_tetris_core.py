@@ -0,0 +1,104 @@
+"""Tests for the tetris simulation core"""
+from sight_words.games import tetris_bot, tetris_core
+
+
+def make_game(rows, piece):
+    """A game of width 4, with rows given as strings of "#"s and spaces"""
+    return tetris_core.TetrisCore(
+        width=4,
+        rows=[
+            tetris_core.RowData(
+                blocks=sum(1 << x for x, c in enumerate(row) if c == "#")
+            )
+            for row in rows
+        ],
+        piece=piece,
+    )
+
+
+def test_collisions():
+    """Tests that pieces collide with blocks and the sides, but not the top"""
+    game = make_game(["    ", "    ", "#   "], tetris_core.TetrisPiece.box(1, 0))
+    assert not game.is_piece_blocked(game.piece)
+    assert not game.is_piece_blocked(game.piece.shift(0, -3))
+    assert game.is_piece_blocked(game.piece.shift(-1, 1))
+    assert game.is_piece_blocked(game.piece.shift(2, 0))
+    assert game.is_piece_blocked(game.piece.shift(-2, 0))
+    assert game.is_piece_blocked(game.piece.shift(0, 2))
+
+
+def test_drop_and_clear():
+    """Tests that a dropped piece is placed, and full rows are cleared"""
+    game = make_game(["    ", "    ", "##  "], tetris_core.TetrisPiece.box(2, 0))
+    assert game.drop_piece()
+    assert not game.drop_piece()
+    assert [row.blocks for row in game.rows] == [0b0000, 0b1100, 0b1111]
+    assert game.adjust_rows(3) == 1
+    assert [row.blocks for row in game.rows] == [0b0000, 0b0000, 0b1100]
+    assert game.score == 4
+    assert not game.is_game_over()
+
+
+def test_word_rows_are_not_cleared():
+    """Tests that the full rows of missed words stay"""
+    game = make_game(["    "], tetris_core.TetrisPiece.box(0, -5))
+    game.rows.append(tetris_core.RowData(blocks=game.full_mask, word="cat"))
+    assert game.adjust_rows(2) == 0
+    assert [row.word for row in game.rows] == ["", "cat"]
+    assert game.score == 0
+
+
+def test_rotations():
+    """Tests the precomputed rotations of the pieces"""
+    ell = tetris_core.TetrisPiece.ell(1, 1)
+    assert sorted(ell.squares) == [(1, 1), (1, 2), (1, 3), (2, 1)]
+    assert sorted(ell.rotate(1).squares) == [(-1, 1), (0, 1), (1, 1), (1, 2)]
+    assert ell.rotate(1).rotate(-1) == ell
+    for shape in tetris_core.Shape:
+        piece = tetris_core.TetrisPiece(shape, x=3, y=4)
+        for rotation in range(4):
+            rotated = piece.rotate(rotation)
+            assert len(set(rotated.squares)) == 4
+            assert rotated.rotate(4 - rotation) == piece
+
+
+def test_try_move():
+    """Tests that blocked moves leave the piece where it was"""
+    game = make_game(
+        ["    ", "    ", "    ", "    "], tetris_core.TetrisPiece.line(0, 1)
+    )
+    assert not game.try_move(x=-1)
+    assert not game.try_move(n_quarter_turns=1)
+    assert game.try_move(x=2, n_quarter_turns=1)
+    assert game.piece == tetris_core.TetrisPiece(tetris_core.Shape.LINE, 1, 2, 1)
+    assert not game.try_move(y=3)
+
+
+def test_seeded_games_repeat():
+    """Tests that games with the same seed draw the same pieces"""
+    games = [tetris_core.TetrisCore.new(seed=1) for _ in range(2)]
+    for _ in range(200):
+        results = [game.step(tetris_core.Move.LEFT) for game in games]
+        assert results[0] == results[1]
+        assert games[0].piece == games[1].piece
+    assert [row.blocks for row in games[0].rows] == [
+        row.blocks for row in games[1].rows
+    ]
+
+
+def test_step():
+    """Tests that a landed piece is placed, and the next piece spawns"""
+    game = make_game(["    ", "    ", "### "], tetris_core.TetrisPiece.line(3, -1))
+    assert game.step() == tetris_core.StepResult(landed=False)
+    result = game.step(tetris_core.Move.DOWN)
+    assert result.landed
+    assert result.n_cleared == 1
+    assert [row.blocks for row in game.rows] == [0b0000, 0b1000, 0b1000]
+    assert game.piece.y == 0
+
+
+def test_bot():
+    """Tests that the bot clears lines, and plays the same game from a seed"""
+    result = tetris_bot.play_game(seed=0, max_steps=1000)
+    assert result.n_lines > 10
+    assert tetris_bot.play_game(seed=0, max_steps=1000) == result